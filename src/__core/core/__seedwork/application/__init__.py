@@ -1,2 +1,3 @@
 from .dto import *
 from .use_cases import *
+from .interceptors import *
@@ -1,7 +1,10 @@
 
 from dataclasses import dataclass
-from typing import Generic, List, Optional, TypeVar
-from core.__seedwork.domain.repositories import SearchResult
+from datetime import datetime
+import hashlib
+from typing import Any, Generic, List, Optional, TypeVar
+from core.__seedwork.domain.repositories import ChangeVersion, SearchResult
+from core.__seedwork.domain.validators import ErrorFields
 
 
 Filter = TypeVar('Filter')
@@ -14,6 +17,7 @@ class SearchInput(Generic[Filter]):
     sort: Optional[str] = None
     sort_dir: Optional[str] = None
     filter: Optional[Filter] = None
+    fields: Optional[List[str]] = None
 
 
 Item = TypeVar('Item')
@@ -38,3 +42,21 @@ class PaginationOutputMapper:
             last_page=result.last_page,
             per_page=result.per_page,
         )
+
+
+@dataclass(frozen=True, slots=True)
+class BatchItemError:
+    index: int
+    errors: ErrorFields
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceVersion:
+    etag: str
+    last_modified: datetime
+
+    @staticmethod
+    def of(change: ChangeVersion, *parts: Any) -> 'ResourceVersion':
+        digest = hashlib.sha1(
+            repr((change.tag, *parts)).encode(), usedforsecurity=False)
+        return ResourceVersion(etag=digest.hexdigest(), last_modified=change.last_modified)
@@ -0,0 +1,267 @@
+from abc import ABC
+import abc
+import copy
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from core.__seedwork.application.use_cases import UseCase, record_stages
+
+Proceed = Callable[[Any], Any]
+
+
+class Interceptor(ABC):  # pylint: disable=too-few-public-methods
+
+    @abc.abstractmethod
+    def intercept(self, use_case: UseCase, request: Any, proceed: Proceed) -> Any:
+        raise NotImplementedError()
+
+
+def use_case_name(use_case: UseCase) -> str:
+    return type(use_case).__name__
+
+
+@dataclass(frozen=True, slots=True)
+class InterceptedUseCase(UseCase):
+    use_case: UseCase
+    interceptors: Tuple[Interceptor, ...]
+    _proceed: Proceed = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        proceed = self.use_case.execute
+        for interceptor in reversed(self.interceptors):
+            proceed = _bind(interceptor, self.use_case, proceed)
+        object.__setattr__(self, '_proceed', proceed)
+
+    def execute(self, request: Any) -> Any:
+        return self._proceed(request)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'use_case':
+            raise AttributeError(name)
+        return getattr(self.use_case, name)
+
+
+def _bind(interceptor: Interceptor, use_case: UseCase, proceed: Proceed) -> Proceed:
+    def call(request: Any) -> Any:
+        return interceptor.intercept(use_case, request, proceed)
+    return call
+
+
+@dataclass(frozen=True, slots=True)
+class InterceptorChain:
+    interceptors: Tuple[Interceptor, ...] = ()
+
+    def wrap(self, use_case: UseCase) -> UseCase:
+        if not self.interceptors:
+            return use_case
+        return InterceptedUseCase(use_case, self.interceptors)
+
+    @staticmethod
+    def from_config(
+        config: Optional[Dict[str, Any]],
+        metrics: 'UseCaseMetrics',
+        extra: Sequence[Interceptor] = ()
+    ) -> 'InterceptorChain':
+        config = config or {}
+        interceptors = list(extra)
+        if config.get('call_count'):
+            interceptors.append(CallCountInterceptor(metrics))
+        if config.get('timing'):
+            interceptors.append(TimingInterceptor(metrics))
+        if config.get('slow_call_threshold_ms') is not None:
+            interceptors.append(SlowCallLoggingInterceptor(
+                threshold=config['slow_call_threshold_ms'] / 1000))
+        if config.get('single_flight'):
+            interceptors.append(SingleFlightInterceptor())
+        return InterceptorChain(tuple(interceptors))
+
+
+@dataclass(slots=True)
+class UseCaseStats:
+    calls: int = 0
+    errors: int = 0
+    timed_calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timed_calls': self.timed_calls,
+            'total_time': self.total_time,
+            'avg_time': self.total_time / self.timed_calls if self.timed_calls else 0.0,
+            'max_time': self.max_time,
+            'stages': dict(self.stages),
+        }
+
+
+class UseCaseMetrics:
+
+    def __init__(self):
+        self._stats: Dict[str, UseCaseStats] = {}
+        self._lock = threading.Lock()
+
+    def record_call(self, name: str, failed: bool) -> None:
+        with self._lock:
+            stats = self.__get_or_create(name)
+            stats.calls += 1
+            if failed:
+                stats.errors += 1
+
+    def record_timing(self, name: str, elapsed: float, stages: Dict[str, float]) -> None:
+        with self._lock:
+            stats = self.__get_or_create(name)
+            stats.timed_calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            for stage_name, stage_elapsed in stages.items():
+                stats.stages[stage_name] = stats.stages.get(
+                    stage_name, 0.0) + stage_elapsed
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stats = self._stats.get(name)
+            return stats.to_dict() if stats else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def __get_or_create(self, name: str) -> UseCaseStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = UseCaseStats()
+        return stats
+
+
+@dataclass(frozen=True, slots=True)
+class CallCountInterceptor(Interceptor):
+    metrics: UseCaseMetrics
+
+    def intercept(self, use_case: UseCase, request: Any, proceed: Proceed) -> Any:
+        try:
+            output = proceed(request)
+        except Exception:
+            self.metrics.record_call(use_case_name(use_case), failed=True)
+            raise
+        self.metrics.record_call(use_case_name(use_case), failed=False)
+        return output
+
+
+@dataclass(frozen=True, slots=True)
+class TimingInterceptor(Interceptor):
+    metrics: UseCaseMetrics
+
+    def intercept(self, use_case: UseCase, request: Any, proceed: Proceed) -> Any:
+        with record_stages() as recorder:
+            start = time.perf_counter()
+            try:
+                return proceed(request)
+            finally:
+                self.metrics.record_timing(
+                    use_case_name(use_case),
+                    time.perf_counter() - start,
+                    recorder.durations
+                )
+
+
+@dataclass(frozen=True, slots=True)
+class SlowCallLoggingInterceptor(Interceptor):
+    threshold: float
+    logger: logging.Logger = field(
+        default_factory=lambda: logging.getLogger('core.use_cases.slow'))
+
+    def intercept(self, use_case: UseCase, request: Any, proceed: Proceed) -> Any:
+        start = time.perf_counter()
+        try:
+            return proceed(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold:
+                self.logger.warning(
+                    '%s took %.2fms (threshold %.2fms)',
+                    use_case_name(use_case),
+                    elapsed * 1000,
+                    self.threshold * 1000
+                )
+
+
+@dataclass(slots=True)
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    output: Any = None
+    error: Optional[BaseException] = None
+    waiters: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class SingleFlightInterceptor(Interceptor):
+    """Lets concurrent calls with the same key share one execution: the
+    first caller runs the use case and the others wait for its output, or
+    get a copy of its exception raised, chained to the original so each
+    waiter keeps its own traceback. Use cases opt in by defining
+    `coalescing_key(request)`; calls without a key run on their own.
+
+    Waiters receive the very same output object, so outputs must not be
+    mutated by callers."""
+    _flights: Dict[Tuple[int, Hashable], _Flight] = field(
+        default_factory=dict, repr=False, compare=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False)
+
+    def intercept(self, use_case: UseCase, request: Any, proceed: Proceed) -> Any:
+        coalescing_key = getattr(use_case, 'coalescing_key', None)
+        key = coalescing_key(request) if coalescing_key is not None else None
+        if key is None:
+            return proceed(request)
+
+        key = (id(use_case), key)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise _copy_error(flight.error) from flight.error
+            return flight.output
+
+        try:
+            flight.output = proceed(request)
+            return flight.output
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(flight.waiters for flight in self._flights.values())
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    try:
+        return copy.copy(error)
+    except Exception:  # pylint: disable=broad-except
+        # not rebuildable from its args, the waiter raises the leader's
+        return error
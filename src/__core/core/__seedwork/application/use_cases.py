@@ -1,6 +1,9 @@
 from abc import ABC
 import abc
-from typing import Generic, TypeVar
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import time
+from typing import Dict, Generic, Iterator, Optional, TypeVar
 
 Input = TypeVar('Input')
 Output = TypeVar('Output')
@@ -10,3 +13,52 @@ class UseCase(Generic[Input, Output], ABC):
     @abc.abstractmethod
     def execute(self, request: Input) -> Output:
         raise NotImplementedError()
+
+
+class StageRecorder:
+    __slots__ = ('durations',)
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    def add(self, name: str, elapsed: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + elapsed
+
+
+class _Stage:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder: StageRecorder, name: str):
+        self.recorder = recorder
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_current_recorder: ContextVar[Optional[StageRecorder]] = ContextVar(
+    'stage_recorder', default=None)
+_NULL_STAGE = nullcontext()
+
+
+def stage(name: str):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return _Stage(recorder, name)
+
+
+@contextmanager
+def record_stages() -> Iterator[StageRecorder]:
+    recorder = StageRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
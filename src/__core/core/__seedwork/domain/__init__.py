@@ -1,5 +1,8 @@
 from .entities import *
 from .exceptions import *
+from .text import *
+from .specifications import *
+from .indexes import *
 from .repositories import *
 from .validators import *
 from .value_objects import *
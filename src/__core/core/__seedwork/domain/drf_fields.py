@@ -0,0 +1,62 @@
+import os
+
+from django.conf import ENVIRONMENT_VARIABLE, settings
+from rest_framework.fields import BooleanField, CharField, Field
+from core.__seedwork.domain.entities import UniqueEntityId
+
+# outside a Django project (plain core usage, core tests) DRF still needs
+# settings; inside one, leave them to DJANGO_SETTINGS_MODULE
+if not settings.configured and not os.environ.get(ENVIRONMENT_VARIABLE):
+    settings.configure(
+        USE_I18N=False
+    )
+
+
+class UniqueEntityIdField(Field):
+    default_error_messages = {
+        'invalid': 'Must be a instance of UniqueEntityId.'
+    }
+
+    def to_internal_value(self, data):
+        # We're lenient with allowing basic numerics to be coerced into strings,
+        # but other types should fail. Eg. unclear if booleans should represent as `true` or `True`,
+        # and composites such as lists are likely user error.
+        if not isinstance(data, UniqueEntityId):
+            self.fail('invalid')
+        return data
+
+    def to_representation(self, value):
+        return value
+
+
+class StrictCharField(CharField):
+    def to_internal_value(self, data):
+        # We're lenient with allowing basic numerics to be coerced into strings,
+        # but other types should fail. Eg. unclear if booleans should represent as `true` or `True`,
+        # and composites such as lists are likely user error.
+        if not isinstance(data, str):
+            self.fail('invalid')
+        return super().to_internal_value(data)
+
+
+class StrictBooleanField(BooleanField):
+    def to_internal_value(self, data):
+        try:
+            if data is True:
+                return True
+            if data is False:
+                return False
+            if data is None and self.allow_null:
+                return None
+        except TypeError:
+            pass
+        self.fail('invalid', input=data)
+
+    def to_representation(self, value):
+        if value in self.TRUE_VALUES:
+            return True
+        elif value in self.FALSE_VALUES:
+            return False
+        if value in self.NULL_VALUES and self.allow_null:
+            return None
+        return bool(value)
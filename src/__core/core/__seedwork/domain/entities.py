@@ -1,6 +1,6 @@
 
 from abc import ABC
-from dataclasses import Field, dataclass, asdict, field
+from dataclasses import MISSING, Field, dataclass, asdict, field, fields
 from typing import Any
 
 from core.__seedwork.domain.value_objects import UniqueEntityId
@@ -26,6 +26,21 @@ class Entity(ABC):
         dict_entity['id'] = str(self.id)
         return dict_entity
 
+    @classmethod
+    def restore(cls, **props: Any) -> 'Entity':
+        """Rebuilds an entity from state that was valid when it was stored,
+        without running __post_init__ (and so without validation)."""
+        entity = object.__new__(cls)
+        for entity_field in fields(cls):
+            if entity_field.name in props:
+                value = props[entity_field.name]
+            elif entity_field.default_factory is not MISSING:
+                value = entity_field.default_factory()
+            else:
+                value = entity_field.default
+            object.__setattr__(entity, entity_field.name, value)
+        return entity
+
     @classmethod
     def get_field(cls, entity_field: str) -> Field:
         # pylint: disable=no-member
@@ -0,0 +1,624 @@
+from abc import ABC
+import abc
+from array import array
+import bisect
+from dataclasses import dataclass
+import itertools
+import math
+import threading
+from typing import Any, Dict, Generic, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, TypeVar
+
+from core.__seedwork.domain.entities import Entity
+from core.__seedwork.domain.exceptions import NotImplementedException
+from core.__seedwork.domain.specifications import Contains, Equals, FullText, Fuzzy, Range, Specification, StartsWith
+from core.__seedwork.domain.text import DEFAULT_ANALYZER, Analyzer, BKTree, word_tokenize
+
+ET = TypeVar('ET', bound=Entity)
+
+
+class Index(ABC):
+    """Maps the values of one entity field to rows, the numbers a
+    QueryPlanner gives its entities in insertion order. Lookups may return
+    rows that no longer match, never miss one that does: the planner checks
+    the whole specification on what an index returns, except the part an
+    `exact` index answered.
+
+    Entities are often changed in place before the repository is told, so
+    an index removes a row by the value it indexed, not by reading the
+    entity again."""
+
+    # lookup returns the rows that matched when they were last indexed and
+    # no others; worth it where checking a row costs more than a lookup
+    exact = False
+
+    def __init__(self, field: str):
+        self.field = field
+
+    @property
+    def name(self) -> str:
+        return f'{type(self).__name__}({self.field})'
+
+    @abc.abstractmethod
+    def supports(self, spec: Specification) -> bool:
+        raise NotImplementedException()
+
+    @abc.abstractmethod
+    def estimate(self, spec: Specification) -> int:
+        """Upper bound of the rows lookup(spec) returns, cheap to compute."""
+        raise NotImplementedException()
+
+    @abc.abstractmethod
+    def lookup(self, spec: Specification) -> Iterable[int]:
+        raise NotImplementedException()
+
+    @abc.abstractmethod
+    def add(self, row: int, entity: Any) -> None:
+        raise NotImplementedException()
+
+    @abc.abstractmethod
+    def remove(self, row: int) -> None:
+        raise NotImplementedException()
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedException()
+
+    def build(self, rows: Iterable[Tuple[int, Any]]) -> None:
+        """Replaces the contents of the index with `rows`."""
+        self.clear()
+        for row, entity in rows:
+            self.add(row, entity)
+
+    def stale(self) -> bool:
+        """True once the index would rather be built again than updated."""
+        return False
+
+
+class UniqueIndex(Index):
+    """Equality on a field no two entities share, such as the id."""
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.rows: Dict[Hashable, int] = {}
+        self.values: Dict[int, Hashable] = {}
+
+    def clear(self) -> None:
+        self.rows, self.values = {}, {}
+
+    def supports(self, spec: Specification) -> bool:
+        return isinstance(spec, Equals) and spec.field == self.field
+
+    def estimate(self, spec: Equals) -> int:
+        return int(spec.value in self.rows)
+
+    def lookup(self, spec: Equals) -> Iterable[int]:
+        row = self.rows.get(spec.value)
+        return () if row is None else (row,)
+
+    def add(self, row: int, entity: Any) -> None:
+        value = self.values[row] = getattr(entity, self.field)
+        self.rows[value] = row
+
+    def remove(self, row: int) -> None:
+        self.rows.pop(self.values.pop(row), None)
+
+
+class BooleanIndex(Index):
+    """One row set per value, for flags and other fields with a handful of
+    distinct values."""
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.rows: Dict[Hashable, Set[int]] = {}
+        self.values: Dict[int, Hashable] = {}
+
+    def clear(self) -> None:
+        self.rows, self.values = {}, {}
+
+    def supports(self, spec: Specification) -> bool:
+        return isinstance(spec, Equals) and spec.field == self.field
+
+    def estimate(self, spec: Equals) -> int:
+        return len(self.rows.get(spec.value, ()))
+
+    def lookup(self, spec: Equals) -> Iterable[int]:
+        return self.rows.get(spec.value, ())
+
+    def add(self, row: int, entity: Any) -> None:
+        value = self.values[row] = getattr(entity, self.field)
+        self.rows.setdefault(value, set()).add(row)
+
+    def remove(self, row: int) -> None:
+        self.rows[self.values.pop(row)].discard(row)
+
+
+class SortedIndex(Index):
+    """Values kept sorted next to their rows, for ranges and equality on
+    ordered fields. Entities without a value are left out, as neither
+    specification matches them."""
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.keys: List[Any] = []
+        self.rows: List[int] = []
+        self.values: Dict[int, Any] = {}
+
+    def clear(self) -> None:
+        self.keys, self.rows, self.values = [], [], {}
+
+    def supports(self, spec: Specification) -> bool:
+        return isinstance(spec, (Equals, Range)) and spec.field == self.field \
+            and not (isinstance(spec, Equals) and spec.value is None)
+
+    def estimate(self, spec: Equals | Range) -> int:
+        low, high = self.__bounds(spec)
+        return max(high - low, 0)
+
+    def lookup(self, spec: Equals | Range) -> Iterable[int]:
+        low, high = self.__bounds(spec)
+        return self.rows[low:high]
+
+    def add(self, row: int, entity: Any) -> None:
+        value = self._value(entity)
+        if value is None:
+            return
+        self.values[row] = value
+        position = bisect.bisect_right(self.keys, value)
+        self.keys.insert(position, value)
+        self.rows.insert(position, row)
+
+    def remove(self, row: int) -> None:
+        value = self.values.pop(row, None)
+        if value is None:
+            return
+        low = bisect.bisect_left(self.keys, value)
+        high = bisect.bisect_right(self.keys, value, low)
+        position = self.rows.index(row, low, high)
+        del self.keys[position]
+        del self.rows[position]
+
+    def build(self, rows: Iterable[Tuple[int, Any]]) -> None:
+        # one sort instead of one insort per entity
+        pairs = sorted(
+            ((value, row) for row, entity in rows
+             if (value := self._value(entity)) is not None),
+            key=lambda pair: pair[0])
+        self.keys = [value for value, _ in pairs]
+        self.rows = [row for _, row in pairs]
+        self.values = {row: value for value, row in pairs}
+
+    def __bounds(self, spec: Equals | Range) -> Tuple[int, int]:
+        gte, lte = (spec.value, spec.value) if isinstance(spec, Equals) else (spec.gte, spec.lte)
+        low = 0 if gte is None else bisect.bisect_left(self.keys, gte)
+        high = len(self.keys) if lte is None else bisect.bisect_right(self.keys, lte)
+        return low, high
+
+    def _value(self, entity: Any) -> Any:
+        return getattr(entity, self.field)
+
+
+class PrefixIndex(SortedIndex):
+    """The lowercased values of a text field kept sorted, for StartsWith:
+    the values with a prefix are one run of keys found by bisection, so a
+    lookup returns them in order without looking at the others."""
+    exact = True
+
+    def supports(self, spec: Specification) -> bool:
+        return isinstance(spec, StartsWith) and spec.field == self.field
+
+    def estimate(self, spec: StartsWith) -> int:
+        low, high = self.__bounds(spec)
+        return high - low
+
+    def lookup(self, spec: StartsWith) -> Iterable[int]:
+        # lazily, so taking the first few is not a copy of the whole run
+        low, high = self.__bounds(spec)
+        rows = self.rows
+        return (rows[position] for position in range(low, high))
+
+    def _value(self, entity: Any) -> Any:
+        value = getattr(entity, self.field)
+        return None if value is None else value.lower()
+
+    def __bounds(self, spec: StartsWith) -> Tuple[int, int]:
+        prefix = spec.value.lower()
+        low = bisect.bisect_left(self.keys, prefix)
+        return low, bisect.bisect_left(self.keys, prefix + '\U0010ffff', low)
+
+
+class NGramIndex(Index):
+    """Rows by the lowercased n-grams of a text field, for case-insensitive
+    substring search; terms shorter than `n` cannot use it.
+
+    Postings are append-only arrays of rows, a fraction of the memory of
+    sets: rows of changed or removed entities stay behind and are filtered
+    out by the planner, until there are more of them than live rows."""
+
+    def __init__(self, field: str, n: int = 3):
+        super().__init__(field)
+        self.n = n
+        self.postings: Dict[str, array] = {}
+        self.live = 0
+        self.dead = 0
+
+    def clear(self) -> None:
+        self.postings = {}
+        self.live = self.dead = 0
+
+    def supports(self, spec: Specification) -> bool:
+        return isinstance(spec, Contains) and spec.field == self.field \
+            and len(spec.value) >= self.n
+
+    def estimate(self, spec: Contains) -> int:
+        return min(len(self.postings.get(gram, ())) for gram in self.__grams(spec.value))
+
+    def lookup(self, spec: Contains) -> Iterable[int]:
+        # the shortest posting; the planner checks the whole term
+        return min((self.postings.get(gram, ()) for gram in self.__grams(spec.value)), key=len)
+
+    def add(self, row: int, entity: Any) -> None:
+        text = getattr(entity, self.field)
+        self.live += 1
+        if text is None:
+            return
+        for gram in self.__grams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('I')
+            posting.append(row)
+
+    def remove(self, row: int) -> None:
+        self.live -= 1
+        self.dead += 1
+
+    def stale(self) -> bool:
+        return self.dead > max(self.live, 1000)
+
+    def __grams(self, text: str) -> Set[str]:
+        text = text.lower()
+        return {text[start:start + self.n] for start in range(len(text) - self.n + 1)}
+
+
+class FullTextIndex(Index):
+    """An inverted index of analyzed terms over text fields, answering
+    FullText specifications and scoring their matches with BM25.
+
+    A term found in a field counts `weight` times, so a field weighing 2
+    ranks a match twice as high before saturation. Like NGramIndex,
+    postings are append-only arrays: a changed entity is indexed again
+    under a new document number and its old document is left dead, which
+    keeps add and remove independent of the size of the index. Dead
+    documents still count towards document frequencies until the index is
+    rebuilt, a small error in the ranking only.
+
+    Checking a row means analyzing its text again, so lookups are exact:
+    they intersect the postings of every term."""
+    exact = True
+
+    def __init__(self, fields: Mapping[str, float], analyzer: Analyzer = DEFAULT_ANALYZER,
+                 k1: float = 1.2, b: float = 0.75):
+        super().__init__('+'.join(fields))
+        self.weights = dict(fields)
+        self.analyzer = analyzer
+        self.k1 = k1
+        self.b = b
+        self.clear()
+
+    @classmethod
+    def of(cls, spec: FullText, entities: Sequence[Any]) -> 'FullTextIndex':
+        """A throwaway index over `entities`, rows being their positions,
+        for ranking where no index was kept."""
+        index = cls(dict.fromkeys(spec.fields, 1.0), spec.analyzer)
+        index.build(enumerate(entities))
+        return index
+
+    def clear(self) -> None:
+        # term: (documents, weighted term frequencies)
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        # live document: (row, length)
+        self.documents: Dict[int, Tuple[int, float]] = {}
+        self.document_of: Dict[int, int] = {}
+        self.next_document = 0
+        self.total_length = 0.0
+        self.dead = 0
+
+    def supports(self, spec: Specification) -> bool:
+        return isinstance(spec, FullText) and set(spec.fields) == set(self.weights) \
+            and spec.analyzer == self.analyzer and bool(spec.terms())
+
+    def estimate(self, spec: FullText) -> int:
+        return min(len(self.postings.get(term, ((),))[0]) for term in spec.terms())
+
+    def lookup(self, spec: FullText) -> Iterable[int]:
+        documents = self.documents
+        rarest, *others = sorted(
+            (self.postings.get(term, ((),))[0] for term in spec.terms()), key=len)
+        found = {document for document in rarest if document in documents}
+        for posting in others:
+            if not found:
+                break
+            found.intersection_update(posting)
+        return [documents[document][0] for document in found]
+
+    def add(self, row: int, entity: Any) -> None:
+        frequencies: Dict[str, float] = {}
+        for field, weight in self.weights.items():
+            for term in self.analyzer.analyze(getattr(entity, field)):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+        document = self.next_document
+        self.next_document += 1
+        length = sum(frequencies.values())
+        self.documents[document] = (row, length)
+        self.document_of[row] = document
+        self.total_length += length
+        for term, frequency in frequencies.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array('I'), array('f'))
+            posting[0].append(document)
+            posting[1].append(frequency)
+
+    def remove(self, row: int) -> None:
+        document = self.document_of.pop(row, None)
+        if document is None:
+            return
+        _, length = self.documents.pop(document)
+        self.total_length -= length
+        self.dead += 1
+
+    def stale(self) -> bool:
+        return self.dead > max(len(self.documents), 1000)
+
+    def score(self, spec: FullText, rows: Sequence[Optional[int]]) -> List[float]:
+        """BM25 scores of `rows`, in their order; rows the index does not
+        hold score 0."""
+        wanted = {
+            self.document_of[row]: position for position, row in enumerate(rows)
+            if row in self.document_of}
+        scores = [0.0] * len(rows)
+        count = len(self.documents)
+        average_length = (self.total_length / count if count else 0.0) or 1.0
+        k1, b, documents = self.k1, self.b, self.documents
+        for term in spec.terms():
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            document_frequency = min(len(posting[0]), count)
+            idf = math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+            for document, frequency in zip(*posting):
+                position = wanted.get(document)
+                if position is not None:
+                    norm = k1 * (1 - b + b * documents[document][1] / average_length)
+                    scores[position] += idf * frequency * (k1 + 1) / (frequency + norm)
+        return scores
+
+
+class FuzzyIndex(Index):
+    """Rows by the lowercased words of a text field, with a BKTree over
+    the words, for Fuzzy specifications: a lookup compares the query with a
+    fraction of the distinct words instead of every row's text.
+
+    Words cannot be taken out of the tree, so the words no row has any more
+    stay in it until there are more of them than words in use. Rows are
+    kept in sets, which makes lookups exact."""
+    exact = True
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.clear()
+
+    def clear(self) -> None:
+        self.tree = BKTree()
+        self.rows: Dict[str, Set[int]] = {}
+        self.values: Dict[int, Tuple[str, ...]] = {}
+        self.unused = 0
+        # the words matched by the last spec, as plan and lookup run one
+        # after the other; only a new word can change them
+        self._matches: Optional[Tuple[Fuzzy, List[List[str]]]] = None
+
+    def supports(self, spec: Specification) -> bool:
+        return isinstance(spec, Fuzzy) and spec.field == self.field and bool(spec.words())
+
+    def estimate(self, spec: Fuzzy) -> int:
+        return min(sum(len(self.rows[word]) for word in words) for words in self.__matches(spec))
+
+    def lookup(self, spec: Fuzzy) -> Iterable[int]:
+        rarest, *others = sorted(
+            (set().union(*(self.rows[word] for word in words)) for words in self.__matches(spec)),
+            key=len)
+        return rarest.intersection(*others)
+
+    def add(self, row: int, entity: Any) -> None:
+        text = getattr(entity, self.field)
+        words = self.values[row] = tuple(set(word_tokenize(text))) if text is not None else ()
+        for word in words:
+            rows = self.rows.get(word)
+            if rows is None:
+                rows = self.rows[word] = set()
+                self.tree.add(word)
+                self._matches = None
+            elif not rows:
+                self.unused -= 1
+            rows.add(row)
+
+    def remove(self, row: int) -> None:
+        for word in self.values.pop(row, ()):
+            rows = self.rows[word]
+            rows.discard(row)
+            if not rows:
+                self.unused += 1
+
+    def stale(self) -> bool:
+        return self.unused > max(len(self.rows) - self.unused, 1000)
+
+    def __matches(self, spec: Fuzzy) -> List[List[str]]:
+        """The words of the field each word of `spec` matches."""
+        if self._matches is None or self._matches[0] != spec:
+            self._matches = (spec, [
+                [match for match, _ in self.tree.search(word, distance)]
+                for word, distance in spec.words()])
+        return self._matches[1]
+
+
+@dataclass(frozen=True, slots=True)
+class Plan:
+    """How a specification is answered: from `index`, which returns about
+    `estimate` rows to check, or by scanning every entity when it is None."""
+    index: Optional[str]
+    spec: Optional[Specification]
+    estimate: int
+
+
+class QueryPlanner(Generic[ET]):
+    """Answers specifications over a repository's entities from indexes.
+
+    For each conjunct it asks the indexes that support it how many rows
+    they would return, uses the most selective one and checks the whole
+    specification on those rows only. When even the best index returns
+    more than `scan_ratio` of the entities, scanning them all is cheaper.
+
+    An index is only built the first time a plan could use it, and is then
+    kept up to date by add/update/remove. Results come in insertion order,
+    as a scan would return them."""
+
+    def __init__(self, indexes: Sequence[Index], entities: Iterable[ET], scan_ratio: float = 0.25):
+        self.scan_ratio = scan_ratio
+        self._unbuilt: List[Index] = list(indexes)
+        self._indexes: List[Index] = []
+        self._rows: Dict[int, ET] = {}
+        self._row_of: Dict[str, int] = {}
+        self._next_row = 0
+        self._lock = threading.RLock()
+        # what the owner last saw of its entities, to tell whether the
+        # planner is still in step with them
+        self.token: Any = None
+        self.add(entities)
+
+    @classmethod
+    def over(cls, indexes: Sequence[Index], rows: Mapping[int, ET], row_of: Mapping[str, int],
+             scan_ratio: float = 0.25) -> 'QueryPlanner[ET]':
+        """A planner over entities its owner keeps and never changes: it
+        reads them from `rows` by row as indexes are built and lookups
+        checked, and finds the row of an id in `row_of`, rather than keep
+        references to them all. It is built again instead of being told
+        about writes."""
+        planner = cls(indexes, (), scan_ratio)
+        planner._rows = rows
+        planner._row_of = row_of
+        return planner
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, entities: Iterable[ET]) -> None:
+        with self._lock:
+            for entity in entities:
+                row = self._next_row
+                self._next_row += 1
+                self._rows[row] = entity
+                self._row_of[entity.id] = row
+                for index in self._indexes:
+                    index.add(row, entity)
+
+    def update(self, entity: ET) -> None:
+        with self._lock:
+            row = self._row_of[entity.id]
+            self._rows[row] = entity
+            for index in self._indexes:
+                index.remove(row)
+                index.add(row, entity)
+            self.__rebuild_stale()
+
+    def remove(self, entity_id: str) -> None:
+        with self._lock:
+            row = self._row_of.pop(entity_id)
+            del self._rows[row]
+            for index in self._indexes:
+                index.remove(row)
+            self.__rebuild_stale()
+
+    def plan(self, spec: Specification) -> Plan:
+        with self._lock:
+            scan = Plan(index=None, spec=None, estimate=len(self._rows))
+            # an exact index saves checking its conjunct on every row, so it
+            # beats a scan however many rows it returns
+            best = exact = scan
+            for conjunct in spec.conjuncts():
+                for index in self.__supporting(conjunct):
+                    estimate = index.estimate(conjunct)
+                    if estimate < best.estimate:
+                        best = Plan(index=index.name, spec=conjunct, estimate=estimate)
+                    if index.exact and (exact is scan or estimate < exact.estimate):
+                        exact = Plan(index=index.name, spec=conjunct, estimate=estimate)
+            if best.index is None or best.estimate > self.scan_ratio * len(self._rows):
+                return exact
+            return best
+
+    def select(self, spec: Specification) -> List[ET]:
+        with self._lock:
+            plan = self.plan(spec)
+            if plan.index is None:
+                return [entity for entity in self._rows.values() if spec.is_satisfied_by(entity)]
+            index = self.__index(plan.index)
+            checks = [conjunct for conjunct in spec.conjuncts()
+                      if not (index.exact and conjunct is plan.spec)]
+            rows = self._rows
+            return [
+                entity for entity in (
+                    rows.get(row) for row in sorted(set(index.lookup(plan.spec))))
+                if entity is not None and all(check.is_satisfied_by(entity) for check in checks)
+            ]
+
+    def take(self, spec: Specification, limit: int) -> List[ET]:
+        """The first `limit` entities that satisfy `spec`, in the order of
+        the index the plan uses, sorted for SortedIndex and PrefixIndex,
+        or in insertion order when it scans; stops looking once it has
+        them."""
+        with self._lock:
+            plan = self.plan(spec)
+            rows = self._rows
+            if plan.index is None:
+                candidates, checks = iter(rows.values()), list(spec.conjuncts())
+            else:
+                index = self.__index(plan.index)
+                candidates = (rows.get(row) for row in self.__unique(index.lookup(plan.spec)))
+                checks = [conjunct for conjunct in spec.conjuncts()
+                          if not (index.exact and conjunct is plan.spec)]
+            return list(itertools.islice((
+                entity for entity in candidates
+                if entity is not None and all(check.is_satisfied_by(entity) for check in checks)
+            ), limit))
+
+    def score(self, spec: FullText, entities: Sequence[ET]) -> List[float]:
+        """BM25 scores of `entities` for `spec`, in their order, with term
+        statistics over all the planner's entities."""
+        with self._lock:
+            index = next((index for index in self.__supporting(spec)
+                          if isinstance(index, FullTextIndex)), None)
+            if index is None:
+                return FullTextIndex.of(spec, entities).score(spec, range(len(entities)))
+            return index.score(spec, [self._row_of.get(entity.id) for entity in entities])
+
+    @staticmethod
+    def __unique(rows: Iterable[int]) -> Iterator[int]:
+        # an entity changed in place is appended again to NGramIndex postings
+        seen: Set[int] = set()
+        for row in rows:
+            if row not in seen:
+                seen.add(row)
+                yield row
+
+    def __index(self, name: str) -> Index:
+        return next(index for index in self._indexes if index.name == name)
+
+    def __supporting(self, spec: Specification) -> List[Index]:
+        for index in [index for index in self._unbuilt if index.supports(spec)]:
+            index.build(self._rows.items())
+            self._unbuilt.remove(index)
+            self._indexes.append(index)
+        return [index for index in self._indexes if index.supports(spec)]
+
+    def __rebuild_stale(self) -> None:
+        for index in self._indexes:
+            if index.stale():
+                index.build(self._rows.items())
@@ -3,31 +3,58 @@
 from abc import ABC
 import abc
 from dataclasses import Field, asdict, dataclass, field, fields
+from datetime import datetime, timezone
+import contextlib
 import enum
+import itertools
 import math
-from typing import Any, Generic, List, NewType, Optional, Type, TypeVar
+import threading
+from typing import Any, Dict, Generic, Iterator, List, NewType, Optional, Tuple, Type, TypeVar
+import uuid
 from core.__seedwork.domain.entities import Entity
 from core.__seedwork.domain.exceptions import NotFoundException, NotImplementedException
+from core.__seedwork.domain.indexes import FullTextIndex, Index, QueryPlanner
+from core.__seedwork.domain.specifications import FullText, Specification
 from core.__seedwork.domain.value_objects import UniqueEntityId
 
 ET = TypeVar('ET', bound=Entity)
+# sorts by how well entities match the FullText specifications of the filter
+RELEVANCE = 'relevance'
 #teste = NewType('teste',Entity)
 
 
+@dataclass(frozen=True, slots=True)
+class ChangeVersion:
+    tag: str
+    last_modified: datetime
+
+
 class RepositoryInterface(Generic[ET], ABC):
 
     @abc.abstractmethod
     def insert(self, entity: ET) -> None:
         raise NotImplementedException
 
+    @abc.abstractmethod
+    def bulk_insert(self, entities: List[ET]) -> None:
+        raise NotImplementedException
+
     @abc.abstractmethod
     def find_by_id(self, entity_id: str | UniqueEntityId) -> ET:
         raise NotImplementedException
 
+    @abc.abstractmethod
+    def find_by_ids(self, entity_ids: List[str | UniqueEntityId]) -> List[ET]:
+        raise NotImplementedException
+
     @abc.abstractmethod
     def find_all(self) -> List[ET]:
         raise NotImplementedException
 
+    @abc.abstractmethod
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[ET]]:
+        raise NotImplementedException
+
     @abc.abstractmethod
     def update(self, entity: ET) -> None:
         raise NotImplementedException
@@ -36,6 +63,14 @@ class RepositoryInterface(Generic[ET], ABC):
     def delete(self, entity_id: str | UniqueEntityId) -> None:
         raise NotImplementedException
 
+    @abc.abstractmethod
+    def change_version(self) -> ChangeVersion:
+        raise NotImplementedException
+
+    @abc.abstractmethod
+    def entity_version(self, entity_id: str | UniqueEntityId) -> ChangeVersion:
+        raise NotImplementedException
+
 
 Filter = TypeVar('Filter', str, Any)
 
@@ -55,6 +90,7 @@ class SearchParams(Generic[Filter]):
     sort: Optional[str] = None
     sort_dir: Optional[SortDirection] = None
     filter: Optional[Filter] = None
+    fields: Optional[List[str]] = None
 
     def __post_init__(self):
         self._normalize_page()
@@ -62,6 +98,7 @@ class SearchParams(Generic[Filter]):
         self._normalize_sort()
         self._normalize_sort_dir()
         self._normalize_filter()
+        self._normalize_fields()
 
     def _normalize_page(self):
         page = _int_or_none(self.page)
@@ -85,14 +122,23 @@ class SearchParams(Generic[Filter]):
             return
 
         sort_dir = str(self.sort_dir).lower()
-        self.sort_dir = SortDirection.ASC.value  \
+        default = SortDirection.DESC if self.sort == RELEVANCE else SortDirection.ASC
+        self.sort_dir = default.value  \
             if not SortDirection.ASC.equals(sort_dir) and not SortDirection.DESC.equals(sort_dir) \
             else sort_dir
 
     def _normalize_filter(self):
+        if isinstance(self.filter, Specification):
+            return
         self.filter = None if self.filter is None or self.filter == "" else str(
             self.filter)
 
+    def _normalize_fields(self):
+        names = self.fields.split(',') if isinstance(
+            self.fields, str) else self.fields or []
+        names = (str(name).strip() for name in names)
+        self.fields = list(dict.fromkeys(name for name in names if name)) or None
+
     def _get_field(self, property: str) -> Field:
         class_fields = fields(self)
         for f in class_fields:
@@ -119,6 +165,7 @@ class SearchResult(Generic[ET, Filter]):
     sort: Optional[str] = None
     sort_dir: Optional[str] = None
     filter: Optional[Filter] = None
+    fields: Optional[List[str]] = None
 
     def __post_init__(self):
         self.last_page = math.ceil(self.total/self.per_page)
@@ -133,6 +180,7 @@ class SearchResult(Generic[ET, Filter]):
             'sort': self.sort,
             'sort_dir': self.sort_dir,
             'filter': self.filter,
+            'fields': self.fields,
         }
 
 
@@ -142,35 +190,101 @@ Output = TypeVar('Output')
 
 class SearchableRepositoryInterface(Generic[ET, Input, Output], RepositoryInterface[ET], ABC):
     sortable_fields: List[str] = []
+    selectable_fields: List[str] = []
 
     @abc.abstractmethod
     def search(self, input_params: Input) -> Output:
         raise NotImplementedException
 
 
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 @dataclass(slots=True)
 class InMemoryRepository(RepositoryInterface[ET], ABC):
     items: List[ET] = field(default_factory=lambda: [])
+    # every write bumps the counter; the epoch keeps tags from colliding
+    # across process restarts, when the counter starts over
+    _epoch: str = field(default_factory=lambda: uuid.uuid4().hex[:8],
+                        init=False, repr=False, compare=False)
+    _counter: int = field(default=0, init=False, repr=False, compare=False)
+    _last_modified: datetime = field(default_factory=_utc_now,
+                                     init=False, repr=False, compare=False)
+    _entity_versions: Dict[str, ChangeVersion] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    _version_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     def insert(self, entity: ET) -> None:
         self.items.append(entity)
+        self._touch(entity.id)
+
+    def bulk_insert(self, entities: List[ET]) -> None:
+        self.items.extend(entities)
+        self._touch(*(entity.id for entity in entities))
 
     def find_by_id(self, entity_id: str | UniqueEntityId) -> ET:
         id_str = f"{entity_id}"
         return self._get(id_str)
 
+    def find_by_ids(self, entity_ids: List[str | UniqueEntityId]) -> List[ET]:
+        ids_str = {f"{entity_id}" for entity_id in entity_ids}
+        return [item for item in self.items if item.id in ids_str]
+
     def find_all(self) -> List[ET]:
         return self.items
 
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[ET]]:
+        # a shallow copy taken when the export starts: a delete shifting
+        # the live list would otherwise skip entities nobody touched.
+        # It holds references only, the entities are not copied.
+        items = list(self.items)
+        return (items[offset:offset + chunk_size] for offset in range(0, len(items), chunk_size))
+
     def update(self, entity: ET) -> None:
         entity_found = self._get(entity.id)
         index = self.items.index(entity_found)
         self.items[index] = entity
+        self._touch(entity.id)
 
     def delete(self, entity_id: str | UniqueEntityId) -> None:
         id_str = f"{entity_id}"
         entity = self._get(id_str)
         self.items.remove(entity)
+        with self._version_lock:
+            self._entity_versions.pop(id_str, None)
+            self._bump()
+
+    def change_version(self) -> ChangeVersion:
+        with self._version_lock:
+            return ChangeVersion(
+                tag=f'{self._epoch}-{self._counter}',
+                last_modified=self._last_modified
+            )
+
+    def entity_version(self, entity_id: str | UniqueEntityId) -> ChangeVersion:
+        id_str = f"{entity_id}"
+        version = self._entity_versions.get(id_str)
+        if version is not None:
+            return version
+        # entities assigned straight to `items` were never versioned
+        self._get(id_str)
+        return self.change_version()
+
+    def _touch(self, *entity_ids: str) -> None:
+        with self._version_lock:
+            version = self._bump()
+            for entity_id in entity_ids:
+                self._entity_versions[entity_id] = version
+
+    def _bump(self) -> ChangeVersion:
+        self._counter += 1
+        self._last_modified = _utc_now()
+        return ChangeVersion(
+            tag=f'{self._epoch}-{self._counter}',
+            last_modified=self._last_modified
+        )
 
     def _get(self, entity_id: str) -> ET:
         entity = next(filter(lambda i: i.id == entity_id, self.items), None)
@@ -180,34 +294,161 @@ class InMemoryRepository(RepositoryInterface[ET], ABC):
 
 
 class InMemorySearchableRepository(InMemoryRepository[ET], SearchableRepositoryInterface[ET, SearchParams, SearchResult], ABC):
+    # built by the first search that filters with a Specification, then
+    # kept up to date by the writes below
+    _planner: Optional[QueryPlanner[ET]] = None
+
+    def insert(self, entity: ET) -> None:
+        with self._indexing() as planner:
+            super().insert(entity)
+            if planner:
+                planner.add([entity])
+
+    def bulk_insert(self, entities: List[ET]) -> None:
+        with self._indexing() as planner:
+            super().bulk_insert(entities)
+            if planner:
+                planner.add(entities)
+
+    def update(self, entity: ET) -> None:
+        with self._indexing() as planner:
+            super().update(entity)
+            if planner:
+                planner.update(entity)
+
+    def delete(self, entity_id: str | UniqueEntityId) -> None:
+        with self._indexing() as planner:
+            super().delete(entity_id)
+            if planner:
+                planner.remove(f"{entity_id}")
+
     def search(self, input_params: SearchParams[str]) -> SearchResult[ET, Filter]:
         items_filtered = self._apply_filter(self.items, input_params.filter)
-        items_sorted = self._apply_sort(
-            items_filtered, input_params.sort, input_params.sort_dir)
+        items_sorted = self._apply_relevance(
+            items_filtered, input_params.filter, input_params.sort_dir) \
+            if input_params.sort == RELEVANCE \
+            else self._apply_sort(items_filtered, input_params.sort, input_params.sort_dir)
         items_paginated = self._apply_paginate(
             items_sorted, input_params.page, input_params.per_page)
+        fields_selected = self._select_fields(input_params.fields)
 
         return SearchResult(
-            items=items_paginated,
+            items=self._apply_projection(items_paginated, fields_selected)
+            if fields_selected else items_paginated,
             total=len(items_filtered),
             current_page=input_params.page,
             per_page=input_params.per_page,
             sort=input_params.sort,
             sort_dir=input_params.sort_dir,
             filter=input_params.filter,
+            fields=fields_selected,
         )
 
     @abc.abstractmethod
     def _apply_filter(self, items: List[ET], filter_param: str = None) -> List[ET]:
         raise NotImplementedException
 
+    def _create_indexes(self) -> List[Index]:
+        """The indexes Specification filters may use; none by default."""
+        return []
+
+    def _apply_specification(self, items: List[ET], spec: Specification) -> List[ET]:
+        planner = self._query_planner() if items is self.items else None
+        if planner is None:
+            return [item for item in items if spec.is_satisfied_by(item)]
+        return planner.select(spec)
+
+    def _take(self, spec: Specification, limit: int) -> List[ET]:
+        """See QueryPlanner.take; without indexes, the first matches in
+        insertion order."""
+        planner = self._query_planner()
+        if planner is None:
+            return list(itertools.islice((item for item in self.items if spec.is_satisfied_by(item)), limit))
+        return planner.take(spec, limit)
+
+    def _query_planner(self) -> Optional[QueryPlanner[ET]]:
+        planner = self._planner
+        if planner is None or planner.token != self.__items_token():
+            indexes = self._create_indexes()
+            if not indexes:
+                return None
+            # the token is taken first: a write racing the build makes it stale
+            token = self.__items_token()
+            planner = self._new_query_planner(indexes)
+            planner.token = token
+            self._planner = planner
+        return planner
+
+    def _new_query_planner(self, indexes: List[Index]) -> QueryPlanner[ET]:
+        return QueryPlanner(indexes, list(self.items))
+
+    @contextlib.contextmanager
+    def _indexing(self) -> Iterator[Optional[QueryPlanner[ET]]]:
+        """Yields the planner when it is in step with `items`, so a write
+        can update it, and drops it otherwise. `items` changed any other
+        way (assigned, or replayed by SharedMemoryRepository) no longer
+        matches its token and is indexed again by the next search."""
+        planner = self._planner
+        if planner is not None and planner.token != self.__items_token():
+            planner = self._planner = None
+        yield planner
+        if planner is not None:
+            planner.token = self.__items_token()
+
+    def __items_token(self) -> Tuple[int, int, str, int]:
+        return id(self.items), len(self.items), self._epoch, self._counter
+
     def _apply_sort(self, items: List[ET], sort: str = None, sort_dir: SortDirection = None) -> List[ET]:
         if sort and sort in self.sortable_fields:
             is_reverse = not SortDirection.ASC.equals(sort_dir)
             return sorted(items, key=lambda item: getattr(item, sort), reverse=is_reverse)
         return items
 
+    def _apply_relevance(self, items: List[ET], filter_param: Any = None,
+                         sort_dir: SortDirection = None) -> List[ET]:
+        """Best matches first, ties in the order `items` came in; without
+        a FullText filter there is nothing to rank by and the default sort
+        applies."""
+        scores = self._relevance_scores(items, filter_param)
+        if scores is None:
+            return self._apply_sort(items, None, None)
+        order = sorted(range(len(items)), key=scores.__getitem__,
+                       reverse=not SortDirection.ASC.equals(sort_dir))
+        return [items[position] for position in order]
+
+    @staticmethod
+    def _full_texts(filter_param: Any = None) -> List[FullText]:
+        return [spec for spec in filter_param.conjuncts() if isinstance(spec, FullText)] \
+            if isinstance(filter_param, Specification) else []
+
+    def _relevance_scores(self, items: List[ET], filter_param: Any = None) -> Optional[List[float]]:
+        texts = self._full_texts(filter_param)
+        if not texts:
+            return None
+        planner = self._query_planner()
+        scores = [0.0] * len(items)
+        for spec in texts:
+            spec_scores = planner.score(spec, items) if planner \
+                else FullTextIndex.of(spec, items).score(spec, range(len(items)))
+            scores = [total + score for total, score in zip(scores, spec_scores)]
+        return scores
+
     def _apply_paginate(self, items: List[ET], page: int, per_page: int):
         offset = (page - 1) * per_page
         limit = offset + per_page
         return items[slice(offset, limit)]
+
+    def _select_fields(self, fields_param: List[str] = None) -> Optional[List[str]]:
+        selected = [name for name in fields_param or []
+                    if name == 'id' or name in self.selectable_fields]
+        if not selected:
+            return None
+        # the id always comes first, whether it was asked for or not
+        return ['id', *(name for name in selected if name != 'id')]
+
+    def _apply_projection(self, items: List[ET], fields_selected: List[str]) -> List[Dict[str, Any]]:
+        # reads only the selected attributes, instead of copying whole entities
+        return [
+            {name: getattr(item, name) for name in fields_selected}
+            for item in items
+        ]
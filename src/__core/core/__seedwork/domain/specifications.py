@@ -0,0 +1,132 @@
+from abc import ABC
+import abc
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, Tuple
+
+from core.__seedwork.domain.exceptions import NotImplementedException
+from core.__seedwork.domain.text import DEFAULT_ANALYZER, Analyzer, auto_fuzziness, damerau_levenshtein, word_tokenize
+
+
+class Specification(ABC):
+    """A predicate over entities that search filters are built from;
+    combine them with `&`."""
+
+    @abc.abstractmethod
+    def is_satisfied_by(self, item: Any) -> bool:
+        raise NotImplementedException()
+
+    def conjuncts(self) -> Iterator['Specification']:
+        """The specifications that must all hold, once nested ands are
+        flattened."""
+        yield self
+
+    def __and__(self, other: 'Specification') -> 'AndSpecification':
+        return AndSpecification((*self.conjuncts(), *other.conjuncts()))
+
+
+@dataclass(frozen=True, slots=True)
+class AndSpecification(Specification):
+    specifications: Tuple[Specification, ...]
+
+    def is_satisfied_by(self, item: Any) -> bool:
+        return all(spec.is_satisfied_by(item) for spec in self.specifications)
+
+    def conjuncts(self) -> Iterator[Specification]:
+        for spec in self.specifications:
+            yield from spec.conjuncts()
+
+
+@dataclass(frozen=True, slots=True)
+class Equals(Specification):
+    field: str
+    value: Any
+
+    def is_satisfied_by(self, item: Any) -> bool:
+        return getattr(item, self.field) == self.value
+
+
+@dataclass(frozen=True, slots=True)
+class Contains(Specification):
+    """Case-insensitive substring match on a text field."""
+    field: str
+    value: str
+
+    def is_satisfied_by(self, item: Any) -> bool:
+        text = getattr(item, self.field)
+        return text is not None and self.value.lower() in text.lower()
+
+
+@dataclass(frozen=True, slots=True)
+class StartsWith(Specification):
+    """Case-insensitive prefix match on a text field."""
+    field: str
+    value: str
+
+    def is_satisfied_by(self, item: Any) -> bool:
+        text = getattr(item, self.field)
+        return text is not None and text.lower().startswith(self.value.lower())
+
+
+@dataclass(frozen=True, slots=True)
+class Range(Specification):
+    """`gte <= value <= lte`; a missing bound is open."""
+    field: str
+    gte: Optional[Any] = None
+    lte: Optional[Any] = None
+
+    def is_satisfied_by(self, item: Any) -> bool:
+        value = getattr(item, self.field)
+        return value is not None \
+            and (self.gte is None or value >= self.gte) \
+            and (self.lte is None or value <= self.lte)
+
+
+@dataclass(frozen=True, slots=True)
+class FullText(Specification):
+    """Every term of `query`, once analyzed, appears in one of `fields`.
+    Searches sorted by relevance rank the matches by how well they fit."""
+    query: str
+    fields: Tuple[str, ...]
+    analyzer: Analyzer = DEFAULT_ANALYZER
+    _terms: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_terms', tuple(dict.fromkeys(self.analyzer.analyze(self.query))))
+
+    def terms(self) -> Tuple[str, ...]:
+        return self._terms
+
+    def is_satisfied_by(self, item: Any) -> bool:
+        found = {
+            term for field in self.fields
+            for term in self.analyzer.analyze(getattr(item, field))}
+        return all(term in found for term in self.terms())
+
+
+@dataclass(frozen=True, slots=True)
+class Fuzzy(Specification):
+    """Typo-tolerant match: every word of `value` is at most `max_distance`
+    edits away from a word of the field, ignoring case, where swapping two
+    adjacent letters is one edit (see damerau_levenshtein). Without a
+    `max_distance`, longer words allow more edits, see auto_fuzziness."""
+    field: str
+    value: str
+    max_distance: Optional[int] = None
+    _words: Tuple[Tuple[str, int], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_words', tuple(
+            (word, auto_fuzziness(word) if self.max_distance is None else self.max_distance)
+            for word in dict.fromkeys(word_tokenize(self.value))))
+
+    def words(self) -> Tuple[Tuple[str, int], ...]:
+        """(word, edits allowed) of each distinct word of `value`."""
+        return self._words
+
+    def is_satisfied_by(self, item: Any) -> bool:
+        text = getattr(item, self.field)
+        found = set(word_tokenize(text)) if text is not None else set()
+        return all(
+            any(abs(len(word) - len(other)) <= distance and damerau_levenshtein(word, other) <= distance
+                for other in found)
+            for word, distance in self._words)
@@ -0,0 +1,172 @@
+from dataclasses import dataclass, field
+import re
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+_WORD = re.compile(r'\w+')
+
+
+def word_tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def plural_stem(word: str) -> str:
+    """Folds the plural and singular of English nouns onto one stem, such
+    as movie and movies onto 'movi', and leaves other words alone; much
+    lighter than a full stemmer, so it rarely merges unrelated words."""
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies'):
+        return word[:-3] + 'i'
+    if word.endswith(('sses', 'xes', 'ches', 'shes', 'zes')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    if word.endswith('ie'):
+        return word[:-1]
+    if word.endswith('y'):
+        return word[:-1] + 'i'
+    return word
+
+
+@dataclass(frozen=True, slots=True)
+class Analyzer:
+    """Turns text into the terms a full-text index stores and a query looks
+    up; both sides must use the same analyzer. `tokenizer` and `stemmer`
+    are the hooks for other languages or domains.
+
+    The repr shows `name` in their place, as functions print their address,
+    which differs in each process; versions of searches are derived from
+    reprs, so an analyzer with other hooks needs a name of its own."""
+    name: str = 'default'
+    tokenizer: Callable[[str], List[str]] = field(default=word_tokenize, repr=False)
+    stemmer: Optional[Callable[[str], str]] = field(default=plural_stem, repr=False)
+    stopwords: FrozenSet[str] = field(default_factory=frozenset)
+
+    def analyze(self, text: Optional[str]) -> List[str]:
+        if not text:
+            return []
+        terms = (token for token in self.tokenizer(text) if token not in self.stopwords)
+        return [self.stemmer(term) for term in terms] if self.stemmer else list(terms)
+
+
+DEFAULT_ANALYZER = Analyzer()
+
+
+def levenshtein(first: str, second: str) -> int:
+    """The fewest single character insertions, deletions and substitutions
+    that turn one string into the other."""
+    first, second = _differing(first, second)
+    if len(first) < len(second):
+        first, second = second, first
+    previous = list(range(len(second) + 1))
+    for row, char in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def damerau_levenshtein(first: str, second: str) -> int:
+    """Like levenshtein, also counting the swap of two adjacent characters,
+    the commonest typo, as one edit. Characters may still be edited between
+    swaps, unlike in the optimal string alignment distance, so it is a
+    metric a BKTree can use (Lowrance and Wagner's algorithm)."""
+    first, second = _differing(first, second)
+    if not first or not second:
+        return len(first) + len(second)
+    beyond = len(first) + len(second)
+    # distances[row + 1][column + 1], with a border of `beyond` so swaps
+    # reaching before the start never win
+    distances = [[beyond] * (len(second) + 2)]
+    distances.extend([beyond, row] + [0] * len(second) for row in range(len(first) + 1))
+    distances[1][1:] = range(len(second) + 1)
+    # the last row holding each character of `first`
+    last_row: Dict[str, int] = {}
+    for row in range(1, len(first) + 1):
+        char = first[row - 1]
+        # the last column of this row where the characters matched
+        last_match = 0
+        for column in range(1, len(second) + 1):
+            swapped_row = last_row.get(second[column - 1], 0)
+            swapped_column = last_match
+            if char == second[column - 1]:
+                cost = 0
+                last_match = column
+            else:
+                cost = 1
+            distances[row + 1][column + 1] = min(
+                distances[row][column] + cost,
+                distances[row + 1][column] + 1,
+                distances[row][column + 1] + 1,
+                distances[swapped_row][swapped_column]
+                + (row - swapped_row - 1) + 1 + (column - swapped_column - 1))
+        last_row[char] = row
+    return distances[-1][-1]
+
+
+def _differing(first: str, second: str) -> Tuple[str, str]:
+    # a shared prefix or suffix costs nothing
+    start = 0
+    while start < len(first) and start < len(second) and first[start] == second[start]:
+        start += 1
+    first, second = first[start:], second[start:]
+    while first and second and first[-1] == second[-1]:
+        first, second = first[:-1], second[:-1]
+    return first, second
+
+
+def auto_fuzziness(word: str) -> int:
+    """The edits a typo-tolerant search allows in `word`: none in one or
+    two letters, one up to five, two beyond."""
+    return 0 if len(word) <= 2 else 1 if len(word) <= 5 else 2
+
+
+class BKTree:
+    """Words arranged by their edit distance to one another (a
+    Burkhard-Keller tree). Since the distance is a metric, a search only
+    descends into the children whose distance to their parent is within
+    `max_distance` of the query's, and compares the query with a small
+    part of the words."""
+
+    def __init__(self, distance: Callable[[str, str], int] = damerau_levenshtein):
+        self.distance = distance
+        # (word, {distance to word: child})
+        self.root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, word: str) -> None:
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            return
+        node = self.root
+        while True:
+            distance = self.distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        """(word, distance) of every word within `max_distance` of `word`."""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = self.distance(word, node_word)
+            if distance <= max_distance:
+                found.append((node_word, distance))
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for key, child in children.items() if low <= key <= high)
+        return found
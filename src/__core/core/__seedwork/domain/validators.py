@@ -2,22 +2,27 @@
 from abc import ABC
 import abc
 from dataclasses import dataclass
-from typing import Any, Dict, List
-from attr import field  # terá uma Self na versão 3.11
-from rest_framework.fields import BooleanField, CharField, Field
-from rest_framework.serializers import Serializer
-from django.conf import settings
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
 from core.__seedwork.domain.exceptions import (
     SimpleValidationException,
     NotImplementedException,
     ValidationException
 )
-from core.__seedwork.domain.entities import UniqueEntityId
 
-if not settings.configured:
-    settings.configure(
-        USE_I18N=False
-    )
+if TYPE_CHECKING:
+    from rest_framework.serializers import Serializer
+
+# DRF (and the Django settings it needs) is only imported when one of these
+# is first used, so importing the domain stays cheap for workers and CLIs
+_DRF_FIELDS = ('UniqueEntityIdField', 'StrictCharField', 'StrictBooleanField')
+
+
+def __getattr__(name: str) -> Any:
+    if name in _DRF_FIELDS:
+        module = importlib.import_module('core.__seedwork.domain.drf_fields')
+        return getattr(module, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 @dataclass(frozen=True, slots=True)
@@ -69,7 +74,7 @@ class ValidatorFieldsInterface(ABC):
 
 class DRFValidator(ValidatorFieldsInterface, ABC):
 
-    def _validate(self, serializer: Serializer) -> None:
+    def _validate(self, serializer: 'Serializer') -> None:
         is_valid = serializer.is_valid()
         if not is_valid:
             # errors = {}
@@ -88,56 +93,6 @@ class DRFValidator(ValidatorFieldsInterface, ABC):
         raise NotImplementedException
 
 
-class UniqueEntityIdField(Field):
-    default_error_messages = {
-        'invalid': 'Must be a instance of UniqueEntityId.'
-    }
-
-    def to_internal_value(self, data):
-        # We're lenient with allowing basic numerics to be coerced into strings,
-        # but other types should fail. Eg. unclear if booleans should represent as `true` or `True`,
-        # and composites such as lists are likely user error.
-        if not isinstance(data, UniqueEntityId):
-            self.fail('invalid')
-        return data
-
-    def to_representation(self, value):
-        return value
-
-
-class StrictCharField(CharField):
-    def to_internal_value(self, data):
-        # We're lenient with allowing basic numerics to be coerced into strings,
-        # but other types should fail. Eg. unclear if booleans should represent as `true` or `True`,
-        # and composites such as lists are likely user error.
-        if not isinstance(data, str):
-            self.fail('invalid')
-        return super().to_internal_value(data)
-
-
-class StrictBooleanField(BooleanField):
-    def to_internal_value(self, data):
-        try:
-            if data is True:
-                return True
-            if data is False:
-                return False
-            if data is None and self.allow_null:
-                return None
-        except TypeError:
-            pass
-        self.fail('invalid', input=data)
-
-    def to_representation(self, value):
-        if value in self.TRUE_VALUES:
-            return True
-        elif value in self.FALSE_VALUES:
-            return False
-        if value in self.NULL_VALUES and self.allow_null:
-            return None
-        return bool(value)
-
-
 # class PydanticValidator(ValidatorInterface, ABC):
 #     _errors: ValidationErrorFields = None
 
@@ -0,0 +1,5 @@
+from .metrics import *
+from .shared_memory import *
+from .invalidation import *
+from .caching import *
+from .sharded import *
@@ -0,0 +1,126 @@
+from collections import OrderedDict
+import copy
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from core.__seedwork.domain.repositories import ChangeVersion
+from core.__seedwork.domain.value_objects import UniqueEntityId
+from core.__seedwork.infra.invalidation import Invalidation, InvalidationBus
+from core.__seedwork.infra.metrics import CacheMetrics, MetricsRegistry
+
+
+class CachedRepository:
+    """Per-process read-through cache of `find_by_id` and `entity_version`
+    that delegates everything else.
+
+    Writes made through the proxy drop the touched entries and are
+    published on the invalidation bus, whose invalidations from other
+    processes drop entries here too. An entry read while an invalidation
+    arrived is not stored, so a stale read cannot outlive it. An
+    invalidation the bus lost is caught up with by the bus itself, or at
+    the latest once the entries it missed are `max_age` seconds old.
+
+    Callers get a copy of the cached entity, as use cases change the
+    entities they find before saving them, or fail to."""
+
+    def __init__(self, repository: Any, bus: Optional[InvalidationBus] = None,
+                 max_entries: int = 10000, metrics: Optional[CacheMetrics] = None,
+                 max_age: Optional[float] = None):
+        self.repository = repository
+        self.bus = bus
+        self.max_entries = max_entries
+        self.metrics = metrics
+        self.max_age = max_age
+        # values with the time they were loaded at
+        self._entities: 'OrderedDict[str, Tuple[Any, float]]' = OrderedDict()
+        self._versions: 'OrderedDict[str, Tuple[ChangeVersion, float]]' = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        if bus is not None:
+            bus.subscribe(self.invalidate)
+
+    def find_by_id(self, entity_id: str | UniqueEntityId) -> Any:
+        return copy.copy(self.__cached(self._entities, f'{entity_id}', self.repository.find_by_id))
+
+    def entity_version(self, entity_id: str | UniqueEntityId) -> ChangeVersion:
+        return self.__cached(self._versions, f'{entity_id}', self.repository.entity_version)
+
+    def insert(self, entity: Any) -> None:
+        self.repository.insert(entity)
+        self.__changed([entity.id])
+
+    def bulk_insert(self, entities: List[Any]) -> None:
+        self.repository.bulk_insert(entities)
+        self.__changed([entity.id for entity in entities])
+
+    def update(self, entity: Any) -> None:
+        try:
+            self.repository.update(entity)
+        finally:
+            # the update may have failed after changing the repository
+            self.__changed([entity.id])
+
+    def delete(self, entity_id: str | UniqueEntityId) -> None:
+        self.repository.delete(entity_id)
+        self.__changed([f'{entity_id}'])
+
+    def invalidate(self, invalidation: Invalidation) -> None:
+        with self._lock:
+            self._generation += 1
+            if invalidation.entity_ids is None:
+                self._entities.clear()
+                self._versions.clear()
+                return
+            for entity_id in invalidation.entity_ids:
+                self._entities.pop(entity_id, None)
+                self._versions.pop(entity_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def __cached(self, entries: 'OrderedDict[str, Tuple[Any, float]]', entity_id: str,
+                 load: Callable[[str], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            value, loaded_at = entries.get(entity_id, (None, now))
+            if value is not None and self.max_age is not None and now - loaded_at >= self.max_age:
+                del entries[entity_id]
+                value = None
+            if value is not None:
+                entries.move_to_end(entity_id)
+            generation = self._generation
+        if value is not None:
+            if self.metrics is not None:
+                self.metrics.hit()
+            return value
+        if self.metrics is not None:
+            self.metrics.miss()
+        value = load(entity_id)
+        with self._lock:
+            if generation == self._generation:
+                # a copy, the caller may change the value it gets
+                entries[entity_id] = (copy.copy(value), now)
+                if len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+        return value
+
+    def __changed(self, entity_ids: Iterable[str]) -> None:
+        entity_ids = tuple(entity_ids)
+        self.invalidate(Invalidation(entity_ids))
+        if self.bus is not None:
+            self.bus.publish(entity_ids, self.repository.change_version().tag)
+
+
+def cache_repository(repository: Any, bus: Callable[[], InvalidationBus],
+                     registry: MetricsRegistry, name: str, enabled: bool = False,
+                     max_entries: int = 10000, max_age: Optional[float] = None) -> Any:
+    """`bus` is a factory, so no socket is opened while caching is off."""
+    if not enabled:
+        return repository
+    return CachedRepository(repository, bus(), max_entries, CacheMetrics(registry, name), max_age)
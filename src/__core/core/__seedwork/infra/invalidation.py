@@ -0,0 +1,253 @@
+from abc import ABC
+import abc
+import atexit
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import weakref
+
+from core.__seedwork.domain.exceptions import NotImplementedException
+from core.__seedwork.infra.shared_memory import default_directory
+
+logger = logging.getLogger('core.invalidation')
+
+
+@dataclass(frozen=True, slots=True)
+class Invalidation:
+    # None means every entity, e.g. after a bulk insert too large to list
+    entity_ids: Optional[Tuple[str, ...]]
+    version: Optional[str] = None
+    origin: int = 0
+    sent_at: float = 0.0
+
+
+Subscriber = Callable[[Invalidation], None]
+
+
+class InvalidationBus(ABC):
+    """Broadcasts invalidations to the other processes of the host.
+
+    Subscribers are called from the bus's own thread for invalidations
+    published by other processes only; a process invalidates its own
+    caches before publishing."""
+
+    def __init__(self):
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.append(subscriber)
+
+    @abc.abstractmethod
+    def publish(self, entity_ids: Optional[Iterable[str]], version: Optional[str] = None) -> None:
+        raise NotImplementedException()
+
+    def close(self) -> None:
+        pass
+
+    def _deliver(self, invalidation: Invalidation) -> None:
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber(invalidation)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Invalidation subscriber failed')
+
+
+class UnixSocketInvalidationBus(InvalidationBus):
+    """Every bus binds a datagram socket named `<name>-<pid>-<n>.sock` in
+    `directory`; publishing sends one datagram to each socket found there.
+
+    Sockets left behind by dead processes refuse the datagram and are
+    removed. A peer whose receive buffer stays full for `send_timeout` is
+    skipped and counted in `dropped`. Invalidations listing more than
+    `max_ids` entities are sent as "everything" to stay within one
+    datagram.
+
+    Without a `directory`, the sockets go in a directory of their own
+    under default_directory(), only open to the user running the process
+    and named after `namespace`: by default a digest of the Python prefix
+    and working directory, so deployments of the host sharing /dev/shm do
+    not invalidate each other. A peer the datagram cannot be sent to for
+    any other reason is skipped and counted in `dropped` too; a write
+    that succeeded never fails because a peer could not be told.
+
+    Each bus numbers what it publishes. A subscriber that finds a number
+    missing from a sender, or hears from a sender for the first time after
+    its first message, is told to invalidate everything, as it cannot
+    tell what it missed; such gaps are counted in `missed`."""
+
+    RECEIVE_SIZE = 65536
+
+    def __init__(self, directory: Optional[str] = None, name: str = 'invalidation',
+                 max_ids: int = 512, send_timeout: float = 0.05,
+                 namespace: Optional[str] = None):
+        super().__init__()
+        if directory is None:
+            directory = os.path.join(
+                default_directory(),
+                f'{name}-{os.getuid()}-{namespace or self.default_namespace()}')
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.directory = directory
+        self.name = name
+        self.max_ids = max_ids
+        self.send_timeout = send_timeout
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.missed = 0
+        self.last_latency: Optional[float] = None
+        self._lock = threading.Lock()
+        self._open()
+        _open_buses.add(self)
+
+    def publish(self, entity_ids: Optional[Iterable[str]], version: Optional[str] = None) -> None:
+        ids = None if entity_ids is None else [f'{entity_id}' for entity_id in entity_ids]
+        if ids is not None and len(ids) > self.max_ids:
+            ids = None
+        with self._lock:
+            self.published += 1
+            self._seq += 1
+            message = json.dumps({
+                'ids': ids,
+                'version': version,
+                'origin': os.getpid(),
+                'sent_at': time.time(),
+                'sender': self.path,
+                'seq': self._seq,
+            }, separators=(',', ':')).encode()
+            for peer in self.peers():
+                self.__send(message, peer)
+
+    @staticmethod
+    def default_namespace() -> str:
+        deployment = f'{sys.prefix}\0{os.getcwd()}'.encode()
+        return hashlib.blake2b(deployment, digest_size=8).hexdigest()
+
+    def peers(self) -> List[str]:
+        prefix = f'{self.name}-'
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return []
+        with entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith('.sock')
+                and entry.path != self.path
+            ]
+
+    def close(self) -> None:
+        _open_buses.discard(self)
+        self._closed = True
+        # wakes the listener up so it notices the bus was closed
+        try:
+            self._sender.sendto(b'', self.path)
+        except OSError:
+            pass
+        self._thread.join(1)
+        self._receiver.close()
+        self._sender.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _open(self) -> None:
+        self.path = os.path.join(
+            self.directory, f'{self.name}-{os.getpid()}-{next(_sequence)}.sock')
+        self._closed = False
+        self._seq = 0
+        # the last number received from each sender
+        self._received_seqs: Dict[str, int] = {}
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.settimeout(self.send_timeout)
+        self._thread = threading.Thread(
+            target=self.__listen, name=f'{self.name}-listener', daemon=True)
+        self._thread.start()
+
+    def _reopen_after_fork(self) -> None:
+        # the child inherits the parent's sockets but not its listener
+        # thread; it gets a socket of its own and leaves the parent's alone
+        self._lock = threading.Lock()
+        self._receiver.close()
+        self._sender.close()
+        self._open()
+
+    def __listen(self) -> None:
+        receiver = self._receiver
+        while not self._closed:
+            try:
+                data = receiver.recv(self.RECEIVE_SIZE)
+            except OSError:
+                return
+            if not data:
+                continue
+            try:
+                message = json.loads(data)
+                invalidation = Invalidation(
+                    entity_ids=None if message['ids'] is None else tuple(message['ids']),
+                    version=message.get('version'),
+                    origin=message.get('origin', 0),
+                    sent_at=message.get('sent_at', 0.0)
+                )
+            except (ValueError, KeyError, TypeError):
+                logger.warning('Ignoring malformed invalidation %r', data[:100])
+                continue
+            if self.__missed(message.get('sender'), message.get('seq')):
+                self.missed += 1
+                logger.warning('Invalidations from %s were lost, invalidating everything',
+                               message.get('sender'))
+                invalidation = Invalidation(None, invalidation.version,
+                                            invalidation.origin, invalidation.sent_at)
+            self.received += 1
+            self.last_latency = time.time() - invalidation.sent_at
+            self._deliver(invalidation)
+
+    def __missed(self, sender: Optional[str], seq: Optional[int]) -> bool:
+        if sender is None or seq is None:
+            return False
+        last = self._received_seqs.get(sender, 0)
+        self._received_seqs[sender] = seq
+        return seq != last + 1
+
+    def __send(self, message: bytes, peer: str) -> None:
+        try:
+            self._sender.sendto(message, peer)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # nobody listens there any more
+            try:
+                os.unlink(peer)
+            except OSError:
+                pass
+        except (socket.timeout, BlockingIOError):
+            self.dropped += 1
+            logger.warning('Invalidation to %s dropped, its queue is full', peer)
+        except OSError as error:
+            self.dropped += 1
+            logger.warning('Invalidation to %s dropped: %s', peer, error)
+
+
+_sequence = iter(range(1, 2 ** 63))
+_open_buses: 'weakref.WeakSet[UnixSocketInvalidationBus]' = weakref.WeakSet()
+
+
+def _reopen_buses_after_fork() -> None:
+    for bus in list(_open_buses):
+        bus._reopen_after_fork()  # pylint: disable=protected-access
+
+
+def _close_buses() -> None:
+    for bus in list(_open_buses):
+        bus.close()
+
+
+os.register_at_fork(after_in_child=_reopen_buses_after_fork)
+atexit.register(_close_buses)
@@ -0,0 +1,388 @@
+from bisect import bisect_left
+import math
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.__seedwork.application.interceptors import Interceptor, Proceed, use_case_name
+from core.__seedwork.application.use_cases import UseCase
+
+# Every metric child keeps one cell per writer thread. The hot path only
+# touches the calling thread's cell, so recording never takes a lock;
+# cells are summed when the registry is scraped. When a thread exits its
+# cell is folded into a base cell, so a server starting a thread per
+# request does not pile up cells.
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class _CellOwner:
+    """Lives in the thread-local storage of the thread owning a cell, so
+    it is collected when that thread exits."""
+    __slots__ = ('__weakref__',)
+
+
+class _ThreadCells:
+    __slots__ = ('_local', '_base', '_cells', '_lock', '_size')
+
+    def __init__(self, size: int):
+        self._local = threading.local()
+        self._base = [0.0] * size
+        self._cells: Dict[int, List[float]] = {}
+        # reentrant: a finalizer may retire a cell from any thread,
+        # including one that already holds the lock
+        self._lock = threading.RLock()
+        self._size = size
+
+    def cell(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._size
+            owner = _CellOwner()
+            with self._lock:
+                self._cells[id(cell)] = cell
+            weakref.finalize(owner, self._retire, cell).atexit = False
+            self._local.owner = owner
+            self._local.cell = cell
+            return cell
+
+    def _retire(self, cell: List[float]) -> None:
+        with self._lock:
+            for index, value in enumerate(cell):
+                self._base[index] += value
+            del self._cells[id(cell)]
+
+    def __len__(self) -> int:
+        """The live cells, one per thread that recorded and still runs."""
+        return len(self._cells)
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            cells = [list(self._base), *self._cells.values()]
+        return [sum(values) for values in zip(*cells)]
+
+
+class CounterChild:
+    __slots__ = ('_cells',)
+
+    def __init__(self):
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class HistogramChild:
+    __slots__ = ('_cells', 'upper_bounds')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # one slot per bucket (the last one is +Inf) plus the running sum
+        self._cells = _ThreadCells(len(upper_bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.cell()
+        cell[bisect_left(self.upper_bounds, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> '_Timer':
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        totals = self._cells.totals()
+        buckets = totals[:-1]
+        cumulative = []
+        running = 0.0
+        for count in buckets:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+
+
+class _Timer:
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child: HistogramChild):
+        self._child = child
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _Metric:
+    kind = ''
+    suffix = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f'{self.name} expects labels {self.labelnames}, got {key}')
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError()
+
+    def _items(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    suffix = '_total'
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._items():
+            yield f'{self.name}_total', labels, child.value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._items():
+            cumulative, total_sum, count = child.snapshot()
+            for upper_bound, bucket_count in zip(self.upper_bounds, cumulative):
+                yield f'{self.name}_bucket', \
+                    {**labels, 'le': _format_value(upper_bound)}, bucket_count
+            yield f'{self.name}_sum', labels, total_sum
+            yield f'{self.name}_count', labels, count
+
+
+class Gauge(_Metric):
+    """Gauge whose values are read from callbacks when the registry is scraped."""
+    kind = 'gauge'
+
+    def set_function(self, callback: Callable[[], float], *values: Any) -> None:
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(
+                f'{self.name} expects labels {self.labelnames}, got {key}')
+        with self._lock:
+            self._children[key] = callback
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, callback in self._items():
+            yield self.name, labels, float(callback())
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.__register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.__register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.__register(Gauge, name, documentation, labelnames)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            exposed_name = metric.name + metric.suffix
+            lines.append(
+                f'# HELP {exposed_name} {_escape_help(metric.documentation)}')
+            lines.append(f'# TYPE {exposed_name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(
+                    f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def __register(self, metric_class, name: str, documentation: str,
+                   labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(
+                    name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames):
+                raise ValueError(
+                    f'Metric {name} is already registered with another type or labels')
+            return metric
+
+
+def _escape_help(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n')
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{_escape_label(value)}"' for key,
+                     value in labels.items())
+    return f'{{{pairs}}}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    return repr(float(value))
+
+
+class MetricsInterceptor(Interceptor):
+
+    def __init__(self, registry: MetricsRegistry):
+        self.duration = registry.histogram(
+            'use_case_duration_seconds',
+            'Use case execution latency in seconds.',
+            ('use_case', 'outcome')
+        )
+
+    def intercept(self, use_case: UseCase, request: Any, proceed: Proceed) -> Any:
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            output = proceed(request)
+            outcome = 'success'
+            return output
+        finally:
+            self.duration.labels(use_case_name(use_case), outcome).observe(
+                time.perf_counter() - start)
+
+
+def metrics_interceptors(registry: MetricsRegistry, enabled: bool = True) -> List[Interceptor]:
+    return [MetricsInterceptor(registry)] if enabled else []
+
+
+REPOSITORY_OPERATIONS = (
+    'insert', 'bulk_insert', 'find_by_id', 'find_by_ids',
+    'find_all', 'iter_chunks', 'update', 'delete', 'search', 'suggest'
+)
+
+
+class InstrumentedRepository:
+    """Proxy that counts repository operations and delegates everything else."""
+
+    def __init__(self, repository: Any, registry: MetricsRegistry, name: Optional[str] = None):
+        self.repository = repository
+        self.repository_name = name or type(repository).__name__
+        operations = registry.counter(
+            'repository_operations',
+            'Repository operations executed.',
+            ('repository', 'operation')
+        )
+        for operation in REPOSITORY_OPERATIONS:
+            method = getattr(repository, operation, None)
+            if method is not None:
+                setattr(self, operation, _counted(
+                    method, operations.labels(self.repository_name, operation)))
+        if hasattr(repository, 'items'):
+            registry.gauge(
+                'repository_items',
+                'Entities held by in-memory repositories.',
+                ('repository',)
+            ).set_function(lambda: len(repository.items), self.repository_name)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+
+def _counted(method: Callable[..., Any], counter: CounterChild) -> Callable[..., Any]:
+    def call(*args, **kwargs):
+        counter.inc()
+        return method(*args, **kwargs)
+    return call
+
+
+def instrument_repository(repository: Any, registry: MetricsRegistry, enabled: bool = True) -> Any:
+    return InstrumentedRepository(repository, registry) if enabled else repository
+
+
+class CacheMetrics:
+    """Hit/miss counters for a named cache, plus a hit ratio gauge."""
+
+    def __init__(self, registry: MetricsRegistry, cache: str):
+        requests = registry.counter(
+            'cache_requests',
+            'Cache lookups by result.',
+            ('cache', 'result')
+        )
+        self._hits = requests.labels(cache, 'hit')
+        self._misses = requests.labels(cache, 'miss')
+        registry.gauge(
+            'cache_hit_ratio',
+            'Share of cache lookups served from the cache.',
+            ('cache',)
+        ).set_function(self.hit_ratio, cache)
+
+    def hit(self) -> None:
+        self._hits.inc()
+
+    def miss(self) -> None:
+        self._misses.inc()
+
+    def hit_ratio(self) -> float:
+        hits = self._hits.value
+        total = hits + self._misses.value
+        return hits / total if total else 0.0
@@ -0,0 +1,363 @@
+from abc import ABC
+import heapq
+import itertools
+import multiprocessing
+from multiprocessing.connection import Connection
+from operator import attrgetter
+import os
+import signal
+import threading
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+import zlib
+
+from core.__seedwork.domain.entities import Entity
+from core.__seedwork.domain.repositories import RELEVANCE, SearchResult, SortDirection
+from core.__seedwork.domain.value_objects import UniqueEntityId
+
+ET = TypeVar('ET', bound=Entity)
+
+# (field, reverse) a search sorts by; None keeps insertion order
+SortOrder = Optional[Tuple[str, bool]]
+# entities travel with the sequence number of their insert, so runs from
+# different shards merge in the order one repository would keep them
+Run = List[Tuple[int, ET]]
+# what a shard returns for a search: (sequence number, sort value) pairs
+Keys = List[Tuple[int, Any]]
+
+
+class _Shard:
+    """What a worker process holds: one in-memory repository, the
+    sequence number of every entity in it and the entity of every number."""
+
+    def __init__(self, repository: Any):
+        self.repository = repository
+        self.seqs: Dict[str, int] = {}
+        self.entities: Dict[int, Any] = {}
+
+    def insert(self, entities: List[Any], seqs: List[int]) -> None:
+        self.repository.bulk_insert(entities)
+        self.seqs.update(zip((entity.id for entity in entities), seqs))
+        self.entities.update(zip(seqs, entities))
+
+    def update(self, entity: Any) -> None:
+        self.repository.update(entity)
+        self.entities[self.seqs[entity.id]] = entity
+
+    def delete(self, entity_id: str) -> None:
+        self.repository.delete(entity_id)
+        del self.entities[self.seqs.pop(entity_id)]
+
+    def find_by_id(self, entity_id: str) -> Any:
+        return self.repository.find_by_id(entity_id)
+
+    def find_by_ids(self, entity_ids: List[str]) -> Run:
+        return [(self.seqs[entity.id], entity)
+                for entity in self.repository.find_by_ids(entity_ids)]
+
+    def find_all(self) -> Run:
+        return [(self.seqs[entity.id], entity) for entity in self.repository.items]
+
+    def find_by_seqs(self, seqs: List[int]) -> List[Any]:
+        # None for the entities deleted since the coordinator saw their keys
+        return [self.entities.get(seq) for seq in seqs]
+
+    def take(self, spec: Any, limit: int) -> Run:
+        return [(self.seqs[entity.id], entity)
+                for entity in self.repository._take(spec, limit)]  # pylint: disable=protected-access
+
+    def top(self, filter_param: Any, order: SortOrder, limit: int) -> Tuple[int, Keys]:
+        """Filters the shard and returns the match count with the keys of
+        the first `limit` matches in search order; the coordinator only
+        fetches the entities that end up on the page."""
+        items = self.repository._apply_filter(self.repository.items, filter_param)  # pylint: disable=protected-access
+        if order is None:
+            return len(items), [(self.seqs[entity.id], None) for entity in items[:limit]]
+        field, reverse = order
+        if field == RELEVANCE:
+            # scored with this shard's term statistics only, as search
+            # engines do when they scatter a query
+            scores = dict(zip(
+                (entity.id for entity in items),
+                self.repository._relevance_scores(items, filter_param)))  # pylint: disable=protected-access
+            get = lambda entity: scores[entity.id]
+        else:
+            get = attrgetter(field)
+        # all of these are stable, so ties keep the shard's insertion
+        # order; a heap only beats sorting when it stays small
+        if limit * 16 < len(items):
+            picked = (heapq.nlargest if reverse else heapq.nsmallest)(limit, items, key=get)
+        else:
+            picked = sorted(items, key=get, reverse=reverse)[:limit]
+        return len(items), [(self.seqs[entity.id], get(entity)) for entity in picked]
+
+
+def _serve(connection: Connection, factory: Callable[[], Any]) -> None:
+    # the coordinator shuts the workers down; Ctrl-C in a dev server must not
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shard = _Shard(factory())
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        method, args = message
+        try:
+            reply = (True, getattr(shard, method)(*args))
+        except Exception as error:  # pylint: disable=broad-except
+            reply = (False, error)
+        connection.send(reply)
+
+
+class ShardUnavailableException(Exception):
+    pass
+
+
+class _Worker:
+
+    def __init__(self, process: multiprocessing.process.BaseProcess, connection: Connection):
+        self.process = process
+        self.connection = connection
+        self.lock = threading.Lock()
+
+
+class ShardedRepository(Generic[ET], ABC):
+    """Partitions entities by a hash of their id across `shards` worker
+    processes, each holding an in-memory repository built by
+    `shard_factory`, so searches run in parallel instead of under one GIL.
+
+    Mix it in before an InMemorySearchableRepository subclass: that class
+    keeps the versions and defines the filter and the projection, while its
+    own `items` stays empty. Writes go to the shard owning the id. search()
+    sends the filter and the first `page * per_page` matches to every shard
+    at once and merges the sorted runs, breaking ties by insertion order as
+    a single in-memory repository does, then fetches the page's entities;
+    one deleted in between repeats the search.
+
+    The workers start on first use in each process; a forked child starts
+    over with empty shards of its own rather than share its parent's."""
+
+    shard_factory: Callable[[], Any]
+    # searches repeated when a write deletes part of the page in between
+    search_attempts = 3
+
+    def __init__(self, shards: Optional[int] = None, start_method: Optional[str] = None):
+        super().__init__()
+        self.shards = shards or os.cpu_count() or 1
+        self.start_method = start_method
+        self._workers: List[_Worker] = []
+        self._workers_pid: Optional[int] = None
+        self._workers_lock = threading.Lock()
+        self._seqs = itertools.count()
+        # writes take sequence numbers and reach their shards in one order
+        self._write_lock = threading.Lock()
+
+    def insert(self, entity: ET) -> None:
+        self.bulk_insert([entity])
+
+    def bulk_insert(self, entities: List[ET]) -> None:
+        with self._write_lock:
+            by_shard: Dict[int, Tuple[List[ET], List[int]]] = {}
+            for entity in entities:
+                shard_entities, seqs = by_shard.setdefault(self._shard_of(entity.id), ([], []))
+                shard_entities.append(entity)
+                seqs.append(next(self._seqs))
+            self._call({index: ('insert', args) for index, args in by_shard.items()})
+        self._touch(*(entity.id for entity in entities))
+
+    def update(self, entity: ET) -> None:
+        with self._write_lock:
+            self._call({self._shard_of(entity.id): ('update', (entity,))})
+        self._touch(entity.id)
+
+    def delete(self, entity_id: str | UniqueEntityId) -> None:
+        id_str = f'{entity_id}'
+        with self._write_lock:
+            self._call({self._shard_of(id_str): ('delete', (id_str,))})
+        with self._version_lock:
+            self._entity_versions.pop(id_str, None)
+            self._bump()
+
+    def find_by_id(self, entity_id: str | UniqueEntityId) -> ET:
+        id_str = f'{entity_id}'
+        return self._call({self._shard_of(id_str): ('find_by_id', (id_str,))})[0]
+
+    def find_by_ids(self, entity_ids: List[str | UniqueEntityId]) -> List[ET]:
+        by_shard: Dict[int, List[str]] = {}
+        for id_str in {f'{entity_id}' for entity_id in entity_ids}:
+            by_shard.setdefault(self._shard_of(id_str), []).append(id_str)
+        runs = self._call({index: ('find_by_ids', (ids,)) for index, ids in by_shard.items()})
+        return [entity for _, entity in heapq.merge(*runs)]
+
+    def find_all(self) -> List[ET]:
+        runs = self._call(dict.fromkeys(range(self.shards), ('find_all', ())))
+        return [entity for _, entity in heapq.merge(*runs)]
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[ET]]:
+        # the shards live in other processes, so this copies them all once
+        items = self.find_all()
+        for offset in range(0, len(items), chunk_size):
+            yield items[offset:offset + chunk_size]
+
+    def search(self, input_params: Any) -> SearchResult:
+        sort = input_params.sort
+        if sort == RELEVANCE and not self._full_texts(input_params.filter):
+            # nothing to rank by, the default order applies
+            sort = None
+        order = self._sort_order(sort, input_params.sort_dir)
+        offset = (input_params.page - 1) * input_params.per_page
+        limit = offset + input_params.per_page
+        for _ in range(self.search_attempts):
+            replies = self._call(dict.fromkeys(
+                range(self.shards), ('top', (input_params.filter, order, limit))))
+            runs = ([(seq, value, index) for seq, value in keys]
+                    for index, (_, keys) in enumerate(replies))
+            page = list(itertools.islice(
+                heapq.merge(*runs, **self.__merge_options(order)), offset, limit))
+            items = self.__fetch(page)
+            if all(item is not None for item in items):
+                break
+        else:
+            # deleted each time between the two round trips: serve the rest
+            items = [item for item in items if item is not None]
+        fields_selected = self._select_fields(input_params.fields)
+
+        return SearchResult(
+            items=self._apply_projection(items, fields_selected)
+            if fields_selected else items,
+            total=sum(total for total, _ in replies),
+            current_page=input_params.page,
+            per_page=input_params.per_page,
+            sort=input_params.sort,
+            sort_dir=input_params.sort_dir,
+            filter=input_params.filter,
+            fields=fields_selected,
+        )
+
+    def __fetch(self, page: List[Tuple[int, Any, int]]) -> List[Optional[ET]]:
+        by_shard: Dict[int, List[int]] = {}
+        for seq, _, index in page:
+            by_shard.setdefault(index, []).append(seq)
+        found = dict(zip(
+            itertools.chain.from_iterable(by_shard.values()),
+            itertools.chain.from_iterable(self._call({
+                index: ('find_by_seqs', (seqs,)) for index, seqs in by_shard.items()}))
+        ))
+        return [found[seq] for seq, _, _ in page]
+
+    def _take_merged(self, spec: Any, limit: int, key: Callable[[ET], Any]) -> List[ET]:
+        """The first `limit` entities satisfying `spec` by `key`, then
+        insertion order; the shards must return theirs in that order."""
+        runs = self._call(dict.fromkeys(range(self.shards), ('take', (spec, limit))))
+        merged = heapq.merge(*runs, key=lambda pair: (key(pair[1]), pair[0]))
+        return [entity for _, entity in itertools.islice(merged, limit)]
+
+    def close(self) -> None:
+        with self._workers_lock:
+            workers, self._workers = self._workers, []
+            owned = self._workers_pid == os.getpid()
+            self._workers_pid = None
+        if not owned:
+            return
+        for worker in workers:
+            with worker.lock:
+                try:
+                    worker.connection.send(None)
+                except OSError:
+                    pass
+                worker.connection.close()
+        for worker in workers:
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def _sort_order(self, sort: Optional[str] = None, sort_dir: Optional[str] = None) -> SortOrder:
+        # must agree with _apply_sort, which the shards do not call
+        if sort == RELEVANCE or sort and sort in self.sortable_fields:
+            return sort, not SortDirection.ASC.equals(sort_dir)
+        return None
+
+    def _shard_of(self, entity_id: str) -> int:
+        # crc32 rather than hash(), which is salted per process
+        return zlib.crc32(f'{entity_id}'.encode()) % self.shards
+
+    def _call(self, messages: Dict[int, Tuple[str, tuple]]) -> List[Any]:
+        """Sends each shard its (method, args) message and returns the
+        replies in `messages` order, re-raising the first error. The shards
+        work at the same time; their locks are taken in shard order, so
+        concurrent calls cannot deadlock.
+
+        A worker that died took its shard with it, so every call needing it
+        raises ShardUnavailableException; the replies of the others are
+        still read, leaving their pipes in step for the next call."""
+        workers = self.__started_workers()
+        locked = sorted(messages)
+        dead: List[int] = []
+        replies = []
+        for index in locked:
+            workers[index].lock.acquire()
+        try:
+            for index, message in messages.items():
+                try:
+                    workers[index].connection.send(message)
+                except OSError:
+                    dead.append(index)
+            for index in messages:
+                if index in dead:
+                    continue
+                try:
+                    replies.append(workers[index].connection.recv())
+                except (EOFError, OSError):
+                    dead.append(index)
+        finally:
+            for index in locked:
+                workers[index].lock.release()
+        if dead:
+            index = min(dead)
+            workers[index].process.join(timeout=1)
+            raise ShardUnavailableException(
+                f'Shard {index} of {type(self).__name__} is gone: its worker '
+                f'exited with code {workers[index].process.exitcode}')
+        for ok, value in replies:
+            if not ok:
+                raise value
+        return [value for _, value in replies]
+
+    def __started_workers(self) -> List[_Worker]:
+        pid = os.getpid()
+        if self._workers_pid == pid:
+            return self._workers
+        with self._workers_lock:
+            if self._workers_pid != pid:
+                if self._workers_pid is not None:
+                    # forked: the entities stayed with the parent's workers
+                    with self._version_lock:
+                        self._entity_versions.clear()
+                        self._bump()
+                self._workers = [self.__start_worker(index) for index in range(self.shards)]
+                self._workers_pid = pid
+        return self._workers
+
+    def __start_worker(self, index: int) -> _Worker:
+        context = multiprocessing.get_context(self.start_method)
+        connection, child_connection = context.Pipe()
+        process = context.Process(
+            target=_serve,
+            args=(child_connection, self.shard_factory),
+            name=f'{type(self).__name__}-shard-{index}',
+            daemon=True
+        )
+        process.start()
+        child_connection.close()
+        return _Worker(process, connection)
+
+    @staticmethod
+    def __merge_options(order: SortOrder) -> Dict[str, Any]:
+        # items are (sequence number, sort value, shard index)
+        if order is None:
+            return {}
+        if order[1]:
+            # descending values, ascending sequence numbers
+            return {'key': lambda item: (item[1], -item[0]), 'reverse': True}
+        return {'key': lambda item: (item[1], item[0])}
@@ -0,0 +1,617 @@
+from abc import ABC
+import abc
+from collections.abc import Mapping, Sequence
+import contextlib
+from datetime import datetime
+import fcntl
+import functools
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+from core.__seedwork.domain.entities import Entity
+from core.__seedwork.domain.exceptions import NotFoundException, NotImplementedException
+from core.__seedwork.domain.indexes import FuzzyIndex, Index, PrefixIndex, QueryPlanner
+from core.__seedwork.domain.repositories import ChangeVersion
+from core.__seedwork.domain.value_objects import UniqueEntityId
+
+ET = TypeVar('ET', bound=Entity)
+T = TypeVar('T')
+
+# seq, log id, committed length, lines in the log, index length, and the
+# offset and length of the last meta line
+_CONTROL = struct.Struct('<QQQQQQQ')
+_SEQ = struct.Struct('<Q')
+# key, offset and length of the data of the live put line of that key
+_SLOT = struct.Struct('<16sQI')
+KEY_SIZE = 16
+# a put line is `P<key in hex> <data>`
+_PUT_PREFIX = 2 + 2 * KEY_SIZE
+# a reader seeing an odd seq this many times in a row checks whether the
+# writer died while publishing
+_SPINS = 1000
+
+
+def default_directory() -> str:
+    # tmpfs, so the log lives in shared memory rather than on disk
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+class LogView:
+    """The live lines of a SharedLog as of one publish: the log mapped
+    read-only up to its committed length, and a copy of its index."""
+    __slots__ = ('log_id', 'length', 'lines', '_log', '_index', '_meta')
+
+    def __init__(self, log_id: int, length: int, lines: int, log: mmap.mmap,
+                 index: bytes, meta: Tuple[int, int]):
+        self.log_id = log_id
+        self.length = length
+        self.lines = lines
+        self._log = log
+        self._index = index
+        self._meta = meta
+
+    def __len__(self) -> int:
+        return len(self._index) // _SLOT.size
+
+    @property
+    def meta(self) -> bytes:
+        offset, length = self._meta
+        return self._log[offset:offset + length]
+
+    def key(self, position: int) -> bytes:
+        return self._index[position * _SLOT.size:position * _SLOT.size + KEY_SIZE]
+
+    def offset(self, position: int) -> int:
+        """Where the data of the put line at `position` starts; positions
+        follow the order keys were first put."""
+        return _SLOT.unpack_from(self._index, position * _SLOT.size)[1]
+
+    def data(self, position: int) -> bytes:
+        _, offset, length = _SLOT.unpack_from(self._index, position * _SLOT.size)
+        return self._log[offset:offset + length]
+
+    def find(self, key: bytes) -> Optional[int]:
+        return _find(self._index, key)
+
+
+class SharedLog:
+    """Append-only log of keyed lines shared by the processes of one host.
+
+    Put lines hold the data of a key, delete lines drop it and each write
+    ends with a meta line. `<path>.<log id>` holds the lines and
+    `<path>.<log id>.idx` the shared index: one slot per live key, in the
+    order keys were first put, pointing at the data of its last put line.
+    `<path>.ctl` is a small mmap'd control block publishing the current
+    log id, committed length, index length and meta line through a seqlock.
+
+    Writers take turns on an flock of the control file, append past the
+    committed length and only edit the index and publish inside the odd
+    seq window, so readers never see a partial line and never take a lock.
+    A reader that keeps seeing an odd seq takes the writer lock: a writer
+    that died publishing left the counter odd and the index maybe half
+    edited, so it rebuilds the index from the committed lines.
+
+    Files of logs that other processes compacted away stay open until the
+    next write through this handle, as only the writer closes them."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._control_fd = os.open(f'{path}.ctl', os.O_RDWR | os.O_CREAT, 0o600)
+        # threads of one process share the flock, so they also take turns
+        # on a lock of their own
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+        if os.fstat(self._control_fd).st_size < _CONTROL.size:
+            with self.writer():
+                if os.fstat(self._control_fd).st_size < _CONTROL.size:
+                    os.ftruncate(self._control_fd, _CONTROL.size)
+        self._control = mmap.mmap(self._control_fd, _CONTROL.size)
+        # open files of the logs by (log id, suffix); readers only use them
+        # holding the lock, and only the writer closes those of old logs
+        self._fds: Dict[Tuple[int, str], int] = {}
+        self._fds_lock = threading.Lock()
+
+    def state(self) -> Tuple[int, int, int]:
+        """(log id, committed length, lines); log id 0 means nothing was
+        published yet."""
+        return self._consistent(lambda control: control[1:4])
+
+    def view(self) -> LogView:
+        def read(control: Tuple[int, ...]) -> LogView:
+            _, log_id, length, lines, index_length, meta_offset, meta_length = control
+            with self._fds_lock:
+                index = os.pread(self._fd(log_id, '.idx'), index_length, 0)
+                log = mmap.mmap(self._fd(log_id, ''), length, access=mmap.ACCESS_READ)
+            return LogView(log_id, length, lines, log, index, (meta_offset, meta_length))
+        return self._consistent(read)
+
+    @contextlib.contextmanager
+    def writer(self) -> Iterator[None]:
+        with self._writer_lock:
+            if not self._writer_depth:
+                fcntl.flock(self._control_fd, fcntl.LOCK_EX)
+            self._writer_depth += 1
+            try:
+                yield
+            finally:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    fcntl.flock(self._control_fd, fcntl.LOCK_UN)
+
+    def start(self, meta: bytes) -> None:
+        """Starts the first log, holding only `meta`; must be called
+        holding writer()."""
+        self.__start(1, [], meta, self._consistent(lambda control: control[0]))
+
+    def write(self, meta: bytes, puts: List[Tuple[bytes, bytes]] = (),
+              deletes: List[bytes] = (), new: bool = False) -> None:
+        """Appends puts, deletes and `meta` as one publish; must be called
+        holding writer(). With `new`, the put keys are known not to be
+        live, so their slots are appended without looking them up."""
+        seq, log_id, length, lines, index_length, *_ = self._consistent(lambda control: control)
+        # logs other processes compacted away
+        self.__close_fds(log_id)
+        chunks: List[bytes] = []
+        slots: List[Tuple[bytes, int, int]] = []
+        position = length
+        for key, data in puts:
+            line = b'P' + key.hex().encode() + b' ' + data + b'\n'
+            slots.append((key, position + _PUT_PREFIX, len(data)))
+            chunks.append(line)
+            position += len(line)
+        for key in deletes:
+            line = b'D' + key.hex().encode() + b'\n'
+            chunks.append(line)
+            position += len(line)
+        chunks.append(b'M ' + meta + b'\n')
+        meta_offset = position + 2
+        position += len(chunks[-1])
+        with self._fds_lock:
+            log_fd, index_fd = self._fd(log_id, ''), self._fd(log_id, '.idx')
+        os.pwrite(log_fd, b''.join(chunks), length)
+
+        _SEQ.pack_into(self._control, 0, seq + 1)
+        if new and not deletes:
+            os.pwrite(index_fd, b''.join(_SLOT.pack(*slot) for slot in slots), index_length)
+            index_length += len(slots) * _SLOT.size
+        else:
+            index = bytearray(os.pread(index_fd, index_length, 0))
+            dirty = len(index)
+            for key, offset, size in slots:
+                at = None if new else _find(index, key)
+                at = len(index) if at is None else at * _SLOT.size
+                index[at:at + _SLOT.size] = _SLOT.pack(key, offset, size)
+                dirty = min(dirty, at)
+            for key in deletes:
+                at = _find(index, key)
+                if at is not None:
+                    del index[at * _SLOT.size:(at + 1) * _SLOT.size]
+                    dirty = min(dirty, at * _SLOT.size)
+            os.pwrite(index_fd, bytes(index[dirty:]), dirty)
+            index_length = len(index)
+        self.__publish(seq + 2, log_id, position, lines + len(chunks), index_length,
+                       meta_offset, len(meta))
+
+    def compact(self) -> None:
+        """Starts a new log holding only the live put lines and the last
+        meta line; must be called holding writer(). Views of the old log
+        stay readable, later ones read the new log."""
+        view = self.view()
+        entries = [(view.key(position), view.data(position))
+                   for position in range(len(view))]
+        self.__start(view.log_id + 1, entries, view.meta, view.log_id)
+
+    def close(self) -> None:
+        with self._fds_lock:
+            fds, self._fds = self._fds, {}
+        for fd in fds.values():
+            os.close(fd)
+        self._control.close()
+        os.close(self._control_fd)
+
+    def unlink(self) -> None:
+        log_id = self.state()[0]
+        for path in (self._log_path(log_id), self._log_path(log_id) + '.idx',
+                     f'{self.path}.ctl'):
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+    def _consistent(self, read: Callable[[Tuple[int, ...]], T]) -> T:
+        """`read` applied to a control block no writer changed meanwhile;
+        FileNotFoundError from `read` means a compaction replaced the log,
+        unless the control block did not change."""
+        spins = 0
+        while True:
+            seq = _SEQ.unpack_from(self._control)[0]
+            if seq % 2 == 0:
+                control = _CONTROL.unpack_from(self._control)
+                try:
+                    result = read(control)
+                except FileNotFoundError:
+                    if _SEQ.unpack_from(self._control)[0] == seq:
+                        raise
+                    continue
+                if _SEQ.unpack_from(self._control)[0] == seq:
+                    return result
+                continue
+            spins += 1
+            if spins >= _SPINS:
+                self.__repair()
+                spins = 0
+
+    def _fd(self, log_id: int, suffix: str) -> int:
+        """The open file of the log; must be called holding _fds_lock.
+        The writer may use it after releasing the lock, as nobody else
+        closes the files of the current log."""
+        fd = self._fds.get((log_id, suffix))
+        if fd is None:
+            fd = self._fds[log_id, suffix] = os.open(
+                self._log_path(log_id) + suffix, os.O_RDWR)
+        return fd
+
+    def _log_path(self, log_id: int) -> str:
+        return f'{self.path}.{log_id}'
+
+    def __start(self, log_id: int, entries: List[Tuple[bytes, bytes]], meta: bytes,
+                old_log_id: int) -> None:
+        chunks: List[bytes] = []
+        slots: List[bytes] = []
+        position = 0
+        for key, data in entries:
+            line = b'P' + key.hex().encode() + b' ' + data + b'\n'
+            slots.append(_SLOT.pack(key, position + _PUT_PREFIX, len(data)))
+            chunks.append(line)
+            position += len(line)
+        chunks.append(b'M ' + meta + b'\n')
+        for suffix, data in (('', b''.join(chunks)), ('.idx', b''.join(slots))):
+            fd = os.open(self._log_path(log_id) + suffix,
+                         os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.pwrite(fd, data, 0)
+            with self._fds_lock:
+                self._fds[log_id, suffix] = fd
+        seq = _SEQ.unpack_from(self._control)[0]
+        _SEQ.pack_into(self._control, 0, seq + 1)
+        self.__publish(seq + 2, log_id, position + len(meta) + 3, len(chunks),
+                       len(slots) * _SLOT.size, position + 2, len(meta))
+        if old_log_id:
+            for suffix in ('', '.idx'):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self._log_path(old_log_id) + suffix)
+        self.__close_fds(log_id)
+
+    def __close_fds(self, log_id: int) -> None:
+        """Closes the files of the logs before `log_id`; must be called
+        holding writer(), so that log stays the current one."""
+        with self._fds_lock:
+            old = [key for key in self._fds if key[0] < log_id]
+            for key in old:
+                os.close(self._fds.pop(key))
+
+    def __publish(self, seq: int, *control: int) -> None:
+        """Ends the odd seq window the caller opened."""
+        _CONTROL.pack_into(self._control, 0, seq - 1, *control)
+        _SEQ.pack_into(self._control, 0, seq)
+
+    def __repair(self) -> None:
+        with self.writer():
+            seq = _SEQ.unpack_from(self._control)[0]
+            if seq % 2 == 0:
+                # the writer was alive and is done
+                return
+            # the control block is written at once, so it still holds the
+            # last publish; lines past its length were never published
+            _, log_id, length, lines, *_ = _CONTROL.unpack_from(self._control)
+            with self._fds_lock:
+                log_fd, index_fd = self._fd(log_id, ''), self._fd(log_id, '.idx')
+            data = os.pread(log_fd, length, 0)
+            live: Dict[bytes, Tuple[int, int]] = {}
+            meta = (0, 0)
+            position = 0
+            for line in data.splitlines(keepends=True):
+                if line[:1] == b'P':
+                    key = bytes.fromhex(line[1:_PUT_PREFIX - 1].decode())
+                    live[key] = (position + _PUT_PREFIX, len(line) - _PUT_PREFIX - 1)
+                elif line[:1] == b'D':
+                    live.pop(bytes.fromhex(line[1:-1].decode()), None)
+                else:
+                    meta = (position + 2, len(line) - 3)
+                position += len(line)
+            index = b''.join(_SLOT.pack(key, *slot) for key, slot in live.items())
+            os.pwrite(index_fd, index, 0)
+            self.__publish(seq + 1, log_id, length, lines, len(index), *meta)
+
+
+def _find(index: bytes, key: bytes) -> Optional[int]:
+    start = 0
+    while True:
+        found = index.find(key, start)
+        if found < 0:
+            return None
+        if found % _SLOT.size == 0:
+            return found // _SLOT.size
+        start = found + 1
+
+
+class _SharedItems(Sequence):
+    """Read-only list of the entities live in one LogView, decoded as they
+    are read."""
+    __slots__ = ('view', '_decode')
+
+    def __init__(self, view: LogView, decode: Callable[[LogView, int], Any]):
+        self.view = view
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(self.view, position)
+                    for position in range(*index.indices(len(self.view)))]
+        if index < 0:
+            index += len(self.view)
+        if not 0 <= index < len(self.view):
+            raise IndexError(index)
+        return self._decode(self.view, index)
+
+    def __iter__(self):
+        return (self._decode(self.view, position) for position in range(len(self.view)))
+
+
+class _SharedRows(Mapping):
+    """The entities of a _SharedItems by position, the rows of the
+    QueryPlanner of its view."""
+    __slots__ = ('entities',)
+
+    def __init__(self, entities: _SharedItems):
+        self.entities = entities
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __getitem__(self, row: int) -> Any:
+        if not 0 <= row < len(self.entities):
+            raise KeyError(row)
+        return self.entities[row]
+
+    def __iter__(self):
+        return iter(range(len(self.entities)))
+
+
+class _SharedPositions(Mapping):
+    """The positions of a _SharedItems by entity id."""
+    __slots__ = ('entities', '_key')
+
+    def __init__(self, entities: _SharedItems, key: Callable[[str], bytes]):
+        self.entities = entities
+        self._key = key
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __getitem__(self, entity_id: str) -> int:
+        position = self.entities.view.find(self._key(entity_id))
+        if position is None:
+            raise KeyError(entity_id)
+        return position
+
+    def __iter__(self):
+        return (entity.id for entity in self.entities)
+
+
+class SharedMemoryRepository(Generic[ET], ABC):
+    """Keeps the entities of an in-memory repository in a SharedLog, so
+    every worker process on the host reads the same entities and versions
+    from one copy.
+
+    Mix it in before an InMemoryRepository subclass. Each entity is one
+    JSON line of the log and `items` is a read-only view of the lines live
+    at the last publish, decoded as they are read. A worker only keeps its
+    copy of the log's index and up to `decode_cache_size` decoded entities;
+    reads compare the control block with the view they hold and take a new
+    one when something was published. Writes take the log's writer lock
+    and publish their lines. The log is compacted once it holds
+    `compact_ratio` times more lines than entities.
+
+    Searches decode what they scan, so a cache smaller than the dataset
+    trades search time for memory. The query planner reads the entities
+    of the view rather than keep them, and only builds the
+    `planned_indexes` among _create_indexes(): the first query needing one
+    after a publish decodes every entity to build it again. find_by_id and
+    find_by_ids decode entities of their own, which callers may change."""
+
+    shared_name: str = 'entities'
+    compact_ratio: int = 4
+    compact_min_lines: int = 1000
+    decode_cache_size: int = 10000
+    # small beside the entities, and answering what would otherwise decode
+    # every entity: suggest, and fuzzy matches computing an edit distance
+    # for each one
+    planned_indexes: Tuple[type, ...] = (PrefixIndex, FuzzyIndex)
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.shared_log = SharedLog(
+            path or os.path.join(default_directory(), self.shared_name))
+        self._log_position: Optional[Tuple[int, int]] = None
+        self._sync_lock = threading.RLock()
+        # decoded entities of the current log by offset
+        self._decoded: Dict[int, ET] = {}
+        self._decoded_log_id = 0
+        with self._sync_lock, self.shared_log.writer():
+            if self.shared_log.state()[0] == 0:
+                self.shared_log.start(self.__encode(self.__meta()))
+        self._sync()
+
+    @abc.abstractmethod
+    def _to_record(self, entity: ET) -> Dict[str, Any]:
+        raise NotImplementedException()
+
+    @abc.abstractmethod
+    def _from_record(self, record: Dict[str, Any]) -> ET:
+        raise NotImplementedException()
+
+    def insert(self, entity: ET) -> None:
+        with self._write():
+            self.__put([entity], new=True)
+
+    def bulk_insert(self, entities: List[ET]) -> None:
+        with self._write():
+            self.__put(entities, new=True)
+
+    def update(self, entity: ET) -> None:
+        with self._write():
+            self.__position(entity.id)
+            self.__put([entity], new=False)
+
+    def delete(self, entity_id: str | UniqueEntityId) -> None:
+        id_str = f'{entity_id}'
+        with self._write():
+            self.__position(id_str)
+            self.__bump()
+            self.shared_log.write(self.__encode(self.__meta()), deletes=[self.__key(id_str)])
+
+    def find_by_id(self, entity_id: str | UniqueEntityId) -> ET:
+        self._sync()
+        view = self.items.view
+        return self.__record(view, self.__position(f'{entity_id}', view))[0]
+
+    def find_by_ids(self, entity_ids: List[str | UniqueEntityId]) -> List[ET]:
+        self._sync()
+        view = self.items.view
+        positions = (view.find(self.__key(f'{entity_id}')) for entity_id in set(entity_ids))
+        return [self.__record(view, position)[0]
+                for position in sorted(position for position in positions if position is not None)]
+
+    def find_all(self) -> List[ET]:
+        self._sync()
+        return list(self.items)
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[ET]]:
+        self._sync()
+        # a view never changes, so chunks are decoded as they are consumed
+        items = self.items
+        return (items[offset:offset + chunk_size] for offset in range(0, len(items), chunk_size))
+
+    def search(self, input_params: Any) -> Any:
+        self._sync()
+        return super().search(input_params)
+
+    def _take(self, spec: Any, limit: int) -> List[ET]:
+        self._sync()
+        return super()._take(spec, limit)
+
+    def _create_indexes(self) -> List[Index]:
+        return [index for index in super()._create_indexes()
+                if isinstance(index, self.planned_indexes)]
+
+    def _new_query_planner(self, indexes: List[Index]) -> QueryPlanner[ET]:
+        items = self.items
+        return QueryPlanner.over(indexes, _SharedRows(items), _SharedPositions(items, self.__key))
+
+    def change_version(self) -> ChangeVersion:
+        self._sync()
+        return super().change_version()
+
+    def entity_version(self, entity_id: str | UniqueEntityId) -> ChangeVersion:
+        self._sync()
+        view = self.items.view
+        return self.__record(view, self.__position(f'{entity_id}', view))[1]
+
+    def _sync(self) -> None:
+        if self.shared_log.state()[:2] == self._log_position:
+            return
+        with self._sync_lock:
+            self.__refresh()
+
+    @contextlib.contextmanager
+    def _write(self) -> Iterator[None]:
+        with self._sync_lock, self.shared_log.writer():
+            self.__refresh()
+            try:
+                yield
+            except BaseException:
+                # the counter may be ahead of the log; read it again
+                self._log_position = None
+                raise
+            view = self.__refresh()
+            if view.lines > max(self.compact_min_lines, self.compact_ratio * len(view)):
+                self.shared_log.compact()
+                self.__refresh()
+
+    def __refresh(self) -> LogView:
+        view = self.shared_log.view()
+        meta = json.loads(view.meta)
+        with self._version_lock:
+            self._epoch = meta['epoch']
+            self._counter = meta['counter']
+            self._last_modified = datetime.fromisoformat(meta['last_modified'])
+        if view.log_id != self._decoded_log_id:
+            # offsets are only meaningful within one log; views of the old
+            # log keep the cache they were given
+            self._decoded, self._decoded_log_id = {}, view.log_id
+        self.items = _SharedItems(view, functools.partial(self.__decode, self._decoded))
+        self._log_position = (view.log_id, view.length)
+        return view
+
+    def __decode(self, decoded: Dict[int, ET], view: LogView, position: int) -> ET:
+        # an offset holds the same line until the log is compacted; once
+        # full the cache only replaces its newest entry, so a scan of more
+        # entities than it holds keeps hitting the ones it has
+        offset = view.offset(position)
+        entity = decoded.get(offset)
+        if entity is None:
+            entity = self._from_record(json.loads(view.data(position))['record'])
+            if len(decoded) >= self.decode_cache_size and decoded:
+                decoded.popitem()
+            if self.decode_cache_size:
+                decoded[offset] = entity
+        return entity
+
+    def __record(self, view: LogView, position: int) -> Tuple[ET, ChangeVersion]:
+        line = json.loads(view.data(position))
+        return self._from_record(line['record']), ChangeVersion(
+            tag=line['tag'], last_modified=datetime.fromisoformat(line['last_modified']))
+
+    def __position(self, entity_id: str, view: Optional[LogView] = None) -> int:
+        position = (view or self.items.view).find(self.__key(entity_id))
+        if position is None:
+            raise NotFoundException(f"Entity Not Found using ID '{entity_id}'")
+        return position
+
+    def __put(self, entities: List[ET], new: bool) -> None:
+        version = self.__bump()
+        puts = [
+            (self.__key(entity.id), self.__encode({
+                'record': self._to_record(entity),
+                'tag': version.tag,
+                'last_modified': version.last_modified.isoformat(),
+            }))
+            for entity in entities
+        ]
+        self.shared_log.write(self.__encode(self.__meta()), puts=puts, new=new)
+
+    def __bump(self) -> ChangeVersion:
+        with self._version_lock:
+            return self._bump()
+
+    def __meta(self) -> Dict[str, Any]:
+        return {
+            'epoch': self._epoch,
+            'counter': self._counter,
+            'last_modified': self._last_modified.isoformat(),
+        }
+
+    @staticmethod
+    def __key(entity_id: str) -> bytes:
+        return hashlib.blake2b(entity_id.encode(), digest_size=KEY_SIZE).digest()
+
+    @staticmethod
+    def __encode(value: Dict[str, Any]) -> bytes:
+        return json.dumps(value, separators=(',', ':')).encode()
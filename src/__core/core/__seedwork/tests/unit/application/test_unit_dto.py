@@ -1,8 +1,10 @@
 # pylint: disable=unexpected-keyword-arg
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional
 import unittest
-from core.__seedwork.application.dto import Item, PaginationOutput, PaginationOutputMapper
-from core.__seedwork.domain.repositories import SearchResult, SortDirection
+from core.__seedwork.application.dto import BatchItemError, Filter, Item, PaginationOutput, PaginationOutputMapper, ResourceVersion, SearchInput
+from core.__seedwork.domain.repositories import ChangeVersion, SearchResult, SortDirection
+from core.__seedwork.domain.validators import ErrorFields
 
 
 class TestPaginationOutput(unittest.TestCase):
@@ -17,6 +19,19 @@ class TestPaginationOutput(unittest.TestCase):
         })
 
 
+class TestSearchInput(unittest.TestCase):
+
+    def test_fields(self):
+        self.assertEqual(SearchInput.__annotations__, {
+            'page': Optional[int],
+            'per_page': Optional[int],
+            'sort': Optional[str],
+            'sort_dir': Optional[str],
+            'filter': Optional[Filter],
+            'fields': Optional[List[str]],
+        })
+
+
 class TestPaginationOutputMapper(unittest.TestCase):
 
     def test_to_output(self):
@@ -38,3 +53,28 @@ class TestPaginationOutputMapper(unittest.TestCase):
             last_page=result.last_page,
             per_page=result.per_page,
         ))
+
+
+class TestBatchItemError(unittest.TestCase):
+
+    def test_fields(self):
+        self.assertEqual(BatchItemError.__annotations__, {
+            'index': int,
+            'errors': ErrorFields,
+        })
+
+
+class TestResourceVersion(unittest.TestCase):
+
+    def test_of(self):
+        last_modified = datetime(2022, 5, 22, tzinfo=timezone.utc)
+        change = ChangeVersion(tag='epoch-1', last_modified=last_modified)
+
+        version = ResourceVersion.of(change, {'page': 1})
+        self.assertEqual(version.last_modified, last_modified)
+        self.assertRegex(version.etag, r'^[0-9a-f]{40}$')
+        self.assertEqual(version, ResourceVersion.of(change, {'page': 1}))
+        self.assertNotEqual(version.etag, ResourceVersion.of(
+            change, {'page': 2}).etag)
+        self.assertNotEqual(version.etag, ResourceVersion.of(
+            ChangeVersion(tag='epoch-2', last_modified=last_modified), {'page': 1}).etag)
@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core.__seedwork.application.interceptors import (
+    CallCountInterceptor,
+    InterceptedUseCase,
+    Interceptor,
+    InterceptorChain,
+    SingleFlightInterceptor,
+    SlowCallLoggingInterceptor,
+    TimingInterceptor,
+    UseCaseMetrics
+)
+from core.__seedwork.application.use_cases import UseCase, record_stages, stage
+
+
+class StubUseCase(UseCase):
+
+    class Input:
+        pass
+
+    def execute(self, request):
+        with stage('validation'):
+            if request == 'invalid':
+                raise ValueError('invalid request')
+        with stage('repository'):
+            pass
+        return f'output {request}'
+
+
+class RecordingInterceptor(Interceptor):
+
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def intercept(self, use_case, request, proceed):
+        self.calls.append(f'before {self.name}')
+        output = proceed(request)
+        self.calls.append(f'after {self.name}')
+        return output
+
+
+class TestStage(unittest.TestCase):
+
+    def test_stage_is_noop_without_recorder(self):
+        with stage('validation') as value:
+            self.assertIsNone(value)
+
+    def test_record_stages(self):
+        with record_stages() as recorder:
+            with stage('validation'):
+                pass
+            with stage('validation'):
+                pass
+            with stage('repository'):
+                pass
+        self.assertCountEqual(recorder.durations.keys(),
+                              ['validation', 'repository'])
+
+        with record_stages() as other_recorder:
+            pass
+        self.assertEqual(other_recorder.durations, {})
+
+
+class TestInterceptorChain(unittest.TestCase):
+
+    def test_wrap_returns_use_case_when_chain_is_empty(self):
+        use_case = StubUseCase()
+        self.assertIs(InterceptorChain().wrap(use_case), use_case)
+
+    def test_wrap_calls_interceptors_in_order(self):
+        calls = []
+        chain = InterceptorChain((
+            RecordingInterceptor('first', calls),
+            RecordingInterceptor('second', calls),
+        ))
+        use_case = chain.wrap(StubUseCase())
+        self.assertIsInstance(use_case, InterceptedUseCase)
+        self.assertIsInstance(use_case, UseCase)
+        self.assertEqual(use_case.execute('request'), 'output request')
+        self.assertEqual(calls, [
+            'before first', 'before second', 'after second', 'after first'
+        ])
+
+    def test_intercepted_use_case_delegates_attributes(self):
+        use_case = InterceptorChain(
+            (RecordingInterceptor('first', []),)).wrap(StubUseCase())
+        self.assertIs(use_case.Input, StubUseCase.Input)
+
+    def test_from_config(self):
+        metrics = UseCaseMetrics()
+        self.assertEqual(InterceptorChain.from_config(
+            None, metrics), InterceptorChain())
+        self.assertEqual(InterceptorChain.from_config(
+            {'timing': False, 'call_count': False, 'slow_call_threshold_ms': None}, metrics),
+            InterceptorChain()
+        )
+
+        chain = InterceptorChain.from_config(
+            {'timing': True, 'call_count': True, 'slow_call_threshold_ms': 250,
+             'single_flight': True}, metrics)
+        self.assertEqual(
+            [type(interceptor) for interceptor in chain.interceptors],
+            [CallCountInterceptor, TimingInterceptor,
+             SlowCallLoggingInterceptor, SingleFlightInterceptor]
+        )
+        self.assertEqual(chain.interceptors[2].threshold, 0.25)
+
+
+class TestBuiltInInterceptors(unittest.TestCase):
+
+    metrics: UseCaseMetrics
+
+    def setUp(self) -> None:
+        self.metrics = UseCaseMetrics()
+
+    def test_call_count_interceptor(self):
+        use_case = InterceptorChain(
+            (CallCountInterceptor(self.metrics),)).wrap(StubUseCase())
+        use_case.execute('request')
+        use_case.execute('request')
+        with self.assertRaises(ValueError):
+            use_case.execute('invalid')
+
+        stats = self.metrics.get('StubUseCase')
+        self.assertEqual(stats['calls'], 3)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['timed_calls'], 0)
+
+    def test_timing_interceptor(self):
+        use_case = InterceptorChain(
+            (TimingInterceptor(self.metrics),)).wrap(StubUseCase())
+        use_case.execute('request')
+        with self.assertRaises(ValueError):
+            use_case.execute('invalid')
+
+        stats = self.metrics.get('StubUseCase')
+        self.assertEqual(stats['timed_calls'], 2)
+        self.assertGreater(stats['total_time'], 0)
+        self.assertGreaterEqual(stats['max_time'], stats['avg_time'])
+        self.assertCountEqual(stats['stages'].keys(),
+                              ['validation', 'repository'])
+        self.assertEqual(list(self.metrics.snapshot().keys()), ['StubUseCase'])
+
+        self.metrics.reset()
+        self.assertIsNone(self.metrics.get('StubUseCase'))
+
+    def test_slow_call_logging_interceptor(self):
+        logger = mock.Mock(logging.Logger)
+        use_case = InterceptorChain(
+            (SlowCallLoggingInterceptor(threshold=0, logger=logger),)
+        ).wrap(StubUseCase())
+        use_case.execute('request')
+        logger.warning.assert_called_once()
+        self.assertEqual(logger.warning.call_args[0][1], 'StubUseCase')
+
+        logger = mock.Mock(logging.Logger)
+        use_case = InterceptorChain(
+            (SlowCallLoggingInterceptor(threshold=60, logger=logger),)
+        ).wrap(StubUseCase())
+        use_case.execute('request')
+        logger.warning.assert_not_called()
+
+
+class BlockingUseCase(UseCase):
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def coalescing_key(self, request):
+        return None if request == 'uncoalesced' else request
+
+    def execute(self, request):
+        with self.lock:
+            self.calls += 1
+        self.release.wait(5)
+        if request == 'invalid':
+            raise ValueError('invalid request')
+        return [f'output {request}']
+
+
+class TestSingleFlightInterceptor(unittest.TestCase):
+
+    interceptor: SingleFlightInterceptor
+    inner: BlockingUseCase
+
+    def setUp(self) -> None:
+        self.interceptor = SingleFlightInterceptor()
+        self.inner = BlockingUseCase()
+        self.use_case = InterceptorChain(
+            (self.interceptor,)).wrap(self.inner)
+
+    def run_concurrently(self, requests, joined):
+        results = [None] * len(requests)
+
+        def call(index, request):
+            try:
+                results[index] = self.use_case.execute(request)
+            except Exception as error:  # pylint: disable=broad-except
+                results[index] = error
+
+        threads = [threading.Thread(target=call, args=(index, request))
+                   for index, request in enumerate(requests)]
+        for thread in threads:
+            thread.start()
+        for _ in range(500):
+            if joined():
+                break
+            time.sleep(0.01)
+        self.inner.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_share_one_execution_between_identical_calls(self):
+        results = self.run_concurrently(
+            ['request'] * 8, lambda: self.interceptor.waiting() == 7)
+
+        self.assertEqual(self.inner.calls, 1)
+        self.assertEqual(results[0], ['output request'])
+        for result in results[1:]:
+            self.assertIs(result, results[0])
+        self.assertEqual(self.interceptor.in_flight(), 0)
+
+    def test_do_not_share_between_different_keys(self):
+        self.inner.release.set()
+        self.assertEqual(self.use_case.execute('a'), ['output a'])
+        self.assertEqual(self.use_case.execute('b'), ['output b'])
+        self.assertEqual(self.use_case.execute('a'), ['output a'])
+        self.assertEqual(self.inner.calls, 3)
+
+    def test_run_calls_without_key_on_their_own(self):
+        results = self.run_concurrently(
+            ['uncoalesced'] * 4, lambda: self.inner.calls == 4)
+        self.assertEqual(self.inner.calls, 4)
+        self.assertEqual(results, [['output uncoalesced']] * 4)
+
+    def test_run_use_cases_without_coalescing_key_on_their_own(self):
+        use_case = InterceptorChain((self.interceptor,)).wrap(StubUseCase())
+        self.assertEqual(use_case.execute('request'), 'output request')
+        self.assertEqual(self.interceptor.in_flight(), 0)
+
+    def test_propagate_error_to_every_waiter(self):
+        results = self.run_concurrently(
+            ['invalid'] * 4, lambda: self.interceptor.waiting() == 3)
+
+        self.assertEqual(self.inner.calls, 1)
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+            self.assertEqual(str(result), 'invalid request')
+        # waiters raise their own copy, chained to the leader's error
+        leaders = [result for result in results if result.__cause__ is None]
+        self.assertEqual(len(leaders), 1)
+        for result in results:
+            if result is not leaders[0]:
+                self.assertIs(result.__cause__, leaders[0])
+        self.assertEqual(self.interceptor.in_flight(), 0)
+        self.assertEqual(self.interceptor.waiting(), 0)
+
+        # a failed flight is not remembered, the next call runs again
+        with self.assertRaises(ValueError):
+            self.use_case.execute('invalid')
+        self.assertEqual(self.inner.calls, 2)
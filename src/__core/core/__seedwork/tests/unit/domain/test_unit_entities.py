@@ -50,6 +50,17 @@ class TestEntityUnit(unittest.TestCase):
             entity.to_dict()
         )
 
+    def test_restore_method(self):
+        unique_entity_id = UniqueEntityId(
+            "5490020a-e866-4229-9adc-aa44b83234c4")
+        entity = StubEntity.restore(
+            unique_entity_id=unique_entity_id, prop1='value1', prop2='value2')
+        self.assertEqual(entity, StubEntity(
+            unique_entity_id=unique_entity_id, prop1='value1', prop2='value2'))
+
+        entity = StubEntity.restore(prop1='value1', prop2='value2')
+        self.assertIsInstance(entity.unique_entity_id, UniqueEntityId)
+
 
 @dataclass(frozen=True, kw_only=True)
 class StubAggregateRoot(Entity):
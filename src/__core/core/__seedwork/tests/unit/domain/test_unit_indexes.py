@@ -0,0 +1,217 @@
+# pylint: disable=unexpected-keyword-arg
+import unittest
+
+from core.__seedwork.domain.indexes import (
+    BooleanIndex,
+    FullTextIndex,
+    FuzzyIndex,
+    NGramIndex,
+    Plan,
+    PrefixIndex,
+    QueryPlanner,
+    SortedIndex,
+    UniqueIndex
+)
+from core.__seedwork.domain.specifications import Contains, Equals, FullText, Fuzzy, Range, StartsWith
+from core.__seedwork.tests.unit.domain.test_unit_repositories import StubEntity
+
+
+def stub_indexes():
+    return [UniqueIndex('id'), SortedIndex('price'), NGramIndex('name'), BooleanIndex('name')]
+
+
+class TestIndexes(unittest.TestCase):
+
+    def test_sorted_index(self):
+        entities = [StubEntity(name=f'{price}', price=price) for price in (5, 1, 3, 3, 9)]
+        index = SortedIndex('price')
+        index.build(enumerate(entities))
+        spec = Range('price', gte=2, lte=5)
+        self.assertEqual(index.estimate(spec), 3)
+        self.assertEqual(sorted(index.lookup(spec)), [0, 2, 3])
+        self.assertEqual(list(index.lookup(Equals('price', 3))), [2, 3])
+
+        index.remove(2)
+        index.add(5, StubEntity(name='4', price=4))
+        self.assertEqual(sorted(index.lookup(spec)), [0, 3, 5])
+        self.assertEqual(index.estimate(Range('price', lte=0)), 0)
+
+    def test_prefix_index(self):
+        entities = [StubEntity(name=name, price=1) for name in ('movie', 'Music', 'Mobile', None, 'm')]
+        index = PrefixIndex('name')
+        index.build(enumerate(entities))
+        self.assertTrue(index.supports(StartsWith('name', '')))
+        self.assertFalse(index.supports(Equals('name', 'm')))
+        self.assertEqual(index.estimate(StartsWith('name', 'MO')), 2)
+        self.assertEqual(list(index.lookup(StartsWith('name', 'MO'))), [2, 0])
+        self.assertEqual(list(index.lookup(StartsWith('name', ''))), [4, 2, 0, 1])
+
+        object.__setattr__(entities[1], 'name', 'Mocha')
+        index.remove(1)
+        index.add(1, entities[1])
+        self.assertEqual(list(index.lookup(StartsWith('name', 'mo'))), [2, 1, 0])
+
+    def test_ngram_index(self):
+        index = NGramIndex('name')
+        index.build(enumerate([StubEntity(name='Movie', price=1),
+                               StubEntity(name='Documentary', price=1)]))
+        self.assertTrue(index.supports(Contains('name', 'mov')))
+        self.assertFalse(index.supports(Contains('name', 'mo')))
+        self.assertEqual(list(index.lookup(Contains('name', 'MOV'))), [0])
+        self.assertEqual(index.estimate(Contains('name', 'xyz')), 0)
+
+        index.remove(0)
+        self.assertEqual(list(index.lookup(Contains('name', 'mov'))), [0])
+        self.assertFalse(index.stale())
+
+    def test_full_text_index(self):
+        entities = [StubEntity(name=name, price=1) for name in (
+            'movie', 'documentary about movies', 'movie series', 'series')]
+        index = FullTextIndex({'name': 1.0})
+        index.build(enumerate(entities))
+        spec = FullText('movies', ('name',))
+        self.assertTrue(index.supports(spec))
+        self.assertFalse(index.supports(FullText('movies', ('name', 'price'))))
+        self.assertFalse(index.supports(FullText('...', ('name',))))
+        self.assertEqual(index.estimate(spec), 3)
+        self.assertEqual(sorted(index.lookup(FullText('series movie', ('name',)))), [2])
+        self.assertEqual(index.estimate(FullText('movie shows', ('name',))), 0)
+
+        # shorter documents rank higher, rows the index misses score 0
+        scores = index.score(spec, [1, 0, 2, 3, None])
+        self.assertGreater(scores[1], scores[2])
+        self.assertGreater(scores[2], scores[0])
+        self.assertEqual(scores[3:], [0.0, 0.0])
+
+        object.__setattr__(entities[0], 'name', 'film')
+        index.remove(0)
+        index.add(0, entities[0])
+        self.assertEqual(sorted(index.lookup(spec)), [1, 2])
+        self.assertEqual(list(index.lookup(FullText('films', ('name',)))), [0])
+        self.assertEqual(index.score(spec, [0]), [0.0])
+        self.assertFalse(index.stale())
+
+    def test_fuzzy_index(self):
+        entities = [StubEntity(name=name, price=1) for name in (
+            'Movie', 'Documentary movies', 'Series', None)]
+        index = FuzzyIndex('name')
+        index.build(enumerate(entities))
+        spec = Fuzzy('name', 'movis')
+        self.assertTrue(index.supports(spec))
+        self.assertFalse(index.supports(Fuzzy('name', '...')))
+        self.assertEqual(index.estimate(spec), 2)
+        self.assertEqual(sorted(index.lookup(spec)), [0, 1])
+        self.assertEqual(sorted(index.lookup(Fuzzy('name', 'movis documetnary'))), [1])
+        self.assertEqual(sorted(index.lookup(Fuzzy('name', 'movis', max_distance=0))), [])
+
+        object.__setattr__(entities[0], 'name', 'Film')
+        index.remove(0)
+        index.add(0, entities[0])
+        index.add(4, StubEntity(name='Movi', price=1))
+        self.assertEqual(sorted(index.lookup(spec)), [1, 4])
+        self.assertEqual(list(index.lookup(Fuzzy('name', 'flm'))), [0])
+        self.assertFalse(index.stale())
+
+    def test_remove_by_indexed_value(self):
+        entity = StubEntity(name='a', price=1)
+        arrange = [UniqueIndex('name'), BooleanIndex('name'), SortedIndex('name')]
+        for index in arrange:
+            with self.subTest(index=index.name):
+                index.add(0, entity)
+                # changed in place before the index hears about it
+                object.__setattr__(entity, 'name', 'b')
+                index.remove(0)
+                index.add(0, entity)
+                self.assertEqual(list(index.lookup(Equals('name', 'a'))), [])
+                self.assertEqual(list(index.lookup(Equals('name', 'b'))), [0])
+                object.__setattr__(entity, 'name', 'a')
+
+
+class TestQueryPlanner(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.entities = [
+            StubEntity(name=f'item {index % 10}', price=index) for index in range(100)]
+        self.planner = QueryPlanner(stub_indexes(), self.entities)
+
+    def test_pick_most_selective_index(self):
+        by_id = Equals('id', self.entities[7].id)
+        by_price = Range('price', gte=10, lte=14)
+        by_name = Equals('name', 'item 3')
+        by_text = Contains('name', 'm 4')
+        arrange = [
+            (by_id & Range('price', gte=0), Plan('UniqueIndex(id)', by_id, 1)),
+            (by_price & Contains('name', 'item'), Plan('SortedIndex(price)', by_price, 5)),
+            (by_name & Range('price', gte=0, lte=80), Plan('BooleanIndex(name)', by_name, 10)),
+            (by_text & Range('price', gte=0, lte=80), Plan('NGramIndex(name)', by_text, 10)),
+        ]
+        for spec, plan in arrange:
+            with self.subTest(spec=spec):
+                self.assertEqual(self.planner.plan(spec), plan)
+                self.assertEqual(
+                    self.planner.select(spec),
+                    [entity for entity in self.entities if spec.is_satisfied_by(entity)])
+
+    def test_scan_when_no_index_is_selective_enough(self):
+        arrange = [
+            Range('price', gte=50),
+            Contains('name', 'item'),
+            # too short for trigrams
+            Contains('name', 'm '),
+        ]
+        for spec in arrange:
+            with self.subTest(spec=spec):
+                self.assertEqual(self.planner.plan(spec), Plan(None, None, 100))
+                self.assertEqual(
+                    self.planner.select(spec),
+                    [entity for entity in self.entities if spec.is_satisfied_by(entity)])
+
+    def test_use_exact_index_however_many_rows_match(self):
+        spec = FullText('item', ('name',)) & Range('price', lte=80)
+        planner = QueryPlanner([FullTextIndex({'name': 1.0})], self.entities)
+        self.assertEqual(planner.plan(spec),
+                         Plan('FullTextIndex(name)', FullText('item', ('name',)), 100))
+        self.assertEqual(planner.select(spec), self.entities[:81])
+
+        scores = planner.score(FullText('item 3', ('name',)), self.entities[:20])
+        self.assertEqual([index for index, score in enumerate(scores) if score == max(scores)],
+                         [3, 13])
+
+    def test_take_in_index_order(self):
+        planner = QueryPlanner([PrefixIndex('name')], self.entities)
+        spec = StartsWith('name', 'item') & Range('price', gte=50)
+        self.assertEqual([entity.price for entity in planner.take(spec, 3)], [50, 60, 70])
+        # scanned in insertion order
+        self.assertEqual([entity.price for entity in planner.take(Range('price', gte=50), 2)],
+                         [50, 51])
+
+    def test_take_each_entity_once(self):
+        planner = QueryPlanner([NGramIndex('name')], self.entities)
+        spec = Contains('name', 'item 4')
+        planner.take(spec, 1)
+        # updated in place, so the index appends its row again
+        for entity in self.entities[4::10]:
+            planner.update(entity)
+        self.assertEqual(planner.take(spec, 20), self.entities[4::10])
+
+    def test_build_indexes_on_first_use(self):
+        # pylint: disable=protected-access
+        self.assertEqual(self.planner._indexes, [])
+        self.planner.select(Range('price', lte=3))
+        self.assertEqual([index.name for index in self.planner._indexes],
+                         ['SortedIndex(price)'])
+
+    def test_keep_indexes_up_to_date(self):
+        spec = Contains('name', 'item 1') & Range('price', gte=10, lte=30)
+        self.assertEqual([entity.price for entity in self.planner.select(spec)], [11, 21])
+
+        changed = self.entities[11]
+        object.__setattr__(changed, 'name', 'other')
+        self.planner.update(changed)
+        self.planner.remove(self.entities[21].id)
+        added = StubEntity(name='item 1', price=15)
+        self.planner.add([added])
+
+        self.assertEqual(self.planner.select(spec), [added])
+        self.assertEqual(self.planner.select(Equals('id', self.entities[21].id)), [])
+        self.assertEqual(len(self.planner), 100)
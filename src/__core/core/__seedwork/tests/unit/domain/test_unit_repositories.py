@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import List, TypedDict
 import unittest
 
-from core.__seedwork.domain.repositories import InMemoryRepository, InMemorySearchableRepository, RepositoryInterface, SearchParams, SearchResult, SearchableRepositoryInterface, SortDirection
+from core.__seedwork.domain.repositories import ChangeVersion, InMemoryRepository, InMemorySearchableRepository, RepositoryInterface, SearchParams, SearchResult, SearchableRepositoryInterface, SortDirection
 from core.__seedwork.domain.entities import Entity
 from core.__seedwork.domain.exceptions import NotFoundException
 from core.__seedwork.domain.value_objects import UniqueEntityId
@@ -18,7 +18,8 @@ class TestRepositoryInterface(unittest.TestCase):
             RepositoryInterface()
         self.assertEqual(
             "Can't instantiate abstract class RepositoryInterface with abstract " +
-            "methods delete, find_all, find_by_id, insert, update",
+            "methods bulk_insert, change_version, delete, entity_version, find_all, find_by_id, " +
+            "find_by_ids, insert, iter_chunks, update",
             assert_error.exception.args[0]
         )
 
@@ -70,6 +71,28 @@ class TestInMemoryRepository(unittest.TestCase):
         entity_found = self.repo.find_by_id(entity.unique_entity_id)
         self.assertDictEqual(entity.to_dict(), entity_found.to_dict())
 
+    def test_bulk_insert(self):
+        entities = [
+            StubEntity(name='test 1', price=0),
+            StubEntity(name='test 2', price=1),
+        ]
+        self.repo.bulk_insert(entities)
+        self.assertListEqual(entities, self.repo.items)
+
+    def test_find_by_ids(self):
+        entities = [
+            StubEntity(name='test 1', price=0),
+            StubEntity(name='test 2', price=1),
+            StubEntity(name='test 3', price=2),
+        ]
+        self.repo.items = entities
+
+        items = self.repo.find_by_ids(
+            [entities[2].id, entities[0].unique_entity_id, 'fake id'])
+        self.assertListEqual([entities[0], entities[2]], items)
+
+        self.assertListEqual([], self.repo.find_by_ids([]))
+
     def test_find_all(self):
         entity = StubEntity(name='test', price=0)
         self.repo.insert(entity)
@@ -77,6 +100,25 @@ class TestInMemoryRepository(unittest.TestCase):
         items = self.repo.find_all()
         self.assertListEqual([entity], items)
 
+    def test_iter_chunks(self):
+        self.assertListEqual(list(self.repo.iter_chunks(2)), [])
+
+        entities = [StubEntity(name=f'test {i}', price=i) for i in range(5)]
+        self.repo.items = entities
+        self.assertListEqual(list(self.repo.iter_chunks(2)), [
+            entities[0:2], entities[2:4], entities[4:5]
+        ])
+        self.assertListEqual(list(self.repo.iter_chunks(5)), [entities])
+
+    def test_iter_chunks_from_a_snapshot(self):
+        entities = [StubEntity(name=f'test {i}', price=i) for i in range(5)]
+        self.repo.items = list(entities)
+        chunks = self.repo.iter_chunks(2)
+        self.assertListEqual(next(chunks), entities[0:2])
+        self.repo.delete(entities[0].id)
+        self.repo.insert(StubEntity(name='test 5', price=5))
+        self.assertListEqual(list(chunks), [entities[2:4], entities[4:5]])
+
     def test_throw_exception_on_update_when_entity_not_found(self):
         entity = StubEntity(name='test', price=0)
         with self.assertRaises(NotFoundException) as assert_error:
@@ -107,6 +149,56 @@ class TestInMemoryRepository(unittest.TestCase):
         self.repo.delete(entity.id)
         self.assertListEqual(self.repo.items, [])
 
+    def test_change_version(self):
+        initial = self.repo.change_version()
+        self.assertIsInstance(initial, ChangeVersion)
+        self.assertEqual(initial, self.repo.change_version())
+
+        entity = StubEntity(name='test', price=0)
+        self.repo.insert(entity)
+        inserted = self.repo.change_version()
+        self.assertNotEqual(initial.tag, inserted.tag)
+        self.assertGreaterEqual(inserted.last_modified, initial.last_modified)
+
+        self.repo.find_all()
+        self.repo.find_by_id(entity.id)
+        self.assertEqual(inserted, self.repo.change_version())
+
+        self.repo.update(entity)
+        updated = self.repo.change_version()
+        self.assertNotEqual(inserted.tag, updated.tag)
+
+        self.repo.delete(entity.id)
+        self.assertNotEqual(updated.tag, self.repo.change_version().tag)
+
+        self.assertNotEqual(StubInMemoryRepository().change_version().tag,
+                            StubInMemoryRepository().change_version().tag)
+
+    def test_entity_version(self):
+        entities = [
+            StubEntity(name='test 1', price=0),
+            StubEntity(name='test 2', price=1),
+        ]
+        self.repo.bulk_insert(entities)
+        version = self.repo.entity_version(entities[0].id)
+        self.assertEqual(version, self.repo.change_version())
+        self.assertEqual(
+            version, self.repo.entity_version(entities[1].unique_entity_id))
+
+        self.repo.update(entities[1])
+        self.assertEqual(version, self.repo.entity_version(entities[0].id))
+        self.assertNotEqual(version, self.repo.entity_version(entities[1].id))
+
+        self.repo.delete(entities[0].id)
+        with self.assertRaises(NotFoundException):
+            self.repo.entity_version(entities[0].id)
+
+    def test_entity_version_of_items_assigned_directly(self):
+        entity = StubEntity(name='test', price=0)
+        self.repo.items = [entity]
+        self.assertEqual(self.repo.entity_version(entity.id),
+                         self.repo.change_version())
+
 
 class TestSearchParams(unittest.TestCase):
 
@@ -195,6 +287,11 @@ class TestSearchParams(unittest.TestCase):
             input_params = SearchParams(sort='name', sort_dir=i['sort_dir'])
             self.assertEqual(input_params.sort_dir, i['expected'])
 
+        # best matches first
+        self.assertEqual(SearchParams(sort='relevance').sort_dir, SortDirection.DESC.value)
+        self.assertEqual(SearchParams(sort='relevance', sort_dir='asc').sort_dir,
+                         SortDirection.ASC.value)
+
     def test_filter_field(self):
         input_params = SearchParams()
         self.assertIsNone(input_params.filter)
@@ -214,6 +311,24 @@ class TestSearchParams(unittest.TestCase):
             input_params = SearchParams(filter=i['filter'])
             self.assertEqual(input_params.filter, i['expected'])
 
+    def test_fields_field(self):
+        input_params = SearchParams()
+        self.assertIsNone(input_params.fields)
+
+        arrange = [
+            {'fields': None, 'expected': None},
+            {'fields': "", 'expected': None},
+            {'fields': [], 'expected': None},
+            {'fields': " , ", 'expected': None},
+            {'fields': "name", 'expected': ['name']},
+            {'fields': "id, name,name", 'expected': ['id', 'name']},
+            {'fields': ['name', ' price ', ''], 'expected': ['name', 'price']},
+        ]
+
+        for i in arrange:
+            input_params = SearchParams(fields=i['fields'])
+            self.assertEqual(input_params.fields, i['expected'])
+
 
 class TestSearchResult(unittest.TestCase):
 
@@ -234,7 +349,8 @@ class TestSearchResult(unittest.TestCase):
             'last_page': 2,
             'sort': None,
             'sort_dir': None,
-            'filter': None
+            'filter': None,
+            'fields': None
         })
 
         output = SearchResult(
@@ -244,7 +360,8 @@ class TestSearchResult(unittest.TestCase):
             per_page=2,
             sort="name",
             sort_dir=SortDirection.ASC.value,
-            filter="test"
+            filter="test",
+            fields=['id', 'name']
         )
 
         self.assertDictEqual(output.to_dict(), {
@@ -255,7 +372,8 @@ class TestSearchResult(unittest.TestCase):
             'last_page': 2,
             'sort': "name",
             'sort_dir': SortDirection.ASC.value,
-            'filter': "test"
+            'filter': "test",
+            'fields': ['id', 'name']
         })
 
     def test_last_page_is_1_when_per_page_is_greater_than_total(self):
@@ -276,7 +394,8 @@ class TestSearchableRepositoryInterface(unittest.TestCase):
             SearchableRepositoryInterface()
         self.assertEqual(
             "Can't instantiate abstract class SearchableRepositoryInterface with abstract " +
-            "methods delete, find_all, find_by_id, insert, search, update",
+            "methods bulk_insert, change_version, delete, entity_version, find_all, find_by_id, " +
+            "find_by_ids, insert, iter_chunks, search, update",
             assert_error.exception.args[0]
         )
 
@@ -286,6 +405,7 @@ class TestSearchableRepositoryInterface(unittest.TestCase):
 
 class StubInMemorySearchableRepository(InMemorySearchableRepository[StubEntity]):
     sortable_fields: List[str] = ['name']
+    selectable_fields: List[str] = ['id', 'name', 'price']
 
     def _apply_filter(self, items: List[StubEntity], filter_param: str = None) -> List[StubEntity]:
         if filter_param:
@@ -406,6 +526,30 @@ class TestInMemorySearchableRepository(unittest.TestCase):
             filter=None
         ))
 
+    def test_search_applying_fields(self):
+        entities = [StubEntity(name='a', price=1), StubEntity(name='b', price=2)]
+        self.repo.items = entities
+
+        result = self.repo.search(SearchParams(fields='name,fake'))
+        self.assertEqual(result, SearchResult(
+            items=[
+                {'id': entities[0].id, 'name': 'a'},
+                {'id': entities[1].id, 'name': 'b'},
+            ],
+            total=2,
+            current_page=1,
+            per_page=15,
+            fields=['id', 'name']
+        ))
+
+        result = self.repo.search(SearchParams(fields='fake'))
+        self.assertEqual(result.items, entities)
+        self.assertIsNone(result.fields)
+
+        result = self.repo.search(SearchParams(fields='id'))
+        self.assertEqual(result.items, [{'id': entities[0].id}, {'id': entities[1].id}])
+        self.assertEqual(result.fields, ['id'])
+
     def test_search_applying_paginate_and_filter(self):
         items = [
             StubEntity(name='test', price=1),
@@ -0,0 +1,74 @@
+# pylint: disable=unexpected-keyword-arg
+import unittest
+
+from core.__seedwork.domain.specifications import AndSpecification, Contains, Equals, FullText, Fuzzy, Range, StartsWith
+from core.__seedwork.tests.unit.domain.test_unit_repositories import StubEntity
+
+
+class TestSpecifications(unittest.TestCase):
+
+    def test_is_satisfied_by(self):
+        entity = StubEntity(name='Movie', price=5)
+        arrange = [
+            (Equals('name', 'Movie'), True),
+            (Equals('name', 'movie'), False),
+            (Contains('name', 'OVI'), True),
+            (Contains('name', 'series'), False),
+            (StartsWith('name', 'MOV'), True),
+            (StartsWith('name', 'ovi'), False),
+            (Range('price', gte=5, lte=5), True),
+            (Range('price', gte=1), True),
+            (Range('price', lte=4), False),
+            (Range('price'), True),
+        ]
+        for spec, expected in arrange:
+            with self.subTest(spec=spec):
+                self.assertEqual(spec.is_satisfied_by(entity), expected)
+
+    def test_missing_values_never_match(self):
+        entity = StubEntity(name=None, price=None)
+        self.assertFalse(Contains('name', 'a').is_satisfied_by(entity))
+        self.assertFalse(StartsWith('name', '').is_satisfied_by(entity))
+        self.assertFalse(Range('price').is_satisfied_by(entity))
+        self.assertTrue(Equals('price', None).is_satisfied_by(entity))
+        self.assertFalse(FullText('a', ('name',)).is_satisfied_by(entity))
+
+    def test_full_text(self):
+        entity = StubEntity(name='Movies and series', price=5)
+        arrange = [
+            (FullText('movie', ('name',)), True),
+            (FullText('SERIES movies', ('name',)), True),
+            (FullText('movie shows', ('name',)), False),
+            (FullText('mov', ('name',)), False),
+            (FullText('', ('name',)), True),
+        ]
+        for spec, expected in arrange:
+            with self.subTest(spec=spec):
+                self.assertEqual(spec.is_satisfied_by(entity), expected)
+        self.assertEqual(FullText('Movies movie', ('name',)).terms(), ('movi',))
+
+    def test_fuzzy(self):
+        entity = StubEntity(name='Documentary films', price=5)
+        arrange = [
+            (Fuzzy('name', 'documentray'), True),
+            (Fuzzy('name', 'FILMZ documetnary'), True),
+            # swapped letters are one edit
+            (Fuzzy('name', 'flims', max_distance=1), True),
+            (Fuzzy('name', 'flmis', max_distance=1), False),
+            (Fuzzy('name', 'film'), True),
+            (Fuzzy('name', 'fi'), False),
+            (Fuzzy('name', 'documentary series'), False),
+        ]
+        for spec, expected in arrange:
+            with self.subTest(spec=spec):
+                self.assertEqual(spec.is_satisfied_by(entity), expected)
+        self.assertEqual(Fuzzy('name', 'TV movies tv').words(), (('tv', 0), ('movies', 2)))
+        self.assertFalse(Fuzzy('name', 'a').is_satisfied_by(StubEntity(name=None, price=5)))
+
+    def test_and(self):
+        by_name, by_price, in_range = Contains('name', 'mov'), Equals('price', 5), Range('price', lte=9)
+        spec = (by_name & by_price) & in_range
+        self.assertEqual(spec, AndSpecification((by_name, by_price, in_range)))
+        self.assertEqual(list(spec.conjuncts()), [by_name, by_price, in_range])
+        self.assertTrue(spec.is_satisfied_by(StubEntity(name='Movie', price=5)))
+        self.assertFalse(spec.is_satisfied_by(StubEntity(name='Movie', price=6)))
@@ -0,0 +1,104 @@
+import random
+import subprocess
+import sys
+import unittest
+
+from core.__seedwork.domain.text import (
+    Analyzer,
+    BKTree,
+    auto_fuzziness,
+    damerau_levenshtein,
+    levenshtein,
+    plural_stem
+)
+
+
+class TestAnalyzer(unittest.TestCase):
+
+    def test_plural_stem(self):
+        arrange = [
+            ('movie', 'movies'), ('category', 'categories'), ('box', 'boxes'),
+            ('class', 'classes'), ('film', 'films'), ('series', 'series'),
+        ]
+        for singular, plural in arrange:
+            with self.subTest(word=singular):
+                self.assertEqual(plural_stem(singular), plural_stem(plural))
+        for word in ('bus', 'analysis', 'gas'):
+            with self.subTest(word=word):
+                self.assertEqual(plural_stem(word), word)
+
+    def test_analyze(self):
+        self.assertEqual(Analyzer().analyze('Movies, and TV-series!'),
+                         ['movi', 'and', 'tv', 'seri'])
+        self.assertEqual(Analyzer(stemmer=None, stopwords=frozenset({'and'}))
+                         .analyze('Movies, and TV-series!'), ['movies', 'tv', 'series'])
+        self.assertEqual(Analyzer(tokenizer=str.split).analyze('Movies, and'), ['Movies,', 'and'])
+        self.assertEqual(Analyzer().analyze(None), [])
+
+    def test_repr_is_the_same_in_every_process(self):
+        code = 'from core.__seedwork.domain.text import Analyzer; print(repr(Analyzer()))'
+        other = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                               check=True, text=True).stdout.strip()
+        self.assertEqual(repr(Analyzer()), other)
+        self.assertEqual(other, "Analyzer(name='default', stopwords=frozenset())")
+
+
+class TestEditDistance(unittest.TestCase):
+
+    def test_levenshtein(self):
+        arrange = [
+            ('', '', 0), ('movie', '', 5), ('movie', 'movie', 0), ('movie', 'movies', 1),
+            ('movie', 'mvoie', 2), ('kitten', 'sitting', 3), ('flaw', 'lawn', 2),
+        ]
+        for first, second, expected in arrange:
+            with self.subTest(first=first, second=second):
+                self.assertEqual(levenshtein(first, second), expected)
+                self.assertEqual(levenshtein(second, first), expected)
+
+    def test_damerau_levenshtein(self):
+        arrange = [
+            ('', '', 0), ('movie', '', 5), ('movie', 'movies', 1), ('movie', 'mvoie', 1),
+            ('movei', 'movie', 1), ('kitten', 'sitting', 3), ('ca', 'abc', 2),
+            ('documentary', 'docuemntray', 2),
+        ]
+        for first, second, expected in arrange:
+            with self.subTest(first=first, second=second):
+                self.assertEqual(damerau_levenshtein(first, second), expected)
+                self.assertEqual(damerau_levenshtein(second, first), expected)
+
+    def test_damerau_levenshtein_is_a_metric(self):
+        rnd = random.Random(0)
+        words = list({''.join(rnd.choices('abc', k=rnd.randint(0, 5))) for _ in range(40)})
+        distances = {(first, second): damerau_levenshtein(first, second)
+                     for first in words for second in words}
+        for first in words:
+            for second in words:
+                for third in words:
+                    self.assertLessEqual(distances[first, third],
+                                         distances[first, second] + distances[second, third])
+
+    def test_auto_fuzziness(self):
+        self.assertEqual([auto_fuzziness(word) for word in ('tv', 'film', 'movies')], [0, 1, 2])
+
+    def test_bk_tree_search(self):
+        rnd = random.Random(0)
+        words = list({''.join(rnd.choices('abcdef', k=rnd.randint(3, 8))) for _ in range(2000)})
+        compared = []
+
+        def distance(first, second):
+            compared.append(second)
+            return damerau_levenshtein(first, second)
+
+        tree = BKTree(distance)
+        for word in words + words[:10]:
+            tree.add(word)
+        self.assertEqual(len(tree), len(words))
+
+        for query in ('abcab', 'fedcba', 'zzzz'):
+            with self.subTest(query=query):
+                compared.clear()
+                self.assertCountEqual(
+                    tree.search(query, 1),
+                    [(word, damerau_levenshtein(query, word)) for word in words
+                     if damerau_levenshtein(query, word) <= 1])
+                self.assertLess(len(compared), len(words) / 2)
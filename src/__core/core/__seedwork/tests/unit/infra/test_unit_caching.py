@@ -0,0 +1,134 @@
+import queue
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from core.__seedwork.domain.exceptions import NotFoundException
+from core.__seedwork.infra.caching import CachedRepository, cache_repository
+from core.__seedwork.infra.invalidation import Invalidation, UnixSocketInvalidationBus
+from core.__seedwork.infra.metrics import CacheMetrics, MetricsRegistry
+from core.__seedwork.tests.unit.domain.test_unit_repositories import (
+    StubEntity,
+    StubInMemoryRepository
+)
+
+
+class TestCachedRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.inner = StubInMemoryRepository()
+        self.registry = MetricsRegistry()
+        self.repo = CachedRepository(
+            self.inner, max_entries=2, metrics=CacheMetrics(self.registry, 'stub'))
+        self.entity = StubEntity(name='some name', price=5)
+        self.repo.insert(self.entity)
+
+    def test_cache_lookups_by_id(self):
+        version = self.inner.entity_version(self.entity.id)
+        self.assertEqual(self.repo.find_by_id(self.entity.id), self.entity)
+        self.assertEqual(self.repo.entity_version(self.entity.id), version)
+
+        self.inner.items = []
+        self.assertEqual(self.repo.find_by_id(self.entity.unique_entity_id), self.entity)
+        self.assertEqual(self.repo.entity_version(self.entity.id), version)
+        self.assertEqual(self.repo.metrics.hit_ratio(), 0.5)
+
+    def test_return_copies_of_cached_entities(self):
+        found = self.repo.find_by_id(self.entity.id)
+        self.assertIsNot(found, self.entity)
+        # a use case changing what it found and failing to save it
+        object.__setattr__(found, 'name', 'invalid')
+        self.assertEqual(self.repo.find_by_id(self.entity.id).name, 'some name')
+        self.assertIsNot(self.repo.find_by_id(self.entity.id),
+                         self.repo.find_by_id(self.entity.id))
+
+    def test_expire_entries_older_than_max_age(self):
+        self.repo.max_age = 10.0
+        with patch('core.__seedwork.infra.caching.time.monotonic', return_value=100.0):
+            self.repo.find_by_id(self.entity.id)
+        self.inner.items = []
+        with patch('core.__seedwork.infra.caching.time.monotonic', return_value=109.0):
+            self.repo.find_by_id(self.entity.id)
+        with patch('core.__seedwork.infra.caching.time.monotonic', return_value=110.0), \
+                self.assertRaises(NotFoundException):
+            self.repo.find_by_id(self.entity.id)
+        self.assertEqual(len(self.repo), 0)
+
+    def test_delegate_everything_else(self):
+        self.assertEqual(self.repo.find_all(), [self.entity])
+        self.assertEqual(self.repo.change_version(), self.inner.change_version())
+
+    def test_writes_drop_cached_entries(self):
+        self.repo.find_by_id(self.entity.id)
+        version = self.repo.entity_version(self.entity.id)
+
+        self.repo.update(self.entity)
+        self.assertNotEqual(self.repo.entity_version(self.entity.id), version)
+
+        self.repo.delete(self.entity.id)
+        with self.assertRaises(NotFoundException):
+            self.repo.find_by_id(self.entity.id)
+
+    def test_evict_least_recently_used(self):
+        entities = [StubEntity(name=f'name {index}', price=index) for index in range(2)]
+        self.repo.bulk_insert(entities)
+        self.repo.find_by_id(self.entity.id)
+        self.repo.find_by_id(entities[0].id)
+        self.repo.find_by_id(self.entity.id)
+        self.repo.find_by_id(entities[1].id)
+
+        self.assertEqual(len(self.repo), 2)
+        self.inner.items = [self.entity]
+        self.assertEqual(self.repo.find_by_id(self.entity.id), self.entity)
+        with self.assertRaises(NotFoundException):
+            self.repo.find_by_id(entities[0].id)
+
+    def test_invalidate(self):
+        self.repo.find_by_id(self.entity.id)
+        self.repo.invalidate(Invalidation(('unknown',)))
+        self.assertEqual(len(self.repo), 1)
+        self.repo.invalidate(Invalidation((self.entity.id,)))
+        self.assertEqual(len(self.repo), 0)
+
+        self.repo.find_by_id(self.entity.id)
+        self.repo.invalidate(Invalidation(None))
+        self.assertEqual(len(self.repo), 0)
+
+    def test_do_not_store_entries_read_during_an_invalidation(self):
+        def find_by_id(entity_id):
+            entity = self.inner.find_by_id(entity_id)
+            self.repo.invalidate(Invalidation((entity_id,)))
+            return entity
+
+        self.repo.repository = type('Racing', (), {'find_by_id': staticmethod(find_by_id)})()
+        self.assertEqual(self.repo.find_by_id(self.entity.id), self.entity)
+        self.assertEqual(len(self.repo), 0)
+
+    def test_invalidate_other_processes_through_the_bus(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        buses = [UnixSocketInvalidationBus(directory.name) for _ in range(2)]
+        for bus in buses:
+            self.addCleanup(bus.close)
+        received: 'queue.Queue[Invalidation]' = queue.Queue()
+        buses[1].subscribe(received.put)
+        writer = CachedRepository(self.inner, buses[0])
+        reader = CachedRepository(self.inner, buses[1])
+
+        reader.find_by_id(self.entity.id)
+        writer.delete(self.entity.id)
+
+        invalidation = received.get(timeout=1)
+        self.assertEqual(invalidation.entity_ids, (self.entity.id,))
+        self.assertEqual(invalidation.version, self.inner.change_version().tag)
+        self.assertEqual(len(reader), 0)
+
+    def test_cache_repository(self):
+        def bus():
+            raise AssertionError('the bus is only opened when caching is enabled')
+
+        self.assertIs(cache_repository(self.inner, bus, self.registry, 'stub'), self.inner)
+        cached = cache_repository(self.inner, lambda: None, self.registry, 'stub',
+                                  enabled=True, max_entries=5)
+        self.assertIsInstance(cached, CachedRepository)
+        self.assertEqual(cached.max_entries, 5)
@@ -0,0 +1,157 @@
+import json
+import os
+import queue
+import socket
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from core.__seedwork.infra.invalidation import Invalidation, UnixSocketInvalidationBus
+
+
+class TestUnixSocketInvalidationBus(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def open(self, **kwargs) -> UnixSocketInvalidationBus:
+        bus = UnixSocketInvalidationBus(self.directory, **kwargs)
+        self.addCleanup(bus.close)
+        return bus
+
+    def subscribe(self, bus: UnixSocketInvalidationBus) -> 'queue.Queue[Invalidation]':
+        received: 'queue.Queue[Invalidation]' = queue.Queue()
+        bus.subscribe(received.put)
+        return received
+
+    def test_broadcast_to_other_buses(self):
+        publisher = self.open()
+        first, second = self.open(), self.open()
+        publisher_received = self.subscribe(publisher)
+        received = [self.subscribe(first), self.subscribe(second)]
+
+        publisher.publish(['1', '2'], version='abc-3')
+
+        for invalidations in received:
+            invalidation = invalidations.get(timeout=1)
+            self.assertEqual(invalidation.entity_ids, ('1', '2'))
+            self.assertEqual(invalidation.version, 'abc-3')
+            self.assertEqual(invalidation.origin, os.getpid())
+        self.assertTrue(publisher_received.empty())
+        self.assertEqual(publisher.published, 1)
+        self.assertEqual(first.received, 1)
+        self.assertLess(first.last_latency, 0.5)
+
+    def test_invalidate_everything_when_too_many_ids(self):
+        publisher = self.open(max_ids=2)
+        received = self.subscribe(self.open())
+
+        publisher.publish(['1', '2', '3'])
+        publisher.publish(None)
+
+        self.assertIsNone(received.get(timeout=1).entity_ids)
+        self.assertIsNone(received.get(timeout=1).entity_ids)
+
+    def test_invalidate_everything_after_a_lost_invalidation(self):
+        publisher = self.open()
+        subscriber = self.open()
+        received = self.subscribe(subscriber)
+
+        publisher.publish(['1'])
+        self.assertEqual(received.get(timeout=1).entity_ids, ('1',))
+        # the datagram numbered 2 never arrived
+        with self.assertLogs('core.invalidation', 'WARNING'), \
+                socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.sendto(json.dumps({'ids': ['3'], 'version': None, 'origin': 1, 'sent_at': 0.0,
+                                      'sender': publisher.path, 'seq': 3}).encode(),
+                          subscriber.path)
+            self.assertIsNone(received.get(timeout=1).entity_ids)
+        self.assertEqual(subscriber.missed, 1)
+
+        publisher.publish(['4'])
+        self.assertIsNone(received.get(timeout=1).entity_ids)
+        publisher.publish(['5'])
+        self.assertEqual(received.get(timeout=1).entity_ids, ('5',))
+
+    def test_keep_delivering_when_a_subscriber_fails(self):
+        publisher = self.open()
+        subscriber = self.open()
+        subscriber.subscribe(lambda invalidation: 1 / 0)
+        received = self.subscribe(subscriber)
+
+        with self.assertLogs('core.invalidation', 'ERROR'):
+            publisher.publish(['1'])
+            received.get(timeout=1)
+        publisher.publish(['2'])
+        self.assertEqual(received.get(timeout=1).entity_ids, ('2',))
+
+    def test_remove_sockets_of_dead_processes(self):
+        publisher = self.open()
+        stale = os.path.join(self.directory, 'invalidation-1-1.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as dead:
+            dead.bind(stale)
+
+        publisher.publish(['1'])
+
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(publisher.peers(), [])
+
+    def test_count_peers_that_cannot_be_sent_to_as_dropped(self):
+        publisher = self.open()
+        received = self.subscribe(self.open())
+        foreign = os.path.join(self.directory, 'invalidation-2-1.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as other:
+            other.bind(foreign)
+            send = publisher._sender.sendto  # pylint: disable=protected-access
+
+            def sendto(message, peer):
+                if peer == foreign:
+                    raise PermissionError(13, 'Permission denied')
+                return send(message, peer)
+
+            with patch.object(publisher, '_sender') as sender, \
+                    self.assertLogs('core.invalidation', 'WARNING'):
+                sender.sendto.side_effect = sendto
+                publisher.publish(['1'])
+
+        self.assertEqual(received.get(timeout=1).entity_ids, ('1',))
+        self.assertEqual(publisher.dropped, 1)
+
+    def test_keep_deployments_apart(self):
+        with patch('core.__seedwork.infra.invalidation.default_directory',
+                   return_value=self.directory):
+            buses = [UnixSocketInvalidationBus(namespace=namespace)
+                     for namespace in ('first', 'first', 'second')]
+        for bus in buses:
+            self.addCleanup(bus.close)
+
+        self.assertEqual(buses[0].peers(), [buses[1].path])
+        self.assertEqual(buses[2].peers(), [])
+        self.assertEqual(os.stat(buses[2].directory).st_mode & 0o777, 0o700)
+        self.assertEqual(os.path.dirname(buses[0].directory), self.directory)
+
+    def test_close_removes_socket(self):
+        bus = UnixSocketInvalidationBus(self.directory)
+        self.assertTrue(os.path.exists(bus.path))
+        bus.close()
+        self.assertFalse(os.path.exists(bus.path))
+
+    def test_forked_child_gets_its_own_socket(self):
+        bus = self.open()
+        received = self.subscribe(bus)
+        parent_path = bus.path
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            code = 0 if bus.path != parent_path and os.path.exists(bus.path) else 1
+            bus.publish(['child'])
+            bus.close()
+            os._exit(code)  # pylint: disable=protected-access
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+        invalidation = received.get(timeout=1)
+        self.assertEqual(invalidation.entity_ids, ('child',))
+        self.assertEqual(invalidation.origin, pid)
+        self.assertTrue(os.path.exists(parent_path))
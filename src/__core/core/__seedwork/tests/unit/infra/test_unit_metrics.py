@@ -0,0 +1,208 @@
+import threading
+import unittest
+
+from core.__seedwork.application.interceptors import InterceptorChain
+from core.__seedwork.application.use_cases import UseCase
+from core.__seedwork.infra.metrics import (
+    CacheMetrics,
+    InstrumentedRepository,
+    MetricsInterceptor,
+    MetricsRegistry,
+    instrument_repository,
+    metrics_interceptors
+)
+
+
+class StubUseCase(UseCase):
+
+    def execute(self, request):
+        if request == 'invalid':
+            raise ValueError('invalid request')
+        return request
+
+
+class StubRepository:
+
+    def __init__(self):
+        self.items = []
+
+    def insert(self, entity):
+        self.items.append(entity)
+
+    def search(self, input_params):
+        return input_params
+
+    def custom(self):
+        return 'custom'
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    registry: MetricsRegistry
+
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+
+    def test_counter(self):
+        counter = self.registry.counter(
+            'requests', 'Requests served.', ('route',))
+        counter.labels('/a').inc()
+        counter.labels('/a').inc(2)
+        counter.labels('/b').inc()
+
+        self.assertEqual(counter.labels('/a').value, 3)
+        self.assertEqual(self.registry.expose(), '\n'.join([
+            '# HELP requests_total Requests served.',
+            '# TYPE requests_total counter',
+            'requests_total{route="/a"} 3.0',
+            'requests_total{route="/b"} 1.0',
+        ]) + '\n')
+
+    def test_counter_is_consistent_across_threads(self):
+        counter = self.registry.counter('hits', 'Hits.')
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.labels().value, 8000)
+
+    def test_fold_cells_of_finished_threads(self):
+        histogram = self.registry.histogram('latency', 'Latency.', buckets=(1.0,))
+        histogram.observe(0.5)
+        for _ in range(100):
+            thread = threading.Thread(target=histogram.observe, args=(2.0,))
+            thread.start()
+            thread.join()
+
+        child = histogram.labels()
+        # only the cell of the main thread, which still runs, is left
+        self.assertEqual(len(child._cells), 1)
+        self.assertEqual(child.snapshot(), ([1.0, 101.0], 200.5, 101.0))
+
+    def test_histogram(self):
+        histogram = self.registry.histogram(
+            'latency', 'Latency.', ('route',), buckets=(0.1, 1))
+        histogram.labels('/a').observe(0.05)
+        histogram.labels('/a').observe(0.5)
+        histogram.labels('/a').observe(5)
+        with histogram.labels('/b').time():
+            pass
+
+        lines = self.registry.expose().splitlines()
+        self.assertEqual(lines[:7], [
+            '# HELP latency Latency.',
+            '# TYPE latency histogram',
+            'latency_bucket{route="/a",le="0.1"} 1.0',
+            'latency_bucket{route="/a",le="1.0"} 2.0',
+            'latency_bucket{route="/a",le="+Inf"} 3.0',
+            'latency_sum{route="/a"} 5.55',
+            'latency_count{route="/a"} 3.0',
+        ])
+        self.assertIn('latency_count{route="/b"} 1.0', lines)
+
+    def test_gauge(self):
+        values = [1, 2]
+        gauge = self.registry.gauge('items', 'Items.', ('repository',))
+        gauge.set_function(lambda: len(values), 'stub')
+        self.assertIn('items{repository="stub"} 2.0',
+                      self.registry.expose())
+        values.append(3)
+        self.assertIn('items{repository="stub"} 3.0',
+                      self.registry.expose())
+
+    def test_escape_label_values(self):
+        self.registry.counter('escaped', 'Escaped.', ('value',)).labels(
+            'a"b\\c\nd').inc()
+        self.assertIn('escaped_total{value="a\\"b\\\\c\\nd"} 1.0',
+                      self.registry.expose())
+
+    def test_register_returns_existing_metric(self):
+        counter = self.registry.counter('hits', 'Hits.', ('cache',))
+        self.assertIs(self.registry.counter(
+            'hits', 'Hits.', ('cache',)), counter)
+        self.assertIs(self.registry.get('hits'), counter)
+        with self.assertRaises(ValueError):
+            self.registry.histogram('hits', 'Hits.', ('cache',))
+        with self.assertRaises(ValueError):
+            self.registry.counter('hits', 'Hits.', ('other',))
+
+    def test_throw_error_when_labels_do_not_match(self):
+        counter = self.registry.counter('hits', 'Hits.', ('cache',))
+        with self.assertRaises(ValueError):
+            counter.labels('a', 'b')
+
+
+class TestMetricsInterceptor(unittest.TestCase):
+
+    def test_observe_use_case_duration(self):
+        registry = MetricsRegistry()
+        use_case = InterceptorChain(
+            (MetricsInterceptor(registry),)).wrap(StubUseCase())
+        use_case.execute('request')
+        with self.assertRaises(ValueError):
+            use_case.execute('invalid')
+
+        exposed = registry.expose()
+        self.assertIn(
+            'use_case_duration_seconds_count{use_case="StubUseCase",outcome="success"} 1.0', exposed)
+        self.assertIn(
+            'use_case_duration_seconds_count{use_case="StubUseCase",outcome="error"} 1.0', exposed)
+
+    def test_metrics_interceptors(self):
+        registry = MetricsRegistry()
+        self.assertEqual(metrics_interceptors(registry, enabled=False), [])
+        interceptors = metrics_interceptors(registry)
+        self.assertIsInstance(interceptors[0], MetricsInterceptor)
+
+
+class TestInstrumentedRepository(unittest.TestCase):
+
+    def test_count_operations_and_items(self):
+        registry = MetricsRegistry()
+        repository = StubRepository()
+        instrumented = instrument_repository(repository, registry)
+        self.assertIsInstance(instrumented, InstrumentedRepository)
+
+        instrumented.insert('entity')
+        self.assertEqual(instrumented.search('params'), 'params')
+        self.assertEqual(instrumented.search('params'), 'params')
+        self.assertEqual(instrumented.custom(), 'custom')
+        self.assertIs(instrumented.items, repository.items)
+
+        exposed = registry.expose()
+        self.assertIn(
+            'repository_operations_total{repository="StubRepository",operation="insert"} 1.0', exposed)
+        self.assertIn(
+            'repository_operations_total{repository="StubRepository",operation="search"} 2.0', exposed)
+        self.assertNotIn('operation="find_by_id"', exposed)
+        self.assertIn(
+            'repository_items{repository="StubRepository"} 1.0', exposed)
+
+    def test_return_repository_when_disabled(self):
+        repository = StubRepository()
+        self.assertIs(instrument_repository(
+            repository, MetricsRegistry(), enabled=False), repository)
+
+
+class TestCacheMetrics(unittest.TestCase):
+
+    def test_hit_ratio(self):
+        registry = MetricsRegistry()
+        cache = CacheMetrics(registry, 'categories')
+        self.assertEqual(cache.hit_ratio(), 0)
+        cache.hit()
+        cache.hit()
+        cache.hit()
+        cache.miss()
+        self.assertEqual(cache.hit_ratio(), 0.75)
+
+        exposed = registry.expose()
+        self.assertIn(
+            'cache_requests_total{cache="categories",result="hit"} 3.0', exposed)
+        self.assertIn('cache_hit_ratio{cache="categories"} 0.75', exposed)
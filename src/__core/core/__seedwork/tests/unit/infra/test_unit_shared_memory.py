@@ -0,0 +1,150 @@
+import os
+import struct
+import tempfile
+import threading
+import unittest
+
+from core.__seedwork.infra.shared_memory import KEY_SIZE, SharedLog
+
+FIRST = b'1' * KEY_SIZE
+SECOND = b'2' * KEY_SIZE
+
+
+class TestSharedLog(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'log')
+        self.log = self.open()
+
+    def open(self) -> SharedLog:
+        log = SharedLog(self.path)
+        self.addCleanup(log.close)
+        return log
+
+    def entries(self, log: SharedLog):
+        view = log.view()
+        return [(view.key(position), view.data(position)) for position in range(len(view))]
+
+    def test_state_is_empty_before_anything_is_published(self):
+        self.assertEqual(self.log.state(), (0, 0, 0))
+        self.assertTrue(os.path.exists(f'{self.path}.ctl'))
+
+    def test_write_and_view(self):
+        with self.log.writer():
+            self.log.start(b'{}')
+            self.log.write(b'1', puts=[(FIRST, b'first'), (SECOND, b'second')], new=True)
+            self.log.write(b'2', puts=[(FIRST, b'first again')])
+            self.log.write(b'3', deletes=[SECOND])
+
+        self.assertEqual(self.log.state()[::2], (1, 8))
+        self.assertEqual(self.entries(self.log), [(FIRST, b'first again')])
+        view = self.log.view()
+        self.assertEqual(view.meta, b'3')
+        self.assertEqual(view.find(FIRST), 0)
+        self.assertIsNone(view.find(SECOND))
+
+    def test_views_do_not_change(self):
+        with self.log.writer():
+            self.log.start(b'{}')
+            self.log.write(b'1', puts=[(FIRST, b'first')], new=True)
+        view = self.log.view()
+        with self.log.writer():
+            self.log.write(b'2', puts=[(FIRST, b'changed'), (SECOND, b'second')])
+
+        self.assertEqual((len(view), view.data(0), view.meta), (1, b'first', b'1'))
+        self.assertEqual(len(self.log.view()), 2)
+
+    def test_other_handles_see_published_lines(self):
+        other = self.open()
+        with self.log.writer():
+            self.log.start(b'{}')
+            self.log.write(b'1', puts=[(FIRST, b'first')], new=True)
+        with other.writer():
+            other.write(b'2', puts=[(SECOND, b'second')], new=True)
+
+        self.assertEqual(self.log.state(), other.state())
+        self.assertEqual(self.entries(self.log),
+                         [(FIRST, b'first'), (SECOND, b'second')])
+
+    def test_compact_starts_a_new_log(self):
+        other = self.open()
+        with self.log.writer():
+            self.log.start(b'{}')
+            self.log.write(b'1', puts=[(FIRST, b'first'), (SECOND, b'second')], new=True)
+            self.log.write(b'2', deletes=[FIRST])
+        old_view = other.view()
+
+        with self.log.writer():
+            self.log.compact()
+
+        self.assertEqual(self.log.state(), (2, len(b'P' + SECOND.hex().encode() + b' second\nM 2\n'), 2))
+        self.assertFalse(os.path.exists(f'{self.path}.1'))
+        self.assertFalse(os.path.exists(f'{self.path}.1.idx'))
+        self.assertEqual(self.entries(other), [(SECOND, b'second')])
+        self.assertEqual(other.view().meta, b'2')
+        # the old log stays mapped for the views taken before
+        self.assertEqual(old_view.data(0), b'second')
+
+    def test_read_while_the_writer_compacts(self):
+        other = self.open()
+        with self.log.writer():
+            self.log.start(b'{}')
+            self.log.write(b'1', puts=[(FIRST, b'first'), (SECOND, b'second')], new=True)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    self.assertEqual(self.entries(self.log)[0], (FIRST, b'first'))
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for _ in range(50):
+            with self.log.writer():
+                self.log.write(b'2', puts=[(SECOND, b'again')])
+                self.log.compact()
+            with other.writer():
+                other.compact()
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        self.assertEqual(errors, [])
+        # the next write closes the files of the log the other handle replaced
+        with self.log.writer():
+            self.log.write(b'3')
+        self.assertEqual({log_id for log_id, _ in self.log._fds},  # pylint: disable=protected-access
+                         {self.log.state()[0]})
+
+    def test_repair_counter_left_odd_by_a_dead_writer(self):
+        with self.log.writer():
+            self.log.start(b'{}')
+            self.log.write(b'1', puts=[(FIRST, b'first'), (SECOND, b'second')], new=True)
+            self.log.write(b'2', deletes=[FIRST])
+        # a writer died halfway through editing the index
+        control_fd = os.open(f'{self.path}.ctl', os.O_RDWR)
+        self.addCleanup(os.close, control_fd)
+        seq = struct.unpack('<Q', os.pread(control_fd, 8, 0))[0]
+        os.pwrite(control_fd, struct.pack('<Q', seq + 1), 0)
+        index_fd = os.open(f'{self.path}.1.idx', os.O_RDWR)
+        self.addCleanup(os.close, index_fd)
+        os.pwrite(index_fd, b'\0' * 8, 0)
+
+        other = self.open()
+        self.assertEqual(self.entries(other), [(SECOND, b'second')])
+        self.assertEqual(other.view().meta, b'2')
+        self.assertEqual(struct.unpack('<Q', os.pread(control_fd, 8, 0))[0], seq + 2)
+
+    def test_unlink(self):
+        with self.log.writer():
+            self.log.start(b'{}')
+        self.log.unlink()
+        self.assertFalse(os.path.exists(f'{self.path}.1'))
+        self.assertFalse(os.path.exists(f'{self.path}.1.idx'))
+        self.assertFalse(os.path.exists(f'{self.path}.ctl'))
@@ -1,13 +1,21 @@
 
 # pylint: disable=unexpected-keyword-arg
 
-from dataclasses import dataclass, asdict
-from typing import Optional
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from core.category.domain.entities import Category
 from core.category.domain.repositories import CategoryRepository
-from core.category.application.dto import CategoryOutput
-from core.__seedwork.application.dto import PaginationOutput, PaginationOutputMapper, SearchInput
-from core.__seedwork.application.use_cases import UseCase
+from core.category.application.dto import CategoryOutput, CategoryOutputMapper
+from core.__seedwork.application.dto import (
+    BatchItemError,
+    PaginationOutput,
+    PaginationOutputMapper,
+    ResourceVersion,
+    SearchInput
+)
+from core.__seedwork.application.use_cases import UseCase, stage
+from core.__seedwork.domain.exceptions import NotFoundException, ValidationException
 
 
 @dataclass(slots=True, frozen=True)
@@ -16,13 +24,16 @@ class CreateCategoryUseCase(UseCase):
     category_repo: CategoryRepository
 
     def execute(self, request: 'Input') -> 'Output':
-        category = Category(
-            name=request.name,
-            description=request.description,
-            is_active=request.is_active
-        )
-        self.category_repo.insert(category)
-        return self.__to_output(category)
+        with stage('validation'):
+            category = Category(
+                name=request.name,
+                description=request.description,
+                is_active=request.is_active
+            )
+        with stage('repository'):
+            self.category_repo.insert(category)
+        with stage('mapping'):
+            return self.__to_output(category)
 
     def __to_output(self, category: Category) -> 'Output':
         return self.Output(**category.to_dict())
@@ -39,14 +50,63 @@ class CreateCategoryUseCase(UseCase):
         pass
 
 
+@dataclass(slots=True, frozen=True)
+class CreateCategoriesBatchUseCase(UseCase):
+
+    category_repo: CategoryRepository
+
+    def execute(self, request: 'Input') -> 'Output':
+        categories = []
+        errors = []
+        with stage('validation'):
+            for index, item in enumerate(request.items):
+                try:
+                    categories.append(Category(
+                        name=item.name,
+                        description=item.description,
+                        is_active=item.is_active
+                    ))
+                except ValidationException as exception:
+                    errors.append(BatchItemError(
+                        index=index, errors=exception.error))
+
+        if categories:
+            with stage('repository'):
+                self.category_repo.bulk_insert(categories)
+        with stage('mapping'):
+            return self.__to_output(categories, errors)
+
+    def __to_output(self, categories: List[Category], errors: List[BatchItemError]) -> 'Output':
+        items = list(map(CategoryOutputMapper.to_output, categories))
+        return self.Output(items=items, errors=errors)
+
+    @dataclass(slots=True, frozen=True)
+    class Input:
+        items: List[CreateCategoryUseCase.Input]
+
+    @dataclass(slots=True, frozen=True)
+    class Output:
+        items: List[CategoryOutput]
+        errors: List[BatchItemError]
+
+
 @dataclass(slots=True, frozen=True)
 class GetCategoryUseCase(UseCase):
 
     category_repo: CategoryRepository
 
     def execute(self, request: 'Input') -> 'Output':
-        category = self.category_repo.find_by_id(request.id)
-        return self.__to_output(category)
+        with stage('repository'):
+            category = self.category_repo.find_by_id(request.id)
+        with stage('mapping'):
+            return self.__to_output(category)
+
+    def version(self, request: 'Input') -> Optional[ResourceVersion]:
+        try:
+            change = self.category_repo.entity_version(request.id)
+        except NotFoundException:
+            return None
+        return ResourceVersion.of(change, request.id)
 
     def __to_output(self, category: Category) -> 'Output':
         return self.Output(**category.to_dict())
@@ -60,19 +120,113 @@ class GetCategoryUseCase(UseCase):
         pass
 
 
+@dataclass(slots=True, frozen=True)
+class GetCategoriesByIdsUseCase(UseCase):
+
+    category_repo: CategoryRepository
+
+    def execute(self, request: 'Input') -> 'Output':
+        with stage('repository'):
+            categories = self.category_repo.find_by_ids(request.ids)
+        with stage('mapping'):
+            return self.__to_output(request.ids, categories)
+
+    def __to_output(self, ids: List[str], categories: List[Category]) -> 'Output':
+        categories_by_id = {category.id: category for category in categories}
+        items = []
+        not_found = []
+        for entity_id in dict.fromkeys(ids):
+            category = categories_by_id.get(entity_id)
+            if category is None:
+                not_found.append(entity_id)
+            else:
+                items.append(CategoryOutputMapper.to_output(category))
+        return self.Output(items=items, not_found=not_found)
+
+    @dataclass(slots=True, frozen=True)
+    class Input:
+        ids: List[str]
+
+    @dataclass(slots=True, frozen=True)
+    class Output:
+        items: List[CategoryOutput]
+        not_found: List[str]
+
+
+@dataclass(slots=True, frozen=True)
+class SuggestCategoriesUseCase(UseCase):
+
+    category_repo: CategoryRepository
+
+    max_limit = 50
+
+    def execute(self, request: 'Input') -> 'Output':
+        with stage('validation'):
+            # out of range limits are clamped, as per_page falls back
+            limit = min(max(request.limit, 1), self.max_limit)
+        with stage('repository'):
+            categories = self.category_repo.suggest(request.prefix, limit)
+        with stage('mapping'):
+            return self.Output(items=list(map(CategoryOutputMapper.to_output, categories)))
+
+    @dataclass(slots=True, frozen=True)
+    class Input:
+        prefix: str
+        limit: int = 10
+
+    @dataclass(slots=True, frozen=True)
+    class Output:
+        items: List[CategoryOutput]
+
+
+# The view asks for the version of a search before executing it, and the
+# single-flight key is the etag of that same version: the last one
+# computed in this context is kept, keyed by use case and request identity
+# and by change tag, so the search params are not hashed twice.
+_last_list_version: ContextVar[Optional[Tuple[Any, Any, str, ResourceVersion]]] = \
+    ContextVar('last_list_version', default=None)
+
+
 @dataclass(slots=True, frozen=True)
 class ListCategoriesUseCase(UseCase):
 
     category_repo: CategoryRepository
 
     def execute(self, request: 'Input') -> 'Output':
-        search_params = CategoryRepository.SearchParams(**asdict(request))
-        result = self.category_repo.search(search_params)
-        return self.__to_output(result)
+        with stage('validation'):
+            search_params = self.__search_params(request)
+        with stage('repository'):
+            result = self.category_repo.search(search_params)
+        with stage('mapping'):
+            return self.__to_output(result)
+
+    def version(self, request: 'Input') -> ResourceVersion:
+        change = self.category_repo.change_version()
+        last = _last_list_version.get()
+        if last is not None and last[0] is self and last[1] is request \
+                and last[2] == change.tag:
+            return last[3]
+        # the repr names the filter specification classes, which
+        # asdict() would flatten into lookalike dicts
+        version = ResourceVersion.of(change, self.__search_params(request))
+        _last_list_version.set((self, request, change.tag, version))
+        return version
+
+    def coalescing_key(self, request: 'Input') -> str:
+        # normalized params plus the repository version, so a search that
+        # starts after a write never shares a result read before it
+        return self.version(request).etag
+
+    @staticmethod
+    def __search_params(request: 'Input') -> CategoryRepository.SearchParams:
+        # shallow, so a Specification filter is passed on as it is
+        return CategoryRepository.SearchParams(
+            **{field.name: getattr(request, field.name) for field in fields(request)})
 
     def __to_output(self, result: CategoryRepository.SearchResult) -> 'Output':
-        items = list(map(lambda category: CategoryOutput(
-            **category.to_dict()), result.items))
+        # with ?fields= the repository already returns projected dicts
+        items = result.items if result.fields else list(
+            map(CategoryOutputMapper.to_output, result.items))
         return PaginationOutputMapper.to_output(items=items, result=result)
 
     @dataclass(slots=True, frozen=True)
@@ -80,8 +234,31 @@ class ListCategoriesUseCase(UseCase):
         pass
 
     @dataclass(slots=True, frozen=True)
-    class Output(PaginationOutput[CategoryOutput]):
-        pass
+    class Output(PaginationOutput[CategoryOutput | Dict[str, Any]]):
+        """Holds CategoryOutput items, or dicts of the selected fields
+        when the search asked for some."""
+
+
+@dataclass(slots=True, frozen=True)
+class ExportCategoriesUseCase(UseCase):
+
+    category_repo: CategoryRepository
+
+    def execute(self, request: 'Input') -> 'Output':
+        # chunks are read and mapped lazily, while the caller consumes them
+        chunks = self.category_repo.iter_chunks(request.chunk_size)
+        return self.Output(chunks=map(self.__to_output, chunks))
+
+    def __to_output(self, categories: List[Category]) -> List[CategoryOutput]:
+        return list(map(CategoryOutputMapper.to_output, categories))
+
+    @dataclass(slots=True, frozen=True)
+    class Input:
+        chunk_size: int = 500
+
+    @dataclass(slots=True, frozen=True)
+    class Output:
+        chunks: Iterator[List[CategoryOutput]]
 
 
 @dataclass(slots=True, frozen=True)
@@ -90,17 +267,22 @@ class UpdateCategoryUseCase(UseCase):
     category_repo: CategoryRepository
 
     def execute(self, request: 'Input') -> 'Output':
-        entity = self.category_repo.find_by_id(request.id)
-        entity.update(request.name, request.description)
+        with stage('repository'):
+            entity = self.category_repo.find_by_id(request.id)
+
+        with stage('validation'):
+            entity.update(request.name, request.description)
 
-        if request.is_active is True:
-            entity.activate()
+            if request.is_active is True:
+                entity.activate()
 
-        if request.is_active is False:
-            entity.deactivate()
+            if request.is_active is False:
+                entity.deactivate()
 
-        self.category_repo.update(entity)
-        return self.__to_output(entity)
+        with stage('repository'):
+            self.category_repo.update(entity)
+        with stage('mapping'):
+            return self.__to_output(entity)
 
     def __to_output(self, category: Category) -> 'Output':
         return self.Output(**category.to_dict())
@@ -124,7 +306,8 @@ class DeleteCategoryUseCase(UseCase):
     category_repo: CategoryRepository
 
     def execute(self, request: 'Input') -> None:
-        self.category_repo.delete(request.id)
+        with stage('repository'):
+            self.category_repo.delete(request.id)
 
     @dataclass(slots=True, frozen=True)
     class Input:
@@ -1,3 +1,4 @@
 from .entities import *
 from .repositories import *
 from .validations import *
+from .filters import *
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from core.__seedwork.domain.drf_fields import (
+    StrictBooleanField,
+    StrictCharField,
+    UniqueEntityIdField
+)
+
+# pylint: disable=abstract-method
+
+
+class CategoryRules(serializers.Serializer):
+    unique_entity_id = UniqueEntityIdField()
+    name = StrictCharField(max_length=255)
+    description = StrictCharField(required=False, allow_null=True)
+    is_active = StrictBooleanField(required=False)
+    created_at = serializers.DateTimeField()
@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+import uuid
+
+from core.__seedwork.domain.exceptions import ValidationException
+from core.__seedwork.domain.specifications import (
+    AndSpecification,
+    Contains,
+    Equals,
+    FullText,
+    Fuzzy,
+    Range,
+    Specification,
+    StartsWith
+)
+
+FilterConditions = Mapping[str, Any]
+# what filter[text] searches, see FullText
+TEXT_FIELDS = ('name', 'description')
+
+
+def _parse_id(value: Any) -> str:
+    return str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes'):
+        return True
+    if text in ('0', 'false', 'no'):
+        return False
+    raise ValueError(value)
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    # created_at is a naive local time
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+def _parse_str(value: Any) -> str:
+    return str(value)
+
+
+def _parse_fuzziness(value: Any) -> int:
+    # more edits than two match most short words, and search most of the tree
+    fuzziness = int(value)
+    if not 0 <= fuzziness <= 2:
+        raise ValueError(value)
+    return fuzziness
+
+
+# field: (value parser, error message, operators)
+_FIELDS: Dict[str, Tuple[Callable[[Any], Any], str, Tuple[str, ...]]] = {
+    'id': (_parse_id, 'Enter a valid UUID.', ('eq',)),
+    'name': (_parse_str, 'Enter a valid text.', ('eq', 'contains', 'startswith', 'fuzzy', 'fuzziness')),
+    'description': (_parse_str, 'Enter a valid text.', ('contains',)),
+    'is_active': (_parse_bool, 'Enter true or false.', ('eq',)),
+    'created_at': (_parse_datetime, 'Enter a valid ISO 8601 date/time.', ('eq', 'gte', 'lte')),
+    'text': (_parse_str, 'Enter a valid text.', ('eq',)),
+}
+# operators that parse their value their own way
+_OPERATORS: Dict[str, Tuple[Callable[[Any], Any], str]] = {
+    'fuzziness': (_parse_fuzziness, 'Enter 0, 1 or 2.'),
+}
+
+
+def category_filter(conditions: FilterConditions, search: Optional[str] = None) -> Optional[Specification]:
+    """Builds the Specification for a structured category filter.
+
+    `conditions` maps a field to a value, matched exactly, or to
+    {operator: value}, e.g. {'is_active': 'true', 'created_at':
+    {'gte': '2021-01-01', 'lte': '2021-12-31'}}. Values may be given as
+    query string text. 'text' is not a field but a full-text search of
+    TEXT_FIELDS, which sort=relevance ranks by. {'name': {'fuzzy': ...}}
+    tolerates typos, with an optional 'fuzziness' of 0 to 2 edits per word
+    instead of one that grows with the word. `search` is the plain
+    `filter` text, matched anywhere in the name. Unknown fields, operators
+    or values raise a ValidationException keyed by the query parameter at
+    fault."""
+    specs = [Contains('name', search)] if search else []
+    errors: Dict[str, list] = {}
+    for field, condition in conditions.items():
+        if field not in _FIELDS:
+            errors[f'filter[{field}]'] = [
+                f'Filter by one of: {", ".join(_FIELDS)}.']
+            continue
+        parse, message, operators = _FIELDS[field]
+        operations = condition if isinstance(condition, Mapping) else {'eq': condition}
+        bounds: Dict[str, Any] = {}
+        fuzzy: Dict[str, Any] = {}
+        for operator, raw in operations.items():
+            key = f'filter[{field}]' if operator == 'eq' \
+                else f'filter[{field}][{operator}]'
+            if operator not in operators:
+                errors[key] = [f'Use one of: {", ".join(operators)}.']
+                continue
+            parse_value, error = _OPERATORS.get(operator, (parse, message))
+            try:
+                value = parse_value(raw)
+            except (TypeError, ValueError):
+                errors[key] = [error]
+                continue
+            if field == 'text':
+                specs.append(FullText(value, TEXT_FIELDS))
+            elif operator == 'eq':
+                specs.append(Equals(field, value))
+            elif operator == 'contains':
+                specs.append(Contains(field, value))
+            elif operator == 'startswith':
+                specs.append(StartsWith(field, value))
+            elif operator in ('fuzzy', 'fuzziness'):
+                fuzzy[operator] = value
+            else:
+                bounds[operator] = value
+        if bounds:
+            specs.append(Range(field, **bounds))
+        if 'fuzzy' in fuzzy:
+            specs.append(Fuzzy(field, fuzzy['fuzzy'], fuzzy.get('fuzziness')))
+        elif fuzzy:
+            errors[f'filter[{field}][fuzziness]'] = [f'Use with filter[{field}][fuzzy].']
+    if errors:
+        raise ValidationException(errors)
+    if not specs:
+        return None
+    return specs[0] if len(specs) == 1 else AndSpecification(tuple(specs))
@@ -1,18 +1,28 @@
 
 
 from abc import ABC
+import abc
+from typing import List, Mapping
+from core.__seedwork.domain.exceptions import NotImplementedException
 from core.__seedwork.domain.repositories import (
     SearchParams as DefaultSearchParams,
     SearchResult as DefaultSearchResult,
     SearchableRepositoryInterface
 )
 from core.category.domain.entities import Category
+from core.category.domain.filters import category_filter
 
 # pylint: disable=too-few-public-methods
 
 
 class _SearchParams(DefaultSearchParams[str]):
-    pass
+
+    def _normalize_filter(self):
+        # {field: value | {operator: value}}, see category_filter
+        if isinstance(self.filter, Mapping):
+            self.filter = category_filter(self.filter)
+            return
+        super()._normalize_filter()
 
 
 class _SearchResult(DefaultSearchResult[Category, str]):
@@ -28,3 +38,9 @@ class CategoryRepository(
 ):
     SearchParams = _SearchParams
     SearchResult = _SearchResult
+
+    @abc.abstractmethod
+    def suggest(self, prefix: str, limit: int = 10) -> List[Category]:
+        """The first `limit` categories whose name starts with `prefix`,
+        ignoring case, in name order."""
+        raise NotImplementedException
@@ -1,27 +1,21 @@
 
-from rest_framework import serializers
-
+import importlib
 from typing import Any
-from core.__seedwork.domain.validators import (
-    DRFValidator,
-    StrictBooleanField,
-    StrictCharField,
-    UniqueEntityIdField
-)
+from core.__seedwork.domain.validators import DRFValidator
 
-# pylint: disable=abstract-method
 
+def __getattr__(name: str) -> Any:
+    # CategoryRules is a DRF serializer, see drf_rules
+    if name == 'CategoryRules':
+        return importlib.import_module('core.category.domain.drf_rules').CategoryRules
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-class CategoryRules(serializers.Serializer):
-    unique_entity_id = UniqueEntityIdField()
-    name = StrictCharField(max_length=255)
-    description = StrictCharField(required=False, allow_null=True)
-    is_active = StrictBooleanField(required=False)
-    created_at = serializers.DateTimeField()
 
 class CategoryValidator(DRFValidator): # pylint: disable=too-few-public-methods
 
     def validate(self, data: Any):
+        # imported on first use so DRF is not loaded with the domain
+        from core.category.domain.drf_rules import CategoryRules  # pylint: disable=import-outside-toplevel
         return super()._validate(CategoryRules(data=data))
 
 
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import itertools
+import json
+import random
+import sqlite3
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import uuid
+
+from core.__seedwork.domain.value_objects import UniqueEntityId
+from core.category.domain.entities import Category
+
+CategoryRecord = Dict[str, Any]
+
+_SYLLABLES = (
+    'ba', 'ca', 'da', 'fe', 'ga', 'hi', 'jo', 'ka', 'le', 'mi', 'no', 'pa',
+    'qu', 'ra', 'se', 'ti', 'vo', 'xe', 'za', 'lu', 'mo', 'ne', 'ri', 'to',
+)
+
+# the table CategoryModel maps to, as Django creates it on SQLite
+_SQLITE_TABLE = (
+    'CREATE TABLE IF NOT EXISTS "{table}" ('
+    '"id" char(32) NOT NULL PRIMARY KEY, '
+    '"name" varchar(255) NOT NULL, '
+    '"description" text NULL, '
+    '"is_active" bool NOT NULL, '
+    '"created_at" datetime NOT NULL)'
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryDatasetConfig:
+    size: int
+    seed: int = 0
+    # names are 1 to `name_words` words drawn from `vocabulary` words with
+    # Zipf weights; a skew of 0 makes every word as likely
+    vocabulary: int = 2000
+    name_skew: float = 1.1
+    name_words: int = 3
+    # share of categories with a description, and its length in
+    # characters as (min, mode, max) of a triangular distribution
+    description_ratio: float = 0.66
+    description_length: Tuple[int, int, int] = (20, 80, 400)
+    active_ratio: float = 0.8
+    # created_at is spread uniformly over [created_from, created_from + created_span)
+    created_from: datetime = datetime(2020, 1, 1)
+    created_span: timedelta = timedelta(days=730)
+    created_sorted: bool = False
+
+
+class CategoryDataset:
+    """Seeded generator of realistic categories for benchmarks, load tests
+    and fixtures: the same config always yields the same categories.
+
+    Records are plain dicts; `entities()` restores them without validation,
+    so a million categories take seconds rather than minutes."""
+
+    def __init__(self, config: CategoryDatasetConfig):
+        self.config = config
+        words = random.Random(f'{config.seed}-words')
+        self.words: List[str] = []
+        seen = set()
+        while len(self.words) < config.vocabulary:
+            word = ''.join(words.choices(_SYLLABLES, k=words.randint(2, 4))).capitalize()
+            if word not in seen:
+                seen.add(word)
+                self.words.append(word)
+        self._cum_weights = list(itertools.accumulate(
+            1 / (rank + 1) ** config.name_skew for rank in range(config.vocabulary)))
+        # descriptions are slices of one text, so generating them is cheap
+        self._text = ' '.join(words.choices(
+            self.words, cum_weights=self._cum_weights, k=max(1000, config.description_length[2])))
+
+    def records(self) -> Iterator[CategoryRecord]:
+        for entity_id, name, description, is_active, created_at in self.__generate():
+            yield {
+                'id': str(entity_id),
+                'name': name,
+                'description': description,
+                'is_active': is_active,
+                'created_at': created_at,
+            }
+
+    def entities(self) -> Iterator[Category]:
+        for entity_id, name, description, is_active, created_at in self.__generate():
+            yield Category.restore(
+                unique_entity_id=UniqueEntityId(entity_id),
+                name=name,
+                description=description,
+                is_active=is_active,
+                created_at=created_at
+            )
+
+    def write_ndjson(self, file: IO[str], fields: Optional[Sequence[str]] = None) -> int:
+        """One JSON object per line; with `fields=('name', 'description',
+        'is_active')` the lines can be posted to /categories/import."""
+        count = 0
+        for record in self.records():
+            record['created_at'] = record['created_at'].isoformat()
+            if fields is not None:
+                record = {field: record[field] for field in fields}
+            file.write(json.dumps(record, separators=(',', ':')))
+            file.write('\n')
+            count += 1
+        return count
+
+    def write_sqlite(self, connection: sqlite3.Connection, table: str = 'categories',
+                     batch_size: int = 10000) -> int:
+        """Inserts the records as CategoryModel rows, creating the table
+        when it does not exist yet."""
+        connection.execute(_SQLITE_TABLE.format(table=table))
+        rows = (
+            (entity_id.hex, name, description, is_active, created_at.isoformat(' '))
+            for entity_id, name, description, is_active, created_at in self.__generate()
+        )
+        count = 0
+        with connection:
+            while batch := list(itertools.islice(rows, batch_size)):
+                connection.executemany(
+                    f'INSERT INTO "{table}" VALUES (?, ?, ?, ?, ?)', batch)
+                count += len(batch)
+        return count
+
+    def __generate(self) -> Iterator[Tuple[uuid.UUID, str, Optional[str], bool, datetime]]:
+        config = self.config
+        rnd = random.Random(config.seed)
+        span = config.created_span.total_seconds()
+        offsets: Optional[Sequence[float]] = None
+        if config.created_sorted:
+            offsets = sorted(rnd.random() * span for _ in range(config.size))
+        low, mode, high = config.description_length
+        text, text_end = self._text, len(self._text) - high
+        words, cum_weights = self.words, self._cum_weights
+        for index in range(config.size):
+            name = ' '.join(rnd.choices(
+                words, cum_weights=cum_weights, k=rnd.randint(1, config.name_words)))
+            description = None
+            if rnd.random() < config.description_ratio:
+                start = text.find(' ', rnd.randint(0, text_end)) + 1
+                description = text[start:start + int(rnd.triangular(low, high, mode))].rstrip()
+            offset = offsets[index] if offsets is not None else rnd.random() * span
+            yield (
+                uuid.UUID(int=rnd.getrandbits(128), version=4),
+                name,
+                description,
+                rnd.random() < config.active_ratio,
+                config.created_from + timedelta(seconds=offset),
+            )
+
+
+def generate_categories(size: int, seed: int = 0, **options: Any) -> List[Category]:
+    return list(CategoryDataset(CategoryDatasetConfig(size=size, seed=seed, **options)).entities())
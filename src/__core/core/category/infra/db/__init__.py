@@ -1,2 +1,3 @@
 from .in_memory import *
-from .django_orm import *
\ No newline at end of file
+from .shared_memory import *
+from .sharded import *
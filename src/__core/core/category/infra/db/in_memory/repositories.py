@@ -1,20 +1,31 @@
-
 from typing import List
+from core.__seedwork.domain.indexes import (
+    BooleanIndex,
+    FullTextIndex,
+    FuzzyIndex,
+    Index,
+    NGramIndex,
+    PrefixIndex,
+    SortedIndex,
+    UniqueIndex
+)
 from core.__seedwork.domain.repositories import InMemorySearchableRepository, SortDirection
+from core.__seedwork.domain.specifications import Contains, Specification, StartsWith
 from core.category.domain.entities import Category
 from core.category.domain.repositories import CategoryRepository
 
 
 class CategoryInMemoryRepository(CategoryRepository, InMemorySearchableRepository[Category]):
     sortable_fields: List[str] = ["name", "created_at"]
+    selectable_fields: List[str] = [
+        "id", "name", "description", "is_active", "created_at"]
 
-    def _apply_filter(self, items: List[Category], filter_param: str = None) -> List[Category]:
+    def _apply_filter(self, items: List[Category], filter_param: str | Specification = None) -> List[Category]:
         if filter_param:
-            filter_obj = filter(
-                lambda i: filter_param.lower() in i.name.lower(),
-                items
-            )
-            return list(filter_obj)
+            # the plain text filter matches anywhere in the name
+            spec = Contains('name', filter_param) \
+                if isinstance(filter_param, str) else filter_param
+            return self._apply_specification(items, spec)
 
         return items
 
@@ -22,3 +33,20 @@ class CategoryInMemoryRepository(CategoryRepository, InMemorySearchableRepositor
         return super()._apply_sort(items, "created_at", "desc") \
             if not sort \
             else super()._apply_sort(items, sort, sort_dir)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Category]:
+        # PrefixIndex answers it in name order, whatever the prefix
+        return self._take(StartsWith('name', prefix), limit)
+
+    def _create_indexes(self) -> List[Index]:
+        return [
+            UniqueIndex('id'),
+            SortedIndex('name'),
+            NGramIndex('name'),
+            PrefixIndex('name'),
+            FuzzyIndex('name'),
+            SortedIndex('created_at'),
+            BooleanIndex('is_active'),
+            # a term in the name says more than one in the description
+            FullTextIndex({'name': 2.0, 'description': 1.0}),
+        ]
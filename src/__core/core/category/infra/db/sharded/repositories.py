@@ -0,0 +1,17 @@
+from typing import List, Optional
+from core.__seedwork.domain.specifications import StartsWith
+from core.__seedwork.infra.sharded import ShardedRepository, SortOrder
+from core.category.domain.entities import Category
+from core.category.infra.db.in_memory import CategoryInMemoryRepository
+
+
+class CategoryShardedRepository(ShardedRepository[Category], CategoryInMemoryRepository):
+    shard_factory = CategoryInMemoryRepository
+
+    def _sort_order(self, sort: Optional[str] = None, sort_dir: Optional[str] = None) -> SortOrder:
+        # newest first unless asked otherwise, as CategoryInMemoryRepository sorts
+        return ('created_at', True) if not sort else super()._sort_order(sort, sort_dir)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Category]:
+        return self._take_merged(
+            StartsWith('name', prefix), limit, key=lambda category: category.name.lower())
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any, Dict
+import uuid
+from core.__seedwork.domain.value_objects import UniqueEntityId
+from core.__seedwork.infra.shared_memory import SharedMemoryRepository
+from core.category.domain.entities import Category
+from core.category.infra.db.in_memory import CategoryInMemoryRepository
+
+
+class CategorySharedMemoryRepository(SharedMemoryRepository[Category], CategoryInMemoryRepository):
+    shared_name: str = 'categories'
+
+    def _to_record(self, entity: Category) -> Dict[str, Any]:
+        return {
+            'id': entity.id,
+            'name': entity.name,
+            'description': entity.description,
+            'is_active': entity.is_active,
+            'created_at': entity.created_at.isoformat(),
+        }
+
+    def _from_record(self, record: Dict[str, Any]) -> Category:
+        # records were validated when they were written
+        return Category.restore(
+            unique_entity_id=UniqueEntityId(uuid.UUID(record['id'])),
+            name=record['name'],
+            description=record['description'],
+            is_active=record['is_active'],
+            created_at=datetime.fromisoformat(record['created_at'])
+        )
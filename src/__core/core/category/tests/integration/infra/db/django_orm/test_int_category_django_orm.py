@@ -1,5 +1,5 @@
 import unittest
-from core.category.infra import CategoryModel
+from core.category.infra.db.django_orm import CategoryModel
 
 class TestCategoryModelInt(unittest.TestCase):
 
@@ -1,21 +1,30 @@
 # pylint: disable=unexpected-keyword-arg,protected-access
 from dataclasses import asdict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 import unittest
 from unittest.mock import patch
 
-from core.__seedwork.application.dto import PaginationOutput, SearchInput
-from core.__seedwork.application.use_cases import UseCase
+from core.__seedwork.application.dto import (
+    BatchItemError,
+    PaginationOutput,
+    ResourceVersion,
+    SearchInput
+)
+from core.__seedwork.application.use_cases import UseCase, record_stages
 from core.__seedwork.domain.repositories import SearchResult
 from core.__seedwork.domain.exceptions import NotFoundException
 from core.category.application.dto import CategoryOutput
 from core.category.application.use_cases import (
+    CreateCategoriesBatchUseCase,
     CreateCategoryUseCase,
+    GetCategoriesByIdsUseCase,
     GetCategoryUseCase,
     ListCategoriesUseCase,
     UpdateCategoryUseCase,
-    DeleteCategoryUseCase
+    DeleteCategoryUseCase,
+    ExportCategoriesUseCase,
+    SuggestCategoriesUseCase
 )
 from core.category.domain.entities import Category
 from core.category.domain.repositories import CategoryRepository
@@ -91,6 +100,93 @@ class TestCreateCategoryUse(unittest.TestCase):
         ))
 
 
+class TestCreateCategoriesBatchUseCase(unittest.TestCase):
+
+    use_case: CreateCategoriesBatchUseCase
+    category_repo: CategoryRepository
+
+    def setUp(self) -> None:
+        self.category_repo = CategoryInMemoryRepository()
+        self.use_case = CreateCategoriesBatchUseCase(self.category_repo)
+
+    def test_instance_use_case(self):
+        self.assertIsInstance(self.use_case, UseCase)
+
+    def test_input(self):
+        self.assertEqual(CreateCategoriesBatchUseCase.Input.__annotations__, {
+            'items': List[CreateCategoryUseCase.Input]
+        })
+
+    def test_output(self):
+        self.assertEqual(CreateCategoriesBatchUseCase.Output.__annotations__, {
+            'items': List[CategoryOutput],
+            'errors': List[BatchItemError]
+        })
+
+    def test_create_categories(self):
+        with patch.object(self.category_repo, 'bulk_insert', wraps=self.category_repo.bulk_insert) as spy_bulk_insert:
+            request = CreateCategoriesBatchUseCase.Input(items=[
+                CreateCategoryUseCase.Input(name='test 1'),
+                CreateCategoryUseCase.Input(
+                    name='test 2', description='some description', is_active=False),
+            ])
+            response = self.use_case.execute(request)
+            spy_bulk_insert.assert_called_once()
+            self.assertEqual(response, CreateCategoriesBatchUseCase.Output(
+                items=[
+                    CategoryOutput(
+                        id=self.category_repo.items[0].id,
+                        name='test 1',
+                        description=None,
+                        is_active=True,
+                        created_at=self.category_repo.items[0].created_at
+                    ),
+                    CategoryOutput(
+                        id=self.category_repo.items[1].id,
+                        name='test 2',
+                        description='some description',
+                        is_active=False,
+                        created_at=self.category_repo.items[1].created_at
+                    ),
+                ],
+                errors=[]
+            ))
+
+    def test_report_validation_errors_per_item(self):
+        with patch.object(self.category_repo, 'bulk_insert', wraps=self.category_repo.bulk_insert) as spy_bulk_insert:
+            request = CreateCategoriesBatchUseCase.Input(items=[
+                CreateCategoryUseCase.Input(name=''),
+                CreateCategoryUseCase.Input(name='test'),
+                CreateCategoryUseCase.Input(name='test', is_active=5),
+            ])
+            response = self.use_case.execute(request)
+            spy_bulk_insert.assert_called_once()
+            self.assertEqual(len(self.category_repo.items), 1)
+            self.assertEqual(response.items, [CategoryOutput(
+                id=self.category_repo.items[0].id,
+                name='test',
+                description=None,
+                is_active=True,
+                created_at=self.category_repo.items[0].created_at
+            )])
+            self.assertEqual(response.errors, [
+                BatchItemError(
+                    index=0, errors={'name': ['This field may not be blank.']}),
+                BatchItemError(
+                    index=2, errors={'is_active': ['Must be a valid boolean.']}),
+            ])
+
+    def test_do_not_call_repository_when_all_items_are_invalid(self):
+        with patch.object(self.category_repo, 'bulk_insert') as spy_bulk_insert:
+            request = CreateCategoriesBatchUseCase.Input(items=[
+                CreateCategoryUseCase.Input(name=''),
+            ])
+            response = self.use_case.execute(request)
+            spy_bulk_insert.assert_not_called()
+            self.assertEqual(response.items, [])
+            self.assertEqual(len(response.errors), 1)
+
+
 class TestGetCategoryUseCase(unittest.TestCase):
 
     use_case: GetCategoryUseCase
@@ -135,6 +231,110 @@ class TestGetCategoryUseCase(unittest.TestCase):
                 created_at=category.created_at
             ))
 
+    def test_version(self):
+        self.assertIsNone(self.use_case.version(
+            GetCategoryUseCase.Input(id='not_found')))
+
+        category = Category(name='Movie')
+        other = Category(name='Documentary')
+        self.category_repo.bulk_insert([category, other])
+        request = GetCategoryUseCase.Input(id=category.id)
+        version = self.use_case.version(request)
+        self.assertEqual(version.last_modified,
+                         self.category_repo.change_version().last_modified)
+        self.assertEqual(version, self.use_case.version(request))
+
+        self.category_repo.update(other)
+        self.assertEqual(version, self.use_case.version(request))
+
+        category.update('Movies')
+        self.category_repo.update(category)
+        self.assertNotEqual(version, self.use_case.version(request))
+
+
+class TestGetCategoriesByIdsUseCase(unittest.TestCase):
+
+    use_case: GetCategoriesByIdsUseCase
+    category_repo: CategoryRepository
+
+    def setUp(self) -> None:
+        self.category_repo = CategoryInMemoryRepository()
+        self.use_case = GetCategoriesByIdsUseCase(self.category_repo)
+
+    def test_instance_use_case(self):
+        self.assertIsInstance(self.use_case, UseCase)
+
+    def test_input(self):
+        self.assertEqual(GetCategoriesByIdsUseCase.Input.__annotations__, {
+            'ids': List[str]
+        })
+
+    def test_output(self):
+        self.assertEqual(GetCategoriesByIdsUseCase.Output.__annotations__, {
+            'items': List[CategoryOutput],
+            'not_found': List[str]
+        })
+
+    def test_get_categories(self):
+        items = [
+            Category(name='Movie'),
+            Category(name='Documentary'),
+            Category(name='Series'),
+        ]
+        self.category_repo.items = items
+        with patch.object(self.category_repo, 'find_by_ids', wraps=self.category_repo.find_by_ids) as spy_find_by_ids:
+            request = GetCategoriesByIdsUseCase.Input(
+                ids=[items[2].id, 'not_found', items[0].id, items[2].id])
+            response = self.use_case.execute(request)
+            spy_find_by_ids.assert_called_once()
+            self.assertEqual(response, GetCategoriesByIdsUseCase.Output(
+                items=[
+                    CategoryOutput(**items[2].to_dict()),
+                    CategoryOutput(**items[0].to_dict()),
+                ],
+                not_found=['not_found']
+            ))
+
+
+class TestSuggestCategoriesUseCase(unittest.TestCase):
+
+    use_case: SuggestCategoriesUseCase
+    category_repo: CategoryRepository
+
+    def setUp(self) -> None:
+        self.category_repo = CategoryInMemoryRepository()
+        self.use_case = SuggestCategoriesUseCase(self.category_repo)
+
+    def test_instance_use_case(self):
+        self.assertIsInstance(self.use_case, UseCase)
+
+    def test_input(self):
+        self.assertEqual(SuggestCategoriesUseCase.Input.__annotations__, {
+            'prefix': str,
+            'limit': int,
+        })
+
+    def test_output(self):
+        self.assertEqual(SuggestCategoriesUseCase.Output.__annotations__, {
+            'items': List[CategoryOutput]
+        })
+
+    def test_suggest_categories(self):
+        items = [Category(name=name) for name in ('movie', 'Documentary', 'Mobile', 'Music')]
+        self.category_repo.bulk_insert(items)
+        with patch.object(self.category_repo, 'suggest', wraps=self.category_repo.suggest) as spy_suggest:
+            response = self.use_case.execute(SuggestCategoriesUseCase.Input(prefix='MO'))
+            spy_suggest.assert_called_once_with('MO', 10)
+            self.assertEqual(response, SuggestCategoriesUseCase.Output(items=[
+                CategoryOutput(**items[2].to_dict()),
+                CategoryOutput(**items[0].to_dict()),
+            ]))
+
+            self.use_case.execute(SuggestCategoriesUseCase.Input(prefix='m', limit=0))
+            spy_suggest.assert_called_with('m', 1)
+            self.use_case.execute(SuggestCategoriesUseCase.Input(prefix='m', limit=1000))
+            spy_suggest.assert_called_with('m', SuggestCategoriesUseCase.max_limit)
+
 
 class TestListCategoriesUseCase(unittest.TestCase):
 
@@ -193,6 +393,69 @@ class TestListCategoriesUseCase(unittest.TestCase):
             per_page=2,
         )))
 
+    def test_execute_records_stages(self):
+        with record_stages() as recorder:
+            # pylint: disable=no-value-for-parameter
+            self.use_case.execute(ListCategoriesUseCase.Input())
+        self.assertCountEqual(recorder.durations.keys(),
+                              ['validation', 'repository', 'mapping'])
+
+    def test_list_categories_using_fields(self):
+        category = Category(name='Movie', description='some description')
+        self.category_repo.items = [category]
+
+        output = self.use_case.execute(
+            ListCategoriesUseCase.Input(fields=['name', 'fake']))
+        self.assertDictEqual(asdict(output), asdict(ListCategoriesUseCase.Output(
+            items=[{'id': category.id, 'name': 'Movie'}],
+            total=1,
+            current_page=1,
+            last_page=1,
+            per_page=15
+        )))
+
+    def test_version(self):
+        # pylint: disable=no-value-for-parameter
+        version = self.use_case.version(ListCategoriesUseCase.Input())
+        self.assertEqual(
+            version, self.use_case.version(ListCategoriesUseCase.Input(page=1, per_page=15)))
+        self.assertEqual(
+            version, self.use_case.version(ListCategoriesUseCase.Input(page='-1', filter='')))
+        self.assertNotEqual(
+            version, self.use_case.version(ListCategoriesUseCase.Input(page=2)))
+        self.assertNotEqual(
+            version, self.use_case.version(ListCategoriesUseCase.Input(fields=['name'])))
+
+        self.category_repo.insert(Category(name='Movie'))
+        changed = self.use_case.version(ListCategoriesUseCase.Input())
+        self.assertNotEqual(version.etag, changed.etag)
+        self.assertEqual(changed.last_modified,
+                         self.category_repo.change_version().last_modified)
+
+    def test_coalescing_key(self):
+        # pylint: disable=no-value-for-parameter
+        key = self.use_case.coalescing_key(
+            ListCategoriesUseCase.Input(sort='name', sort_dir='DESC'))
+        self.assertEqual(key, self.use_case.coalescing_key(
+            ListCategoriesUseCase.Input(page='0', sort='name', sort_dir='desc')))
+        self.assertNotEqual(key, self.use_case.coalescing_key(
+            ListCategoriesUseCase.Input(sort='name')))
+
+        self.category_repo.insert(Category(name='Movie'))
+        self.assertNotEqual(key, self.use_case.coalescing_key(
+            ListCategoriesUseCase.Input(sort='name', sort_dir='desc')))
+
+    def test_coalescing_key_reuses_version_of_the_same_request(self):
+        # pylint: disable=no-value-for-parameter
+        request = ListCategoriesUseCase.Input(sort='name')
+        version = self.use_case.version(request)
+        with patch.object(ResourceVersion, 'of') as of:
+            self.assertEqual(self.use_case.coalescing_key(request), version.etag)
+            of.assert_not_called()
+
+        self.category_repo.insert(Category(name='Movie'))
+        self.assertNotEqual(self.use_case.coalescing_key(request), version.etag)
+
     def test_list_categories_using_empty_search_params(self):
         self.category_repo.items = [
             Category(name='test 1'),
@@ -283,6 +546,46 @@ class TestListCategoriesUseCase(unittest.TestCase):
         )))
 
 
+class TestExportCategoriesUseCase(unittest.TestCase):
+
+    use_case: ExportCategoriesUseCase
+    category_repo: CategoryRepository
+
+    def setUp(self) -> None:
+        self.category_repo = CategoryInMemoryRepository()
+        self.use_case = ExportCategoriesUseCase(self.category_repo)
+
+    def test_instance_use_case(self):
+        self.assertIsInstance(self.use_case, UseCase)
+
+    def test_input(self):
+        self.assertEqual(ExportCategoriesUseCase.Input.__annotations__, {
+            'chunk_size': int
+        })
+        self.assertEqual(ExportCategoriesUseCase.Input().chunk_size, 500)
+
+    def test_export_categories_in_chunks(self):
+        categories = [Category(name=f'test {i}') for i in range(3)]
+        self.category_repo.items = categories
+        with patch.object(self.category_repo, 'iter_chunks',
+                          wraps=self.category_repo.iter_chunks) as spy_iter_chunks:
+            output = self.use_case.execute(
+                ExportCategoriesUseCase.Input(chunk_size=2))
+            spy_iter_chunks.assert_called_once_with(2)
+
+        chunks = list(output.chunks)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0][0], CategoryOutput(
+            id=categories[0].id,
+            name=categories[0].name,
+            description=categories[0].description,
+            is_active=categories[0].is_active,
+            created_at=categories[0].created_at
+        ))
+        self.assertEqual([item.id for chunk in chunks for item in chunk],
+                         [category.id for category in categories])
+
+
 class TestUpdateCategoryUseCase(unittest.TestCase):
 
     use_case: UpdateCategoryUseCase
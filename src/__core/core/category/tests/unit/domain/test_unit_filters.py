@@ -0,0 +1,77 @@
+# pylint: disable=unexpected-keyword-arg
+from datetime import datetime, timezone
+import unittest
+import uuid
+
+from core.__seedwork.domain.exceptions import ValidationException
+from core.__seedwork.domain.specifications import AndSpecification, Contains, Equals, FullText, Fuzzy, Range, StartsWith
+from core.category.domain.filters import TEXT_FIELDS, category_filter
+from core.category.domain.repositories import CategoryRepository
+
+
+class TestCategoryFilter(unittest.TestCase):
+
+    def test_build_specifications(self):
+        entity_id = uuid.uuid4()
+        arrange = [
+            ({}, None, None),
+            ({}, 'mov', Contains('name', 'mov')),
+            ({'name': 'Movie'}, None, Equals('name', 'Movie')),
+            ({'name': {'contains': 'mov'}}, None, Contains('name', 'mov')),
+            ({'id': str(entity_id).upper()}, None, Equals('id', str(entity_id))),
+            ({'is_active': 'False'}, None, Equals('is_active', False)),
+            ({'is_active': True}, None, Equals('is_active', True)),
+            ({'created_at': {'gte': '2021-01-01', 'lte': datetime(2021, 2, 1)}}, None,
+             Range('created_at', gte=datetime(2021, 1, 1), lte=datetime(2021, 2, 1))),
+            ({'text': 'movies'}, None, FullText('movies', ('name', 'description'))),
+            ({'name': {'startswith': 'mo'}}, None, StartsWith('name', 'mo')),
+            ({'name': {'fuzzy': 'moive'}}, None, Fuzzy('name', 'moive')),
+            ({'name': {'fuzzy': 'moive', 'fuzziness': '1'}}, None, Fuzzy('name', 'moive', 1)),
+            ({'is_active': '1', 'description': {'contains': 'doc'}}, 'mov', AndSpecification((
+                Contains('name', 'mov'),
+                Equals('is_active', True),
+                Contains('description', 'doc'),
+            ))),
+        ]
+        for conditions, search, expected in arrange:
+            with self.subTest(conditions=conditions, search=search):
+                self.assertEqual(category_filter(conditions, search), expected)
+
+    def test_compare_aware_datetimes_in_local_time(self):
+        aware = datetime(2021, 1, 1, 12, tzinfo=timezone.utc)
+        spec = category_filter({'created_at': {'gte': aware.isoformat()}})
+        self.assertEqual(spec, Range('created_at', gte=aware.astimezone().replace(tzinfo=None)))
+
+    def test_throw_validation_exception(self):
+        with self.assertRaises(ValidationException) as assert_error:
+            category_filter({
+                'color': 'red',
+                'id': 'fake',
+                'is_active': 'maybe',
+                'name': {'gte': 'a', 'fuzziness': 1},
+                'description': {'fuzzy': 'doc'},
+                'created_at': {'lte': 'yesterday'},
+                'text': {'contains': 'mov'},
+            })
+        self.assertEqual(assert_error.exception.error, {
+            'filter[color]': ['Filter by one of: id, name, description, is_active, created_at, text.'],
+            'filter[id]': ['Enter a valid UUID.'],
+            'filter[is_active]': ['Enter true or false.'],
+            'filter[name][gte]': ['Use one of: eq, contains, startswith, fuzzy, fuzziness.'],
+            'filter[name][fuzziness]': ['Use with filter[name][fuzzy].'],
+            'filter[description][fuzzy]': ['Use one of: contains.'],
+            'filter[created_at][lte]': ['Enter a valid ISO 8601 date/time.'],
+            'filter[text][contains]': ['Use one of: eq.'],
+        })
+        with self.assertRaises(ValidationException) as assert_error:
+            category_filter({'name': {'fuzzy': 'moive', 'fuzziness': '3'}})
+        self.assertEqual(assert_error.exception.error,
+                         {'filter[name][fuzziness]': ['Enter 0, 1 or 2.']})
+
+    def test_search_params_accept_conditions(self):
+        params = CategoryRepository.SearchParams(filter={'is_active': 'true'})
+        self.assertEqual(params.filter, Equals('is_active', True))
+
+        spec = Contains('name', 'mov')
+        self.assertIs(CategoryRepository.SearchParams(filter=spec).filter, spec)
+        self.assertEqual(CategoryRepository.SearchParams(filter='mov').filter, 'mov')
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import unittest
+from typing import Dict
+
+import core
+
+CORE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(core.__file__)))
+
+# cold import of core.category.domain, in microseconds; it was ~225ms while
+# the validators pulled DRF and Django in and is ~55ms without them
+IMPORT_BUDGET_US = 150_000
+
+HEAVY_PACKAGES = ('rest_framework', 'django', 'attr')
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, 'PYTHONPATH': CORE_PATH}
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time per module, parsed from -X importtime."""
+    stderr = run_python('-X', 'importtime', '-c', f'import {module}').stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestCategoryDomainImportTime(unittest.TestCase):
+
+    def test_do_not_import_drf_or_django(self):
+        times = import_times('core.category.domain')
+        self.assertIn('core.category.domain', times)
+        heavy = [name for name in times
+                 if name.split('.')[0] in HEAVY_PACKAGES]
+        self.assertEqual(heavy, [])
+
+    def test_cold_import_budget(self):
+        best = min(import_times('core.category.domain')['core.category.domain']
+                   for _ in range(3))
+        self.assertLess(best, IMPORT_BUDGET_US)
+
+    def test_load_drf_on_first_validation(self):
+        output = run_python('-c', '\n'.join([
+            'import sys',
+            'from core.category.domain import Category',
+            'print("rest_framework" in sys.modules)',
+            'Category(name="Movie")',
+            'print("rest_framework" in sys.modules)',
+        ])).stdout
+        self.assertEqual(output.split(), ['False', 'True'])
@@ -0,0 +1,101 @@
+# pylint: disable=unexpected-keyword-arg
+from collections import Counter
+from datetime import datetime, timedelta
+import io
+import json
+import sqlite3
+import unittest
+
+from core.category.domain.entities import Category
+from core.category.infra.dataset import (
+    CategoryDataset,
+    CategoryDatasetConfig,
+    generate_categories
+)
+
+
+class TestCategoryDataset(unittest.TestCase):
+
+    def test_same_config_yields_same_categories(self):
+        config = CategoryDatasetConfig(size=50, seed=7)
+        self.assertEqual(list(CategoryDataset(config).records()),
+                         list(CategoryDataset(config).records()))
+        self.assertNotEqual(
+            list(CategoryDataset(config).records()),
+            list(CategoryDataset(CategoryDatasetConfig(size=50, seed=8)).records())
+        )
+        # a larger dataset starts with the smaller one
+        self.assertEqual(
+            list(CategoryDataset(CategoryDatasetConfig(size=100, seed=7)).records())[:50],
+            list(CategoryDataset(config).records())
+        )
+
+    def test_records_follow_config(self):
+        config = CategoryDatasetConfig(
+            size=2000, vocabulary=100, name_words=2, description_ratio=0.5,
+            description_length=(10, 20, 50), active_ratio=0.25,
+            created_from=datetime(2021, 1, 1), created_span=timedelta(days=1)
+        )
+        dataset = CategoryDataset(config)
+        records = list(dataset.records())
+
+        self.assertEqual(len(records), 2000)
+        self.assertEqual(len({record['id'] for record in records}), 2000)
+        words = Counter(word for record in records for word in record['name'].split())
+        self.assertLessEqual(set(words), set(dataset.words))
+        self.assertEqual(words.most_common(1)[0][0], dataset.words[0])
+        self.assertTrue(all(1 <= len(record['name'].split()) <= 2 for record in records))
+
+        descriptions = [record['description'] for record in records if record['description']]
+        self.assertAlmostEqual(len(descriptions) / 2000, 0.5, delta=0.05)
+        self.assertTrue(all(len(description) <= 50 for description in descriptions))
+        self.assertAlmostEqual(
+            sum(record['is_active'] for record in records) / 2000, 0.25, delta=0.05)
+        self.assertTrue(all(
+            datetime(2021, 1, 1) <= record['created_at'] < datetime(2021, 1, 2)
+            for record in records))
+
+    def test_sorted_created_at(self):
+        records = list(CategoryDataset(
+            CategoryDatasetConfig(size=100, created_sorted=True)).records())
+        created_at = [record['created_at'] for record in records]
+        self.assertEqual(created_at, sorted(created_at))
+
+    def test_entities(self):
+        dataset = CategoryDataset(CategoryDatasetConfig(size=20))
+        records = list(dataset.records())
+        entities = list(dataset.entities())
+
+        for record, entity in zip(records, entities):
+            self.assertIsInstance(entity, Category)
+            self.assertEqual(entity.to_dict(), record)
+            entity.validate()
+        self.assertEqual(generate_categories(20), entities)
+
+    def test_write_ndjson(self):
+        dataset = CategoryDataset(CategoryDatasetConfig(size=10))
+        file = io.StringIO()
+        self.assertEqual(dataset.write_ndjson(file), 10)
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual(lines[0]['id'], next(dataset.records())['id'])
+        self.assertEqual(datetime.fromisoformat(lines[0]['created_at']),
+                         next(dataset.records())['created_at'])
+
+        file = io.StringIO()
+        dataset.write_ndjson(file, fields=('name', 'description', 'is_active'))
+        self.assertEqual(set(json.loads(file.getvalue().splitlines()[0])),
+                         {'name', 'description', 'is_active'})
+
+    def test_write_sqlite(self):
+        dataset = CategoryDataset(CategoryDatasetConfig(size=25))
+        with sqlite3.connect(':memory:') as connection:
+            self.assertEqual(dataset.write_sqlite(connection, batch_size=10), 25)
+            rows = connection.execute(
+                'SELECT id, name, is_active, created_at FROM categories').fetchall()
+
+        record = next(dataset.records())
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0], (
+            record['id'].replace('-', ''), record['name'], int(record['is_active']),
+            record['created_at'].isoformat(' ')
+        ))
@@ -1,10 +1,16 @@
 # pylint: disable=unexpected-keyword-arg
 from datetime import datetime, timedelta
+import os
+import tempfile
 import unittest
 from core.__seedwork.domain.repositories import SearchParams, SearchResult
+from core.__seedwork.domain.specifications import Contains, Equals, FullText, Fuzzy, Range
 from core.category.domain.entities import Category
+from core.category.infra.dataset import CategoryDataset, CategoryDatasetConfig
 
 from core.category.infra.db.in_memory.repositories import CategoryInMemoryRepository
+from core.category.infra.db.sharded.repositories import CategoryShardedRepository
+from core.category.infra.db.shared_memory.repositories import CategorySharedMemoryRepository
 
 
 class TestCategoryInMemoryRepository(unittest.TestCase):
@@ -57,3 +63,126 @@ class TestCategoryInMemoryRepository(unittest.TestCase):
         # pylint: disable=protected-access
         items_filtered = self.repo._apply_sort(items, "name", "desc")
         self.assertListEqual(items_filtered, [items[0], items[1], items[2]])
+
+    def test_search_using_specifications(self):
+        dataset = CategoryDataset(CategoryDatasetConfig(size=400, vocabulary=40))
+        categories = list(dataset.entities())
+        self.repo.bulk_insert(categories)
+        arrange = [
+            Equals('id', categories[3].id),
+            Equals('name', categories[5].name),
+            Contains('name', dataset.words[0]),
+            Equals('is_active', False) & Contains('name', dataset.words[1]),
+            Range('created_at', gte=datetime(2020, 3, 1), lte=datetime(2020, 4, 1)),
+            Range('created_at', gte=datetime(2020, 3, 1)) & Equals('is_active', True),
+            # a letter dropped, one swapped
+            Fuzzy('name', dataset.words[2][1:]),
+            Fuzzy('name', f'{dataset.words[3][1]}{dataset.words[3][0]}{dataset.words[3][2:]}'),
+        ]
+        for spec in arrange:
+            with self.subTest(spec=spec):
+                result = self.repo.search(self.repo.SearchParams(filter=spec, per_page=500))
+                expected = [item for item in categories if spec.is_satisfied_by(item)]
+                self.assertEqual(result.total, len(expected))
+                self.assertCountEqual(result.items, expected)
+
+    def test_search_by_relevance(self):
+        categories = [
+            Category(name='Series', description='Movie series and shows'),
+            Category(name='Documentary', description='Real movies about the nature of things'),
+            Category(name='Movie', description='Feature films'),
+            Category(name='Music'),
+        ]
+        self.repo.bulk_insert(categories)
+        result = self.repo.search(SearchParams(filter=FullText('movies', ('name', 'description')),
+                                               sort='relevance'))
+        # a match in the name weighs more; among descriptions, shorter wins
+        self.assertEqual(result.items, [categories[2], categories[0], categories[1]])
+        self.assertEqual(result.total, 3)
+
+        categories[2].update('Film', 'Feature films')
+        self.repo.update(categories[2])
+        result = self.repo.search(SearchParams(
+            filter=FullText('movies', ('name', 'description')), sort='relevance', sort_dir='asc'))
+        self.assertEqual(result.items, [categories[1], categories[0]])
+
+        # nothing to rank by: newest first, as without sort
+        self.assertEqual(self.repo.search(SearchParams(sort='relevance')).items,
+                         self.repo.search(SearchParams()).items)
+
+    def test_suggest(self):
+        dataset = CategoryDataset(CategoryDatasetConfig(size=400, vocabulary=40))
+        categories = list(dataset.entities())
+        self.repo.bulk_insert(categories)
+        for prefix in ('', dataset.words[0][:2].upper(), dataset.words[1], 'zzz'):
+            with self.subTest(prefix=prefix):
+                expected = sorted(
+                    (item for item in categories if item.name.lower().startswith(prefix.lower())),
+                    key=lambda item: item.name.lower())[:5]
+                self.assertEqual(self.repo.suggest(prefix, 5), expected)
+
+        categories[0].update('Aaa first', None)
+        self.repo.update(categories[0])
+        self.assertEqual(self.repo.suggest('aa', 1), [categories[0]])
+
+    def test_keep_indexes_in_step_with_writes(self):
+        categories = [Category(name=f'Movie {index}') for index in range(10)]
+        self.repo.bulk_insert(categories)
+        spec = Contains('name', 'movie 1')
+        self.assertEqual(self.repo.search(SearchParams(filter=spec)).items, [categories[1]])
+        # pylint: disable=protected-access
+        planner = self.repo._planner
+
+        categories[1].update('Documentary', None)
+        self.repo.update(categories[1])
+        self.repo.delete(categories[2].id)
+        added = Category(name='Movie 10')
+        self.repo.insert(added)
+        self.assertEqual(self.repo.search(SearchParams(filter=spec)).items, [added])
+        self.assertEqual(self.repo.search(
+            SearchParams(filter=Equals('id', categories[2].id))).total, 0)
+        self.assertIs(self.repo._planner, planner)
+
+        # items changed behind the repository's back are indexed again
+        self.repo.items = categories[:2]
+        self.assertEqual(self.repo.search(
+            SearchParams(filter=Equals('name', 'Documentary'))).items, [categories[1]])
+        self.assertIsNot(self.repo._planner, planner)
+
+
+class TestEveryBackend(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        shared_memory = CategorySharedMemoryRepository(os.path.join(directory.name, 'categories'))
+        self.addCleanup(shared_memory.shared_log.close)
+        sharded = CategoryShardedRepository(shards=2)
+        self.addCleanup(sharded.close)
+        self.repos = [CategoryInMemoryRepository(), shared_memory, sharded]
+
+    def test_suggest_in_name_order(self):
+        categories = [Category(name=name) for name in ('Zeta', 'Alpha', 'beta', 'Gamma', 'Delta')]
+        for repo in self.repos:
+            repo.bulk_insert(categories)
+        for prefix, expected in (('', ['Alpha', 'beta', 'Delta']), ('b', ['beta']), ('x', [])):
+            for repo in self.repos:
+                with self.subTest(repo=type(repo).__name__, prefix=prefix):
+                    self.assertEqual([category.name for category in repo.suggest(prefix, 3)],
+                                     expected)
+
+        categories[0].update('Aardvark', None)
+        for repo in self.repos:
+            repo.update(categories[0])
+            with self.subTest(repo=type(repo).__name__):
+                self.assertEqual([category.name for category in repo.suggest('a', 2)],
+                                 ['Aardvark', 'Alpha'])
+
+    def test_fuzzy_match_swapped_letters(self):
+        categories = [Category(name=f'Movie {index}') for index in range(5)]
+        for repo in self.repos:
+            repo.bulk_insert(categories + [Category(name='Series')])
+            with self.subTest(repo=type(repo).__name__):
+                result = repo.search(repo.SearchParams(filter=Fuzzy('name', 'Movei')))
+                self.assertEqual(result.total, 5)
+                self.assertCountEqual(result.items, categories)
@@ -0,0 +1,157 @@
+# pylint: disable=unexpected-keyword-arg
+import os
+import signal
+import unittest
+from unittest.mock import patch
+
+from core.__seedwork.domain.exceptions import NotFoundException
+from core.__seedwork.infra.sharded import ShardUnavailableException
+from core.category.domain.entities import Category
+from core.category.infra.dataset import CategoryDataset, CategoryDatasetConfig
+from core.category.infra.db.in_memory.repositories import CategoryInMemoryRepository
+from core.category.infra.db.sharded.repositories import CategoryShardedRepository
+
+
+class TestCategoryShardedRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.repo = CategoryShardedRepository(shards=3)
+        self.addCleanup(self.repo.close)
+
+    def test_search_like_in_memory_repository(self):
+        dataset = CategoryDataset(CategoryDatasetConfig(size=600, vocabulary=50))
+        categories = list(dataset.entities())
+        in_memory = CategoryInMemoryRepository()
+        in_memory.bulk_insert(categories[:500])
+        self.repo.bulk_insert(categories[:500])
+        for category in categories[500:]:
+            in_memory.insert(category)
+            self.repo.insert(category)
+
+        word = dataset.words[0]
+        arrange = [
+            {},
+            {'filter': word},
+            # names repeat, so ties must come out in insertion order
+            {'sort': 'name'},
+            {'sort': 'name', 'sort_dir': 'asc', 'page': 3},
+            {'sort': 'created_at', 'sort_dir': 'asc', 'per_page': 50},
+            {'sort': 'description'},
+            {'filter': word, 'sort': 'name', 'sort_dir': 'desc', 'page': 2},
+            {'fields': ['name', 'is_active']},
+            {'page': 100},
+        ]
+        for params in arrange:
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.repo.search(self.repo.SearchParams(**params)).to_dict(),
+                    in_memory.search(in_memory.SearchParams(**params)).to_dict()
+                )
+        # each shard ranks with its own term statistics, so only the
+        # matches are the same
+        params = {'filter': {'text': word}, 'sort': 'relevance', 'per_page': 600}
+        result = self.repo.search(self.repo.SearchParams(**params))
+        expected = in_memory.search(in_memory.SearchParams(**params))
+        self.assertEqual(result.total, expected.total)
+        self.assertCountEqual(result.items, expected.items)
+        self.assertEqual(self.repo.search(self.repo.SearchParams(sort='relevance')).items,
+                         self.repo.search(self.repo.SearchParams()).items)
+        for prefix in ('', word[:2]):
+            self.assertEqual(self.repo.suggest(prefix, 20), in_memory.suggest(prefix, 20))
+        self.assertEqual(self.repo.find_all(), in_memory.find_all())
+        ids = [category.id for category in categories[::7]]
+        self.assertEqual(self.repo.find_by_ids(ids), in_memory.find_by_ids(ids))
+        self.assertEqual(
+            [len(chunk) for chunk in self.repo.iter_chunks(250)], [250, 250, 100])
+
+    def test_writes_and_versions(self):
+        category = Category(name='Movie')
+        self.repo.insert(category)
+        inserted = self.repo.entity_version(category.id)
+        self.assertEqual(self.repo.find_by_id(category.id), category)
+
+        category.update('Documentary', None)
+        self.repo.update(category)
+        self.assertEqual(self.repo.find_by_id(category.unique_entity_id).name, 'Documentary')
+        self.assertNotEqual(self.repo.entity_version(category.id), inserted)
+        self.assertEqual(self.repo.entity_version(category.id), self.repo.change_version())
+
+        self.repo.delete(category.id)
+        self.assertEqual(self.repo.find_all(), [])
+        self.assertEqual(self.repo.search(self.repo.SearchParams()).total, 0)
+        with self.assertRaises(NotFoundException):
+            self.repo.entity_version(category.id)
+
+    def test_throw_not_found_from_shards(self):
+        category = Category(name='Movie')
+        for call in (lambda: self.repo.find_by_id(category.id),
+                     lambda: self.repo.update(category),
+                     lambda: self.repo.delete(category.id)):
+            with self.assertRaises(NotFoundException) as assert_error:
+                call()
+            self.assertEqual(assert_error.exception.args[0],
+                             f"Entity Not Found using ID '{category.id}'")
+        version = self.repo.change_version()
+        self.repo.insert(Category(name='Movie'))
+        self.assertNotEqual(self.repo.change_version(), version)
+
+    def test_search_again_when_the_page_is_deleted_meanwhile(self):
+        categories = [Category(name=f'Movie {index}') for index in range(6)]
+        self.repo.bulk_insert(categories)
+        call = self.repo._call  # pylint: disable=protected-access
+        deleted = []
+
+        def racing_call(messages):
+            if not deleted and any(method == 'find_by_seqs' for method, _ in messages.values()):
+                deleted.append(categories[-1])
+                self.repo.delete(categories[-1].id)
+            return call(messages)
+
+        with patch.object(self.repo, '_call', side_effect=racing_call):
+            result = self.repo.search(self.repo.SearchParams(per_page=2))
+        self.assertEqual(deleted, [categories[-1]])
+        self.assertEqual(result.items, [categories[-2], categories[-3]])
+        self.assertEqual(result.total, 5)
+
+        def always_deleting(messages):
+            reply = call(messages)
+            method, _ = next(iter(messages.values()))
+            return [[None] + seqs[1:] for seqs in reply] if method == 'find_by_seqs' else reply
+
+        with patch.object(self.repo, '_call', side_effect=always_deleting) as patched:
+            result = self.repo.search(self.repo.SearchParams(per_page=2))
+        self.assertEqual(patched.call_count, 2 * self.repo.search_attempts)
+        self.assertTrue(all(item is not None for item in result.items))
+
+    def test_fail_clearly_when_a_worker_dies(self):
+        categories = [Category(name=f'Movie {index}') for index in range(20)]
+        self.repo.bulk_insert(categories)
+        # pylint: disable=protected-access
+        worker = self.repo._ShardedRepository__started_workers()[0]
+        os.kill(worker.process.pid, signal.SIGKILL)
+        worker.process.join()
+
+        for _ in range(2):
+            with self.assertRaisesRegex(ShardUnavailableException,
+                                        f'Shard 0 .* exited with code -{signal.SIGKILL}'):
+                self.repo.find_all()
+        alive = next(category for category in categories if self.repo._shard_of(category.id))
+        self.assertEqual(self.repo.find_by_id(alive.id), alive)
+
+    def test_forked_child_starts_with_empty_shards(self):
+        self.repo.insert(Category(name='Movie'))
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            try:
+                self.repo.insert(Category(name='Series'))
+                names = [category.name for category in self.repo.find_all()]
+                os.write(write, ','.join(names).encode())
+                self.repo.close()
+            finally:
+                os._exit(0)  # pylint: disable=protected-access
+        os.close(write)
+        os.waitpid(pid, 0)
+        with os.fdopen(read) as file:
+            self.assertEqual(file.read(), 'Series')
+        self.assertEqual([category.name for category in self.repo.find_all()], ['Movie'])
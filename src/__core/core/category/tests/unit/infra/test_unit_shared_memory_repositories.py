@@ -0,0 +1,148 @@
+# pylint: disable=unexpected-keyword-arg
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from core.__seedwork.domain.exceptions import NotFoundException
+from core.__seedwork.domain.specifications import Fuzzy
+from core.category.domain.entities import Category
+from core.category.infra.db.shared_memory.repositories import CategorySharedMemoryRepository
+
+
+def insert_categories(path: str, prefix: str, count: int) -> None:
+    repo = CategorySharedMemoryRepository(path)
+    for index in range(count):
+        repo.insert(Category(name=f'{prefix} {index}'))
+
+
+class TestCategorySharedMemoryRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'categories')
+        self.repo = self.open()
+
+    def open(self) -> CategorySharedMemoryRepository:
+        repo = CategorySharedMemoryRepository(self.path)
+        self.addCleanup(repo.shared_log.close)
+        return repo
+
+    def test_share_writes_between_instances(self):
+        other = self.open()
+        category = Category(name='Movie', description='some description')
+        self.repo.insert(category)
+
+        found = other.find_by_id(category.id)
+        self.assertEqual(found, category)
+        self.assertEqual(found.created_at, category.created_at)
+        self.assertEqual(other.change_version(), self.repo.change_version())
+
+        found.update('Documentary', None)
+        other.update(found)
+        self.assertEqual(self.repo.find_by_id(category.id).name, 'Documentary')
+        self.assertEqual(self.repo.entity_version(category.id),
+                         other.entity_version(category.id))
+
+        self.repo.delete(category.id)
+        self.assertEqual(other.find_all(), [])
+        self.assertEqual(other.change_version(), self.repo.change_version())
+
+    def test_new_instance_loads_existing_entities(self):
+        categories = [Category(name=f'Movie {index}') for index in range(3)]
+        self.repo.bulk_insert(categories)
+
+        other = self.open()
+        self.assertEqual(other.find_all(), categories)
+        self.assertEqual(other.search(other.SearchParams(filter='1')).items,
+                         [categories[1]])
+
+    def test_decode_entities_when_they_are_read(self):
+        categories = [Category(name=f'Movie {index}') for index in range(3)]
+        self.repo.bulk_insert(categories)
+
+        with patch.object(CategorySharedMemoryRepository, '_from_record',
+                          autospec=True, side_effect=CategorySharedMemoryRepository._from_record) \
+                as from_record:
+            other = self.open()
+            self.assertEqual(len(other.items), 3)
+            from_record.assert_not_called()
+            self.assertEqual(other.items[1], categories[1])
+            self.assertEqual(other.items[1], categories[1])
+            self.assertEqual(from_record.call_count, 1)
+
+    def test_suggest_from_an_index_of_the_view(self):
+        self.repo.decode_cache_size = 0
+        categories = [Category(name=f'Movie {index}') for index in range(20)]
+        self.repo.bulk_insert(categories[::-1])
+        self.assertEqual(self.repo.suggest('movie 1', 2), [categories[1], categories[10]])
+
+        with patch.object(CategorySharedMemoryRepository, '_from_record',
+                          autospec=True, side_effect=CategorySharedMemoryRepository._from_record) \
+                as from_record:
+            self.assertEqual(self.repo.suggest('movie', 3), categories[0:2] + [categories[10]])
+            self.assertEqual(from_record.call_count, 3)
+
+    def test_fuzzy_search_from_an_index_of_the_view(self):
+        self.repo.decode_cache_size = 0
+        categories = [Category(name=f'{name} {index}')
+                      for index in range(10) for name in ('Movie', 'Series')]
+        self.repo.bulk_insert(categories)
+        spec = Fuzzy('name', 'Sereis')
+        self.repo.search(self.repo.SearchParams(filter=spec))
+
+        with patch.object(CategorySharedMemoryRepository, '_from_record',
+                          autospec=True, side_effect=CategorySharedMemoryRepository._from_record) \
+                as from_record:
+            result = self.repo.search(self.repo.SearchParams(filter=spec, sort='name'))
+            self.assertEqual(result.items, sorted(categories[1::2], key=lambda item: item.name))
+            self.assertEqual(from_record.call_count, 10)
+
+    def test_found_entities_are_not_shared(self):
+        category = Category(name='Movie')
+        self.repo.insert(category)
+        found = self.repo.find_by_id(category.id)
+        found.update('Documentary', None)
+        self.assertEqual(self.repo.find_by_id(category.id).name, 'Movie')
+        self.assertIsNot(self.repo.find_by_ids([category.id])[0], found)
+
+    def test_failed_write_is_not_shared(self):
+        other = self.open()
+        with self.assertRaises(NotFoundException):
+            self.repo.update(Category(name='Movie'))
+        self.repo.insert(Category(name='Movie'))
+        self.assertEqual(len(other.find_all()), 1)
+
+    def test_compact_log(self):
+        self.repo.compact_min_lines = 5
+        other = self.open()
+        category = Category(name='Movie')
+        self.repo.insert(category)
+        for index in range(10):
+            category.update(f'Movie {index}', None)
+            self.repo.update(category)
+
+        log_id, _, lines = self.repo.shared_log.state()
+        self.assertGreater(log_id, 1)
+        self.assertLess(lines, 5)
+        self.assertFalse(os.path.exists(f'{self.path}.1'))
+        self.assertEqual(other.find_by_id(category.id).name, 'Movie 9')
+        self.assertEqual(other.change_version(), self.repo.change_version())
+
+    def test_share_writes_between_processes(self):
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=insert_categories,
+                            args=(self.path, f'worker {index}', 25))
+            for index in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+
+        self.assertEqual(len(self.repo.find_all()), 100)
+        self.assertEqual(len({item.id for item in self.repo.find_all()}), 100)
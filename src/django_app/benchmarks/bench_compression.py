@@ -0,0 +1,63 @@
+"""Bytes on the wire and CPU per request for each response encoding.
+
+Runs CategoryResource list pages (rendered with ORJSONRenderer) through
+CompressionMiddleware. Run from src/django_app:
+
+    PYTHONPATH=../__core python -m benchmarks.bench_compression --sizes 15 100 1000
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from benchmarks.bench_renderers import make_output  # noqa: E402
+from django_app.middleware.compression import (  # noqa: E402
+    CompressionMiddleware,
+    available_encodings
+)
+from django_app.renderers import ORJSONRenderer  # noqa: E402
+
+
+def measure(middleware: CompressionMiddleware, request, number: int) -> float:
+    start = time.process_time()
+    for _ in range(number):
+        middleware(request)
+    return (time.process_time() - start) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[15, 100, 1000])
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+
+    factory = RequestFactory()
+    renderer = ORJSONRenderer()
+    print(f'{"items":>6} {"encoding":<9} {"bytes":>9} {"ratio":>7} {"cpu/request":>13}')
+    for size in args.sizes:
+        body = renderer.render(make_output(size))
+
+        def view(request, body=body):
+            return HttpResponse(body, content_type='application/json')
+
+        for encoding in ['identity'] + available_encodings():
+            with override_settings(COMPRESSION={'MIN_SIZE': 0, 'ENCODINGS': available_encodings()}):
+                middleware = CompressionMiddleware(view)
+            request = factory.get('/categories/', HTTP_ACCEPT_ENCODING=encoding)
+            response = middleware(request)
+            number = max(1, args.number * 15 // size)
+            cpu = measure(middleware, request, number)
+            print(f'{size:>6} {encoding:<9} {len(response.content):>9} '
+                  f'{len(body) / len(response.content):>6.1f}x {cpu * 1e6:>11.1f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""Memory footprint of categories in the repository backends.
+
+For each dataset size and backend, measures with tracemalloc:
+
+- bytes per Category as built by the API (entity, UniqueEntityId, UUID,
+  datetime and strings), next to a sys.getsizeof breakdown of one entity
+- bytes per entity added by the repository's indexes: the `items` list
+  and the per-entity version map
+- bytes per entity of each index of the query planner, _create_indexes(),
+  each built on its own
+- for shared_memory, the log size and what a second worker pays to
+  open its view of the log (a copy of the shared index)
+- peak allocation of one search() call per kind of search, once a first
+  call built the indexes it uses
+
+Run from src/django_app:
+
+    PYTHONPATH=../__core python -m benchmarks.bench_memory --sizes 1000 10000 100000 \\
+        --backends in_memory shared_memory --json memory.json
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.category.domain import Category
+from core.category.infra import (
+    CategoryDataset,
+    CategoryDatasetConfig,
+    CategoryInMemoryRepository,
+    CategorySharedMemoryRepository
+)
+
+FILTER = CategoryDataset(CategoryDatasetConfig(size=0)).words[20]
+SEARCHES = {
+    'default': {},
+    'filter': {'filter': FILTER},
+    'sort': {'sort': 'name', 'sort_dir': 'asc'},
+    'filter_sort': {'filter': FILTER, 'sort': 'name', 'sort_dir': 'desc'},
+    'fields': {'fields': ['id', 'name']},
+}
+
+
+def traced(function: Callable[[], Any]) -> Tuple[Any, int, int]:
+    """Runs `function` and returns its result, the bytes it left allocated
+    and its peak allocation, both relative to before the call."""
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    return result, current - before, peak - before
+
+
+def make_categories(size: int) -> List[Category]:
+    # every field value is an object of its own, as parsing requests would
+    # produce; restoring skips validation, which does not change what is kept
+    return list(CategoryDataset(CategoryDatasetConfig(size=size)).entities())
+
+
+def breakdown(category: Category) -> Dict[str, int]:
+    """Shallow sizes of the objects one Category keeps alive on its own."""
+    unique_entity_id = category.unique_entity_id
+    return {
+        'category': sys.getsizeof(category),
+        'unique_entity_id': sys.getsizeof(unique_entity_id),
+        'uuid': sys.getsizeof(unique_entity_id.id) + sys.getsizeof(unique_entity_id.id.int),
+        'created_at': sys.getsizeof(category.created_at),
+        'name': sys.getsizeof(category.name),
+        'description': sys.getsizeof(category.description) if category.description else 0,
+    }
+
+
+def open_repository(backend: str, path: str) -> CategoryInMemoryRepository:
+    if backend == 'shared_memory':
+        return CategorySharedMemoryRepository(path)
+    return CategoryInMemoryRepository()
+
+
+def measure(backend: str, size: int, bulk: bool) -> Dict[str, Any]:
+    directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+    path = os.path.join(directory.name, 'categories')
+    try:
+        categories, entities_bytes, _ = traced(lambda: make_categories(size))
+        repository = open_repository(backend, path)
+
+        def insert():
+            if bulk:
+                repository.bulk_insert(categories)
+            else:
+                for category in categories:
+                    repository.insert(category)
+
+        _, indexes_bytes, insert_peak = traced(insert)
+        items_bytes = sys.getsizeof(repository.items)
+        report: Dict[str, Any] = {
+            'backend': backend,
+            'size': size,
+            'bytes_per_entity': entities_bytes / size,
+            'index_bytes_per_entity': {
+                'items': items_bytes / size,
+                'entity_versions': (indexes_bytes - items_bytes) / size,
+            },
+            'insert_peak_bytes': insert_peak,
+        }
+
+        if backend == 'shared_memory':
+            report['log_bytes_per_entity'] = repository.shared_log.state()[1] / size
+            reader, reader_bytes, reader_peak = traced(lambda: open_repository(backend, path))
+            report['reader_bytes_per_entity'] = reader_bytes / size
+            report['reader_peak_bytes'] = reader_peak
+            reader.shared_log.close()
+
+        # pylint: disable=protected-access
+        rows = list(enumerate(repository.items))
+        report['planner_bytes_per_entity'] = {}
+        for index in repository._create_indexes():
+            _, index_bytes, _ = traced(lambda: index.build(rows))
+            report['planner_bytes_per_entity'][index.name] = index_bytes / size
+        del rows, index
+
+        report['search_peak_bytes'] = {}
+        for name, params in SEARCHES.items():
+            search_params = repository.SearchParams(**params)
+            repository.search(search_params)
+            _, _, peak = traced(lambda: repository.search(search_params))
+            report['search_peak_bytes'][name] = peak
+
+        if backend == 'shared_memory':
+            repository.shared_log.close()
+        del categories, repository
+        return report
+    finally:
+        directory.cleanup()
+
+
+def print_table(reports: List[Dict[str, Any]]) -> None:
+    print(f'{"backend":<14} {"size":>8} {"B/entity":>9} {"B/items":>8} {"B/versions":>10} '
+          f'{"B/log":>7} {"B/reader":>9} ' + ' '.join(f'{name + " KiB":>15}' for name in SEARCHES))
+    for report in reports:
+        indexes = report['index_bytes_per_entity']
+        log = report.get('log_bytes_per_entity')
+        reader = report.get('reader_bytes_per_entity')
+        print(f'{report["backend"]:<14} {report["size"]:>8} {report["bytes_per_entity"]:>9.0f} '
+              f'{indexes["items"]:>8.1f} {indexes["entity_versions"]:>10.1f} '
+              f'{"-" if log is None else f"{log:.0f}":>7} {"-" if reader is None else f"{reader:.0f}":>9} '
+              + ' '.join(f'{peak / 1024:>15.1f}' for peak in report['search_peak_bytes'].values()))
+    print()
+    print(f'{"backend":<14} {"size":>8} {"index":<44} {"B/entity":>9}')
+    for report in reports:
+        for name, index_bytes in report['planner_bytes_per_entity'].items():
+            print(f'{report["backend"]:<14} {report["size"]:>8} {name:<44} {index_bytes:>9.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--backends', nargs='+', default=['in_memory', 'shared_memory'],
+                        choices=['in_memory', 'shared_memory'])
+    parser.add_argument('--bulk', action='store_true',
+                        help='insert with one bulk_insert instead of one insert per entity')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    print('entity breakdown (sys.getsizeof, bytes):', breakdown(make_categories(3)[1]))
+    reports = [measure(backend, size, args.bulk)
+               for backend in args.backends for size in args.sizes]
+    tracemalloc.stop()
+
+    print_table(reports)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'breakdown': breakdown(make_categories(3)[1]), 'runs': reports},
+                      file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
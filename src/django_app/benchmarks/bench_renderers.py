@@ -0,0 +1,78 @@
+"""Compare DRF's stdlib JSONRenderer with ORJSONRenderer on list responses.
+
+Run from src/django_app:
+
+    PYTHONPATH=../__core python -m benchmarks.bench_renderers --sizes 15 100 1000
+"""
+import argparse
+from dataclasses import asdict
+from datetime import datetime, timedelta
+import os
+import timeit
+import uuid
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
+django.setup()
+
+# pylint: disable=wrong-import-position
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from core.category.application import CategoryOutput, ListCategoriesUseCase  # noqa: E402
+from django_app.renderers import ORJSONRenderer  # noqa: E402
+
+
+def make_output(size: int) -> ListCategoriesUseCase.Output:
+    created_at = datetime(2022, 5, 22)
+    return ListCategoriesUseCase.Output(
+        items=[
+            CategoryOutput(
+                id=str(uuid.uuid4()),
+                name=f'Category {index}',
+                description='some description ' * 4,
+                is_active=index % 2 == 0,
+                created_at=created_at + timedelta(seconds=index)
+            )
+            for index in range(size)
+        ],
+        total=size,
+        current_page=1,
+        last_page=1,
+        per_page=size
+    )
+
+
+def measure(func, repeat: int) -> float:
+    number = max(1, 2000 // repeat)
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[15, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    default_renderer = JSONRenderer()
+    orjson_renderer = ORJSONRenderer()
+
+    print(f'{"items":>6} {"renderer":<28} {"bytes":>9} {"latency":>12} {"speedup":>8}')
+    for size in args.sizes:
+        output = make_output(size)
+        default_body = default_renderer.render(asdict(output))
+        orjson_body = orjson_renderer.render(output)
+        default_time = measure(
+            lambda: default_renderer.render(asdict(output)), args.repeat)
+        orjson_time = measure(
+            lambda: orjson_renderer.render(output), args.repeat)
+        print(f'{size:>6} {"JSONRenderer(asdict(output))":<28} '
+              f'{len(default_body):>9} {default_time * 1e6:>10.1f}us {1:>7.1f}x')
+        print(f'{size:>6} {"ORJSONRenderer(output)":<28} '
+              f'{len(orjson_body):>9} {orjson_time * 1e6:>10.1f}us '
+              f'{default_time / orjson_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
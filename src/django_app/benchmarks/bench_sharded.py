@@ -0,0 +1,107 @@
+"""Search latency of the sharded repository across worker counts.
+
+Loads the same dataset into CategoryInMemoryRepository and into
+CategoryShardedRepository with each --shards count. Then it times every
+kind of search and reports the median and the speedup over the single
+in-memory repository. Sharding only pays off with as many free cores as
+shards. A search that matches few entities is dominated by the round trip
+to the workers.
+
+Run from src/django_app:
+
+    PYTHONPATH=../__core python -m benchmarks.bench_sharded --size 1000000 \\
+        --shards 1 2 4 8 --json sharded.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from core.category.infra import (
+    CategoryDataset,
+    CategoryDatasetConfig,
+    CategoryInMemoryRepository,
+    CategoryShardedRepository
+)
+
+FILTER = CategoryDataset(CategoryDatasetConfig(size=0)).words[20]
+SEARCHES = {
+    'default': {},
+    'filter': {'filter': FILTER},
+    'sort': {'sort': 'name', 'sort_dir': 'asc'},
+    'filter_sort': {'filter': FILTER, 'sort': 'name', 'sort_dir': 'desc'},
+    'last_page': {'sort': 'name', 'page': 100, 'per_page': 50},
+}
+
+
+def default_shards() -> List[int]:
+    cpus = os.cpu_count() or 1
+    return sorted({1, *(2 ** power for power in range(1, cpus.bit_length())), cpus})
+
+
+def median_ms(function: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure(repository: CategoryInMemoryRepository, repeat: int) -> Dict[str, float]:
+    results = {}
+    for name, params in SEARCHES.items():
+        search_params = repository.SearchParams(**params)
+        repository.search(search_params)
+        results[name] = median_ms(lambda: repository.search(search_params), repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=200000)
+    parser.add_argument('--shards', type=int, nargs='+', default=default_shards())
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    categories = list(CategoryDataset(CategoryDatasetConfig(size=args.size)).entities())
+    reports = []
+
+    in_memory = CategoryInMemoryRepository()
+    in_memory.bulk_insert(categories)
+    reports.append({'backend': 'in_memory', 'shards': None, 'load_s': None,
+                    'median_ms': measure(in_memory, args.repeat)})
+    del in_memory
+
+    for shards in args.shards:
+        repository = CategoryShardedRepository(shards=shards)
+        try:
+            start = time.perf_counter()
+            repository.bulk_insert(categories)
+            load = time.perf_counter() - start
+            reports.append({'backend': 'sharded', 'shards': shards, 'load_s': load,
+                            'median_ms': measure(repository, args.repeat)})
+        finally:
+            repository.close()
+
+    baseline = reports[0]['median_ms']
+    print(f'{args.size} categories, {os.cpu_count()} CPUs, median ms (speedup over in_memory)')
+    print(f'{"backend":<10} {"shards":>6} {"load s":>7} '
+          + ' '.join(f'{name:>18}' for name in SEARCHES))
+    for report in reports:
+        load = report['load_s']
+        print(f'{report["backend"]:<10} {report["shards"] or "-":>6} '
+              f'{"-" if load is None else f"{load:.1f}":>7} '
+              + ' '.join(f'{ms:>9.2f} ({baseline[name] / ms:>5.2f}x)'
+                         for name, ms in report['median_ms'].items()))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'size': args.size, 'cpus': os.cpu_count(), 'runs': reports}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Thundering herd on ListCategoriesUseCase with and without single-flight.
+
+A herd of threads is released at once against the same list page, as
+happens when a popular page expires from a cache. Reports the wall time
+until the whole herd is answered and how many searches hit the repository.
+
+Run from src/django_app:
+
+    PYTHONPATH=../__core python -m benchmarks.bench_single_flight --herd 8 64 256 --latency 0.01
+
+With --latency 0 the searches are pure CPU and the GIL mostly serializes
+the herd, so few calls overlap and there is little to share.
+"""
+import argparse
+import threading
+import time
+
+from core.__seedwork.application import InterceptorChain, SingleFlightInterceptor
+from core.category.application import ListCategoriesUseCase
+from core.category.domain.entities import Category
+from core.category.infra import CategoryInMemoryRepository
+
+
+class CountingRepository(CategoryInMemoryRepository):
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.searches = 0
+        self.counter_lock = threading.Lock()
+
+    def search(self, input_params):
+        with self.counter_lock:
+            self.searches += 1
+        if self.latency:
+            # stands in for the round trip to a database
+            time.sleep(self.latency)
+        return super().search(input_params)
+
+
+def run_herd(use_case, request, herd: int) -> float:
+    barrier = threading.Barrier(herd + 1)
+
+    def call():
+        barrier.wait()
+        use_case.execute(request)
+
+    threads = [threading.Thread(target=call) for _ in range(herd)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--herd', type=int, nargs='+', default=[8, 64, 256])
+    parser.add_argument('--categories', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help='seconds added to every repository search')
+    args = parser.parse_args()
+
+    # pylint: disable=unexpected-keyword-arg
+    request = ListCategoriesUseCase.Input(filter='category 1', sort='name')
+    print(f'{"herd":>6} {"single-flight":>14} {"searches":>9} {"wall ms":>9}')
+    for herd in args.herd:
+        for single_flight in (False, True):
+            repository = CountingRepository(args.latency)
+            repository.bulk_insert([
+                Category(name=f'category {index}')
+                for index in range(args.categories)
+            ])
+            chain = InterceptorChain(
+                (SingleFlightInterceptor(),) if single_flight else ())
+            use_case = chain.wrap(ListCategoriesUseCase(repository))
+            elapsed = run_herd(use_case, request, herd)
+            print(f'{herd:>6} {"on" if single_flight else "off":>14} '
+                  f'{repository.searches:>9} {elapsed * 1000:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
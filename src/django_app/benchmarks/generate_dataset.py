@@ -0,0 +1,80 @@
+"""Write a seeded synthetic category dataset as NDJSON or SQLite rows.
+
+The same --size/--seed always yields the same categories, the ones the
+benchmark suite, bench_memory and load_test build in memory.
+
+Run from src/django_app:
+
+    # full records, e.g. for fixtures
+    PYTHONPATH=../__core python -m benchmarks.generate_dataset --size 1000000 --ndjson categories.ndjson
+    # only the fields /categories/import accepts
+    PYTHONPATH=../__core python -m benchmarks.generate_dataset --size 100000 --ndjson import.ndjson --import-fields
+    # CategoryModel rows in the `categories` table
+    PYTHONPATH=../__core python -m benchmarks.generate_dataset --size 1000000 --sqlite db.sqlite3
+"""
+import argparse
+import sqlite3
+import sys
+import time
+
+from core.category.infra.dataset import CategoryDataset, CategoryDatasetConfig
+
+IMPORT_FIELDS = ('name', 'description', 'is_active')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vocabulary', type=int, default=2000)
+    parser.add_argument('--name-skew', type=float, default=1.1,
+                        help='Zipf exponent of name words, 0 for uniform')
+    parser.add_argument('--description-ratio', type=float, default=0.66)
+    parser.add_argument('--description-length', type=int, nargs=3, default=(20, 80, 400),
+                        metavar=('MIN', 'MODE', 'MAX'))
+    parser.add_argument('--created-sorted', action='store_true',
+                        help='emit categories in created_at order')
+    parser.add_argument('--ndjson', help="NDJSON file to write, '-' for stdout")
+    parser.add_argument('--import-fields', action='store_true',
+                        help=f'only write {", ".join(IMPORT_FIELDS)} to the NDJSON file')
+    parser.add_argument('--sqlite', help='SQLite database to insert CategoryModel rows into')
+    parser.add_argument('--table', default='categories')
+    args = parser.parse_args()
+    if not args.ndjson and not args.sqlite:
+        parser.error('pass --ndjson and/or --sqlite')
+
+    dataset = CategoryDataset(CategoryDatasetConfig(
+        size=args.size,
+        seed=args.seed,
+        vocabulary=args.vocabulary,
+        name_skew=args.name_skew,
+        description_ratio=args.description_ratio,
+        description_length=tuple(args.description_length),
+        created_sorted=args.created_sorted
+    ))
+    fields = IMPORT_FIELDS if args.import_fields else None
+
+    if args.ndjson:
+        start = time.perf_counter()
+        if args.ndjson == '-':
+            count = dataset.write_ndjson(sys.stdout, fields)
+        else:
+            with open(args.ndjson, 'w', encoding='utf-8') as file:
+                count = dataset.write_ndjson(file, fields)
+        print(f'{count} categories written to {args.ndjson} in '
+              f'{time.perf_counter() - start:.1f}s', file=sys.stderr)
+
+    if args.sqlite:
+        start = time.perf_counter()
+        connection = sqlite3.connect(args.sqlite)
+        try:
+            count = dataset.write_sqlite(connection, args.table)
+        finally:
+            connection.close()
+        print(f'{count} categories inserted into {args.sqlite}:{args.table} in '
+              f'{time.perf_counter() - start:.1f}s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Overload test for AdmissionControlMiddleware.
+
+Serves the project from a threaded WSGI server in a child process, once
+without and once with admission control, and drives it with more
+closed-loop clients than it can serve: a mix of cheap detail reads and
+expensive filtered + sorted searches. For each run it reports throughput,
+how many requests were shed, and p50/p99 latency of the requests that
+were served.
+
+The in-memory repository is pure CPU, so on its own the server saturates
+in its accept loop before requests ever pile up in Django. Reads are
+therefore routed through a simulated database with a few connections and
+a fixed latency per read, which is where a real deployment queues up.
+
+Run from src/django_app:
+
+    PYTHONPATH=../__core python -m benchmarks.load_admission --clients 64 --duration 10
+"""
+import argparse
+from collections import defaultdict
+import http.client
+import os
+import random
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from dependency_injector import providers  # noqa: E402
+import orjson  # noqa: E402
+from core.category.domain.entities import Category  # noqa: E402
+from django_app import container  # noqa: E402
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class SimulatedDatabase:
+    """Delegates to the repository, but every read waits for one of
+    `connections` connections and holds it for `latency` seconds
+    (`latency * search_cost` for searches)."""
+
+    def __init__(self, repository: Any, connections: int, latency: float, search_cost: int = 5):
+        self.repository = repository
+        self.connections = threading.BoundedSemaphore(connections)
+        self.latency = latency
+        self.search_cost = search_cost
+
+    def find_by_id(self, entity_id):
+        with self.connections:
+            time.sleep(self.latency)
+            return self.repository.find_by_id(entity_id)
+
+    def search(self, input_params):
+        with self.connections:
+            time.sleep(self.latency * self.search_cost)
+            return self.repository.search(input_params)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+
+def serve(port: int, admission: bool, args):
+    repository = container.repository_category()
+    repository.bulk_insert([
+        Category(name=f'category {index}', description='some description')
+        for index in range(args.categories)
+    ])
+    container.repository_category.override(providers.Object(
+        SimulatedDatabase(repository, args.db_connections, args.db_latency)))
+    options = {**settings.ADMISSION_CONTROL, 'ENABLED': admission}
+    with override_settings(ADMISSION_CONTROL=options):
+        application = WSGIHandler()
+    server = make_server('127.0.0.1', port, application,
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    # the search view prints its output; keep it out of the report
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    server.serve_forever()
+
+
+def request(port: int, path: str):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def wait_until_ready(port: int, timeout: float = 120) -> List[str]:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            status, body = request(port, '/categories/export')
+        except OSError:
+            status = None
+        if status == 200:
+            return [orjson.loads(line)['id'] for line in body.splitlines()]
+        if time.monotonic() > deadline:
+            raise RuntimeError('server did not start')
+        time.sleep(0.2)
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(ratio * len(values)))]
+
+
+def run(port: int, admission: bool, args):
+    server = subprocess.Popen([
+        sys.executable, '-m', 'benchmarks.load_admission', '--serve',
+        '--port', str(port), '--categories', str(args.categories),
+        '--db-connections', str(args.db_connections),
+        '--db-latency', str(args.db_latency),
+        *(['--admission'] if admission else [])
+    ])
+    try:
+        ids = wait_until_ready(port)
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        shed: Dict[str, int] = defaultdict(int)
+        lock = threading.Lock()
+        stop_at = time.monotonic() + args.duration
+
+        def client():
+            rnd = random.Random()
+            while time.monotonic() < stop_at:
+                if rnd.random() < args.search_ratio:
+                    kind = 'search'
+                    path = f'/categories/?filter=category%20{rnd.randint(0, 9)}&sort=name'
+                else:
+                    kind = 'detail'
+                    path = f'/categories/{rnd.choice(ids)}'
+                start = time.perf_counter()
+                status, _ = request(port, path)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if status == 503:
+                        shed[kind] += 1
+                    else:
+                        latencies[kind].append(elapsed)
+
+        threads = [threading.Thread(target=client) for _ in range(args.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    label = 'admission on' if admission else 'admission off'
+    for kind in ('detail', 'search'):
+        served = latencies[kind]
+        print(f'{label:<14} {kind:<7} {len(served) / args.duration:>8.1f} {shed[kind]:>6} '
+              f'{percentile(served, 0.5) * 1000:>9.1f} {percentile(served, 0.99) * 1000:>9.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--categories', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--search-ratio', type=float, default=0.2)
+    parser.add_argument('--db-connections', type=int, default=4)
+    parser.add_argument('--db-latency', type=float, default=0.05)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--admission', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.admission, args)
+        return
+
+    print(f'{"run":<14} {"kind":<7} {"ok/s":>8} {"shed":>6} {"p50 ms":>9} {"p99 ms":>9}')
+    for admission in (False, True):
+        run(args.port, admission, args)
+
+
+if __name__ == '__main__':
+    main()
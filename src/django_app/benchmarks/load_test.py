@@ -0,0 +1,423 @@
+"""Sustained mixed load on the categories API with latency percentiles.
+
+Starts the project in a threaded WSGI server in a child process (or
+targets a running server with --url), seeds it through the batch
+endpoint, then drives a weighted mix of operations from asyncio clients
+speaking plain HTTP/1.1, with no third-party client or external service.
+
+By default `--users` clients run closed-loop, each sending its next
+request as soon as the last one is answered. With `--rate` requests are
+instead started on a fixed schedule and their latency is measured from
+the time they were due, so a stalled server shows up in the percentiles
+rather than just lowering throughput.
+
+The report is JSON: throughput, status codes, p50/p90/p95/p99/p99.9 and
+a histogram over the metrics registry's buckets, in total and per
+operation. A one-line summary per operation goes to stderr.
+
+Run from src/django_app:
+
+    PYTHONPATH=../__core python -m benchmarks.load_test --users 32 --duration 30 \\
+        --mix detail=50,list=10,search=20,create=10,update=8,delete=2 --output load.json
+"""
+import argparse
+import asyncio
+from bisect import bisect_left
+from collections import Counter, defaultdict
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from core.__seedwork.infra.metrics import DEFAULT_BUCKETS
+from core.category.infra.dataset import CategoryDataset, CategoryDatasetConfig
+
+OPERATIONS = ('detail', 'list', 'search', 'create', 'update', 'delete')
+DEFAULT_MIX = 'detail=50,list=10,search=20,create=10,update=8,delete=2'
+PERCENTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+SEED_BATCH = 500
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection; reconnects when the server
+    closes it, as HTTP/1.0 servers do after every response."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Any = None) -> Tuple[int, bytes]:
+        reused = self.writer is not None
+        try:
+            return await self.__request(method, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+            # the server dropped the idle connection; retry on a new one
+            return await self.__request(method, path, body)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def __request(self, method: str, path: str, body: Any) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = b'' if body is None else json.dumps(body).encode()
+        head = (f'{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+                'Accept: application/json\r\n')
+        if body is not None:
+            head += f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n'
+        self.writer.write(head.encode() + b'\r\n' + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('connection closed by the server')
+        version, status = status_line.split(b' ', 2)[:2]
+        headers: Dict[str, str] = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == b'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if 'content-length' in headers:
+            content = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            content = await self.__read_chunked()
+        else:
+            content = await self.reader.read()
+            keep_alive = False
+        if not keep_alive:
+            self.close()
+        return int(status), content
+
+    async def __read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                while await self.reader.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+
+class Recorder:
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.recording = False
+
+    def record(self, operation: str, status: Any, latency: float) -> None:
+        if not self.recording:
+            return
+        self.statuses[operation][str(status)] += 1
+        self.latencies[operation].append(latency)
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        operations = {
+            operation: summarize(self.latencies[operation], self.statuses[operation], duration)
+            for operation in OPERATIONS if self.statuses[operation]
+        }
+        total = summarize(
+            [latency for latencies in self.latencies.values() for latency in latencies],
+            sum(self.statuses.values(), Counter()),
+            duration
+        )
+        return {'total': total, 'operations': operations}
+
+
+def summarize(latencies: List[float], statuses: Counter, duration: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    errors = sum(count for status, count in statuses.items()
+                 if not status.isdigit() or int(status) >= 500)
+    counts = [0] * (len(DEFAULT_BUCKETS) + 1)
+    for latency in latencies:
+        counts[bisect_left(DEFAULT_BUCKETS, latency)] += 1
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / duration,
+        'status': dict(sorted(statuses.items())),
+        'latency_ms': {
+            **{f'p{ratio * 100:g}': percentile(latencies, ratio) * 1000 for ratio in PERCENTILES},
+            'mean': sum(latencies) / len(latencies) * 1000 if latencies else None,
+            'max': latencies[-1] * 1000 if latencies else None,
+        },
+        # non-cumulative counts per bucket; `le` is the upper bound in ms
+        'histogram': [
+            {'le': bound * 1000 if bound is not None else None, 'count': count}
+            for bound, count in zip((*DEFAULT_BUCKETS, None), counts)
+        ],
+    }
+
+
+def percentile(values: List[float], ratio: float) -> Optional[float]:
+    """`values` must be sorted."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(ratio * len(values)))]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(','):
+        operation, _, weight = item.partition('=')
+        if operation.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f'unknown operation {operation!r}, expected one of {", ".join(OPERATIONS)}')
+        weights[operation.strip()] = float(weight)
+    return weights
+
+
+class Workload:
+    """Picks operations by weight and turns them into requests. Deletes
+    only remove categories this run created, so the seeded dataset keeps
+    its size."""
+
+    def __init__(self, mix: Dict[str, float], ids: List[str], words: List[str], seed: int):
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.ids = ids
+        # searches and renames use the dataset's most common words
+        self.words = words[:100]
+        self.created: List[str] = []
+        self.random = random.Random(seed)
+
+    def next(self) -> Tuple[str, str, str, Any]:
+        rnd = self.random
+        operation = rnd.choices(self.operations, self.weights)[0]
+        if operation == 'delete' and not self.created:
+            operation = 'create'
+        if operation == 'detail':
+            return operation, 'GET', f'/categories/{rnd.choice(self.ids)}', None
+        if operation == 'list':
+            return operation, 'GET', f'/categories/?page={rnd.randint(1, 20)}', None
+        if operation == 'search':
+            sort = rnd.choice(('name', 'created_at'))
+            direction = rnd.choice(('asc', 'desc'))
+            term = quote(rnd.choice(self.words).lower())
+            return operation, 'GET', f'/categories/?filter={term}&sort={sort}&sort_dir={direction}', None
+        if operation == 'create':
+            return operation, 'POST', '/categories/', {
+                'name': f'load {rnd.getrandbits(32):08x}', 'description': 'created by the load test'}
+        if operation == 'update':
+            return operation, 'PUT', f'/categories/{rnd.choice(self.ids)}', {
+                'name': ' '.join(rnd.sample(self.words, 2)), 'description': 'updated by the load test'}
+        return operation, 'DELETE', f'/categories/{self.created.pop(rnd.randrange(len(self.created)))}', None
+
+    def completed(self, operation: str, status: int, content: bytes) -> None:
+        if operation == 'create' and status == 201:
+            self.created.append(json.loads(content)['id'])
+
+
+async def seed(host: str, port: int, dataset: CategoryDataset) -> List[str]:
+    connection = HttpConnection(host, port)
+    records = dataset.records()
+    ids: List[str] = []
+    try:
+        while batch := list(itertools.islice(records, SEED_BATCH)):
+            items = [{'name': record['name'], 'description': record['description'],
+                      'is_active': record['is_active']} for record in batch]
+            status, content = await connection.request('POST', '/categories/batch', items)
+            if status != 201:
+                raise RuntimeError(f'seeding failed with {status}: {content[:200]!r}')
+            ids.extend(item['id'] for item in json.loads(content)['items'])
+    finally:
+        connection.close()
+    return ids
+
+
+async def execute(connection: HttpConnection, workload: Workload, recorder: Recorder,
+                  started: Optional[float] = None) -> None:
+    operation, method, path, body = workload.next()
+    started = time.perf_counter() if started is None else started
+    try:
+        status, content = await connection.request(method, path, body)
+    except (OSError, asyncio.IncompleteReadError) as error:
+        connection.close()
+        recorder.record(operation, type(error).__name__, time.perf_counter() - started)
+        return
+    recorder.record(operation, status, time.perf_counter() - started)
+    workload.completed(operation, status, content)
+
+
+async def closed_loop(host: str, port: int, workload: Workload, recorder: Recorder,
+                      users: int, stop_at: float) -> None:
+    async def user():
+        connection = HttpConnection(host, port)
+        try:
+            while time.perf_counter() < stop_at:
+                await execute(connection, workload, recorder)
+        finally:
+            connection.close()
+
+    await asyncio.gather(*(user() for _ in range(users)))
+
+
+async def open_loop(host: str, port: int, workload: Workload, recorder: Recorder,
+                    users: int, rate: float, stop_at: float) -> None:
+    # `users` connections serve the schedule; a request waiting for a free
+    # connection is already late, and that wait counts as latency
+    connections: asyncio.Queue = asyncio.Queue()
+    for _ in range(users):
+        connections.put_nowait(HttpConnection(host, port))
+
+    async def send(due: float):
+        connection = await connections.get()
+        try:
+            await execute(connection, workload, recorder, started=due)
+        finally:
+            connections.put_nowait(connection)
+
+    tasks = set()
+    interval = 1 / rate
+    due = time.perf_counter()
+    while due < stop_at:
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(due))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        due += interval
+    await asyncio.gather(*tasks)
+    while not connections.empty():
+        connections.get_nowait().close()
+
+
+async def load(host: str, port: int, args) -> Dict[str, Any]:
+    dataset = CategoryDataset(CategoryDatasetConfig(size=args.categories, seed=args.seed))
+    ids = await seed(host, port, dataset)
+    workload = Workload(args.mix, ids, dataset.words, args.seed)
+    recorder = Recorder()
+
+    async def drive(seconds: float):
+        stop_at = time.perf_counter() + seconds
+        if args.rate:
+            await open_loop(host, port, workload, recorder, args.users, args.rate, stop_at)
+        else:
+            await closed_loop(host, port, workload, recorder, args.users, stop_at)
+
+    if args.warmup:
+        await drive(args.warmup)
+    recorder.recording = True
+    started = time.perf_counter()
+    await drive(args.duration)
+    duration = time.perf_counter() - started
+    return {
+        'config': {
+            'users': args.users,
+            'rate': args.rate,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'categories': args.categories,
+            'mix': args.mix,
+        },
+        'duration': duration,
+        **recorder.report(duration),
+    }
+
+
+def serve(port: int) -> None:
+    # pylint: disable=import-outside-toplevel
+    from wsgiref.simple_server import make_server
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
+    from benchmarks.load_admission import QuietHandler, ThreadingWSGIServer
+    from django_app.wsgi import application
+    server = make_server('127.0.0.1', port, application,
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    # the list view prints its output; keep it out of the report
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+    server.serve_forever()
+
+
+async def wait_until_ready(host: str, port: int, timeout: float = 120) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        connection = HttpConnection(host, port)
+        try:
+            status, _ = await connection.request('GET', '/ready')
+            if status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            connection.close()
+        if time.monotonic() > deadline:
+            raise RuntimeError('server did not become ready')
+        await asyncio.sleep(0.2)
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    print(f'{"operation":<10} {"req/s":>9} {"errors":>7} {"p50 ms":>9} {"p95 ms":>9} '
+          f'{"p99 ms":>9} {"max ms":>9}', file=sys.stderr)
+    rows = [*report['operations'].items(), ('total', report['total'])]
+    for operation, summary in rows:
+        latency = summary['latency_ms']
+        print(f'{operation:<10} {summary["throughput"]:>9.1f} {summary["errors"]:>7} '
+              f'{latency["p50"]:>9.2f} {latency["p95"]:>9.2f} '
+              f'{latency["p99"]:>9.2f} {latency["max"]:>9.2f}', file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='target a running server instead of starting one')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--categories', type=int, default=10000, help='categories to seed')
+    parser.add_argument('--users', type=int, default=32, help='concurrent connections')
+    parser.add_argument('--rate', type=float, help='requests per second (open loop)')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--warmup', type=float, default=5.0,
+                        help='seconds of load before recording starts')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'operation weights, default {DEFAULT_MIX}')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    server = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = '127.0.0.1', args.port
+        server = subprocess.Popen([  # pylint: disable=consider-using-with
+            sys.executable, '-m', 'benchmarks.load_test', '--serve', '--port', str(port)])
+    try:
+        asyncio.run(wait_until_ready(host, port))
+        report = asyncio.run(load(host, port, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_summary(report)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
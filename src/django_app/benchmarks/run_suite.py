@@ -0,0 +1,78 @@
+"""Run the pytest-benchmark suite in benchmarks/suite, store the results
+and compare them with a saved baseline.
+
+Run from src/django_app:
+
+    # store the current numbers as the baseline
+    python -m benchmarks.run_suite save
+    # run again and fail when a median is more than 10% slower
+    python -m benchmarks.run_suite compare --threshold 10
+
+BENCHMARK_SIZES=1000,100000 leaves out the 1M item repository searches.
+Arguments after `--` go to pytest, e.g. `-- -k search`. Results are kept
+per machine in benchmarks/results.
+"""
+import argparse
+import glob
+import os
+import sys
+from typing import List, Optional
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SUITE = os.path.join(ROOT, 'suite')
+STORAGE = os.path.join(ROOT, 'results')
+
+
+def suite_args(extra: List[str]) -> List[str]:
+    return [
+        SUITE,
+        '--benchmark-only',
+        f'--benchmark-storage=file://{STORAGE}',
+        '--benchmark-columns=min,median,mean,stddev,rounds',
+        '--benchmark-sort=fullname',
+        *extra,
+    ]
+
+
+def latest_run(name: str) -> Optional[str]:
+    """Number of the latest run saved as `name`, e.g. '0003'."""
+    runs = sorted(
+        os.path.basename(path)
+        for path in glob.glob(os.path.join(STORAGE, '*', f'[0-9][0-9][0-9][0-9]_{name}.json'))
+    )
+    return runs[-1][:4] if runs else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('save', 'compare'))
+    parser.add_argument('--name', default='baseline',
+                        help='name the baseline is saved and looked up under')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='allowed median regression in percent')
+    parser.add_argument('--save', action='store_true',
+                        help='also store the compared run')
+    args, extra = parser.parse_known_args()
+    extra = [arg for arg in extra if arg != '--']
+
+    if args.command == 'save':
+        return pytest.main(suite_args([f'--benchmark-save={args.name}', *extra]))
+
+    baseline = latest_run(args.name)
+    if baseline is None:
+        print(f'No {args.name!r} run in {STORAGE}, run `save` first.', file=sys.stderr)
+        return 2
+    compare = [
+        f'--benchmark-compare={baseline}',
+        f'--benchmark-compare-fail=median:{args.threshold:g}%',
+    ]
+    if args.save:
+        compare.append('--benchmark-autosave')
+    return pytest.main(suite_args([*compare, *extra]))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
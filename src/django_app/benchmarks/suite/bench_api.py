@@ -0,0 +1,91 @@
+import json
+
+from dependency_injector import providers
+from django.test import Client
+import pytest
+
+from django_app import container
+
+from .conftest import FILTER, make_repository
+
+SIZE = 1000
+
+
+@pytest.fixture(scope='module')
+def repository():
+    repository = make_repository(SIZE)
+    with container.repository_category.override(providers.Object(repository)):
+        container.reset_singletons()
+        yield repository
+    container.reset_singletons()
+
+
+@pytest.fixture
+def client(repository) -> Client:  # pylint: disable=unused-argument
+    return Client()
+
+
+def test_list(benchmark, client):
+    response = benchmark(client.get, '/categories/')
+    assert response.status_code == 200
+
+
+def test_list_filter_sort(benchmark, client):
+    response = benchmark(client.get, '/categories/',
+                         {'filter': FILTER, 'sort': 'name', 'sort_dir': 'desc'})
+    assert response.status_code == 200
+
+
+def test_list_not_modified(benchmark, client):
+    etag = client.get('/categories/')['ETag']
+    response = benchmark(client.get, '/categories/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_suggest(benchmark, client):
+    response = benchmark(client.get, '/categories/suggest', {'prefix': FILTER[:3]})
+    assert response.status_code == 200
+
+
+def test_detail(benchmark, client, repository):
+    entity = repository.items[SIZE // 2]
+    response = benchmark(client.get, f'/categories/{entity.id}')
+    assert response.status_code == 200
+
+
+def test_create(benchmark, client):
+    response = benchmark(client.post, '/categories/',
+                         {'name': 'Movie', 'description': 'some description'},
+                         content_type='application/json')
+    assert response.status_code == 201
+
+
+def test_create_batch(benchmark, client):
+    body = json.dumps([{'name': f'Movie {index}'} for index in range(100)])
+    response = benchmark(client.post, '/categories/batch', body,
+                         content_type='application/json')
+    assert response.status_code == 201
+
+
+def test_update(benchmark, client, repository):
+    entity = repository.items[SIZE // 2]
+    response = benchmark(client.put, f'/categories/{entity.id}',
+                         {'name': 'Documentary'}, content_type='application/json')
+    assert response.status_code == 200
+
+
+def test_delete(benchmark, client):
+    def setup():
+        response = client.post('/categories/', {'name': 'Movie'},
+                               content_type='application/json')
+        return (f"/categories/{response.json()['id']}",), {}
+
+    benchmark.pedantic(client.delete, setup=setup, rounds=200)
+
+
+def test_export(benchmark, client):
+    def export() -> int:
+        response = client.get('/categories/export')
+        return len(b''.join(response.streaming_content))
+
+    assert benchmark(export)
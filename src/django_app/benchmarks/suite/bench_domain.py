@@ -0,0 +1,51 @@
+# pylint: disable=unexpected-keyword-arg
+from datetime import datetime
+
+from core.__seedwork.domain.exceptions import ValidationException
+from core.__seedwork.domain.value_objects import UniqueEntityId
+from core.category.domain import Category
+from core.category.domain.validations import CategoryValidatorFactory
+
+CREATED_AT = datetime(2022, 5, 22)
+
+
+def test_create_category(benchmark):
+    benchmark(Category, name='Movie', description='some description')
+
+
+def test_restore_category(benchmark):
+    unique_entity_id = UniqueEntityId()
+    benchmark(Category.restore, unique_entity_id=unique_entity_id, name='Movie',
+              description='some description', is_active=True, created_at=CREATED_AT)
+
+
+def test_validate_valid_category(benchmark):
+    validator = CategoryValidatorFactory.create()
+    data = {'unique_entity_id': UniqueEntityId(), 'name': 'Movie',
+            'description': 'some description', 'is_active': True, 'created_at': CREATED_AT}
+    benchmark(validator.validate, data)
+
+
+def test_validate_invalid_category(benchmark):
+    validator = CategoryValidatorFactory.create()
+    data = {'unique_entity_id': UniqueEntityId(), 'name': 'x' * 256,
+            'description': 5, 'is_active': 'yes', 'created_at': CREATED_AT}
+
+    def validate():
+        try:
+            validator.validate(data)
+        except ValidationException:
+            return validator.errors
+        return None
+
+    assert benchmark(validate)
+
+
+def test_update_category(benchmark):
+    category = Category(name='Movie')
+    benchmark(category.update, 'Documentary', 'some description')
+
+
+def test_category_to_dict(benchmark):
+    category = Category(name='Movie', description='some description')
+    assert benchmark(category.to_dict)['name'] == 'Movie'
@@ -0,0 +1,43 @@
+import pytest
+
+from core.category.infra import CategoryInMemoryRepository
+
+from .conftest import FILTER, SIZES, make_repository, run, size_id
+
+SEARCHES = {
+    'default': {},
+    'filter': {'filter': FILTER},
+    'sort': {'sort': 'name', 'sort_dir': 'asc'},
+    'filter_sort': {'filter': FILTER, 'sort': 'name', 'sort_dir': 'desc'},
+    'last_page': {'page': 1000, 'per_page': 15},
+    'fields': {'fields': ['id', 'name']},
+}
+
+
+@pytest.fixture(scope='module', params=SIZES, ids=size_id)
+def repository(request) -> CategoryInMemoryRepository:
+    return make_repository(request.param)
+
+
+@pytest.mark.parametrize('search', SEARCHES.keys())
+def test_search(benchmark, repository, search):
+    params = repository.SearchParams(**SEARCHES[search])
+    result = run(benchmark, repository.search, len(repository.items), params)
+    assert result.total <= len(repository.items)
+
+
+def test_find_by_id(benchmark, repository):
+    # the lookup scans the items, so take one from the middle
+    entity = repository.items[len(repository.items) // 2]
+    assert run(benchmark, repository.find_by_id, len(repository.items), entity.id) is entity
+
+
+def test_change_version(benchmark, repository):
+    run(benchmark, repository.change_version, len(repository.items))
+
+
+def test_suggest(benchmark, repository):
+    # a three letter prefix of a common word, as typed into a picker
+    repository.suggest(FILTER[:3])  # builds the prefix index
+    result = run(benchmark, repository.suggest, len(repository.items), FILTER[:3])
+    assert 0 < len(result) <= 10
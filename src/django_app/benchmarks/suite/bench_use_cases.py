@@ -0,0 +1,94 @@
+# pylint: disable=unexpected-keyword-arg,no-value-for-parameter
+from typing import List
+
+import pytest
+
+from core.category.application import (
+    CreateCategoriesBatchUseCase,
+    CreateCategoryUseCase,
+    DeleteCategoryUseCase,
+    ExportCategoriesUseCase,
+    GetCategoriesByIdsUseCase,
+    GetCategoryUseCase,
+    ListCategoriesUseCase,
+    UpdateCategoryUseCase
+)
+from core.category.domain import Category
+from core.category.infra import CategoryInMemoryRepository
+
+from .conftest import FILTER, ids, make_repository
+
+SIZE = 1000
+
+
+@pytest.fixture
+def repository() -> CategoryInMemoryRepository:
+    return make_repository(SIZE)
+
+
+@pytest.fixture
+def middle(repository) -> Category:
+    return repository.items[SIZE // 2]
+
+
+def test_create_category(benchmark, repository):
+    use_case = CreateCategoryUseCase(repository)
+    benchmark(use_case.execute, CreateCategoryUseCase.Input(name='Movie'))
+
+
+def test_create_categories_batch(benchmark, repository):
+    use_case = CreateCategoriesBatchUseCase(repository)
+    request = CreateCategoriesBatchUseCase.Input(items=[
+        CreateCategoryUseCase.Input(name=f'Movie {index}') for index in range(100)
+    ])
+    output = benchmark(use_case.execute, request)
+    assert not output.errors
+
+
+def test_get_category(benchmark, repository, middle):
+    use_case = GetCategoryUseCase(repository)
+    benchmark(use_case.execute, GetCategoryUseCase.Input(id=middle.id))
+
+
+def test_get_categories_by_ids(benchmark, repository):
+    use_case = GetCategoriesByIdsUseCase(repository)
+    request = GetCategoriesByIdsUseCase.Input(ids=ids(repository.items[::20]))
+    output = benchmark(use_case.execute, request)
+    assert not output.not_found
+
+
+@pytest.mark.parametrize('search', [
+    {},
+    {'filter': FILTER, 'sort': 'name', 'sort_dir': 'asc'},
+    {'fields': ['id', 'name']},
+], ids=['default', 'filter_sort', 'fields'])
+def test_list_categories(benchmark, repository, search):
+    use_case = ListCategoriesUseCase(repository)
+    benchmark(use_case.execute, ListCategoriesUseCase.Input(**search))
+
+
+def test_export_categories(benchmark, repository):
+    use_case = ExportCategoriesUseCase(repository)
+
+    def export() -> List[int]:
+        output = use_case.execute(ExportCategoriesUseCase.Input())
+        return [len(chunk) for chunk in output.chunks]
+
+    assert sum(benchmark(export)) == SIZE
+
+
+def test_update_category(benchmark, repository, middle):
+    use_case = UpdateCategoryUseCase(repository)
+    benchmark(use_case.execute, UpdateCategoryUseCase.Input(
+        id=middle.id, name='Documentary', description='some description'))
+
+
+def test_delete_category(benchmark, repository):
+    use_case = DeleteCategoryUseCase(repository)
+
+    def setup():
+        category = Category(name='Movie')
+        repository.insert(category)
+        return (DeleteCategoryUseCase.Input(id=category.id),), {}
+
+    benchmark.pedantic(use_case.execute, setup=setup, rounds=200)
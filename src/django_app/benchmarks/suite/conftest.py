@@ -0,0 +1,44 @@
+import functools
+import os
+from typing import List, Tuple
+
+from core.category.domain import Category
+from core.category.infra import CategoryDataset, CategoryDatasetConfig, CategoryInMemoryRepository
+
+# BENCHMARK_SIZES=1000,100000 skips the slow 1M datasets
+SIZES: Tuple[int, ...] = tuple(
+    int(size) for size in os.environ.get('BENCHMARK_SIZES', '1000,100000,1000000').split(',')
+)
+
+# datasets this large get a fixed number of rounds instead of pytest-benchmark's
+# calibration, which would run a 1M item search for minutes
+LARGE = 100000
+
+# a word found in about 1% of the generated names, so filtered searches
+# still have matches to sort and page
+FILTER = CategoryDataset(CategoryDatasetConfig(size=0)).words[20]
+
+
+def size_id(size: int) -> str:
+    return f'{size // 1000000}M' if size >= 1000000 else f'{size // 1000}k'
+
+
+@functools.lru_cache(maxsize=None)
+def make_categories(size: int) -> Tuple[Category, ...]:
+    return tuple(CategoryDataset(CategoryDatasetConfig(size=size)).entities())
+
+
+def make_repository(size: int) -> CategoryInMemoryRepository:
+    repository = CategoryInMemoryRepository()
+    repository.bulk_insert(list(make_categories(size)))
+    return repository
+
+
+def run(benchmark, function, size: int, *args):
+    if size >= LARGE:
+        return benchmark.pedantic(function, args=args, rounds=3, warmup_rounds=1)
+    return benchmark(function, *args)
+
+
+def ids(items: List[Category]) -> List[str]:
+    return [item.id for item in items]
@@ -1,21 +1,40 @@
-from dataclasses import asdict, dataclass, field
-from typing import Callable
+from dataclasses import dataclass, field, fields
+import re
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+import orjson
+from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework.views import APIView
+from rest_framework.viewsets import ViewSetMixin
 from rest_framework.response import Response
 from rest_framework.request import Request
+from rest_framework.exceptions import ParseError, UnsupportedMediaType, ValidationError
 from rest_framework import status
 from core.category.application.use_cases import (
+    CreateCategoriesBatchUseCase,
     DeleteCategoryUseCase,
+    ExportCategoriesUseCase,
+    GetCategoriesByIdsUseCase,
     GetCategoryUseCase,
     ListCategoriesUseCase,
     CreateCategoryUseCase,
+    SuggestCategoriesUseCase,
     UpdateCategoryUseCase
 )
+from core.__seedwork.application.dto import BatchItemError, ResourceVersion
+from core.category.application.dto import CategoryOutput
+from core.category.domain.filters import category_filter
 from core.__seedwork.domain.exceptions import ValidationException
+from django_app.renderers import CSVRenderer, NDJSONRenderer
+
+# filter[field]=value or filter[field][operator]=value
+FILTER_PARAM = re.compile(r'filter\[(\w+)\](?:\[(\w+)\])?')
 
 
 @dataclass(slots=True)
-class CategoryResource(APIView):
+class CategoryResource(ViewSetMixin, APIView):
 
     # list_use_case: ListCategoriesUseCase = field(
     #     default_factory=container.use_case_category_list_categories
@@ -42,6 +61,16 @@ class CategoryResource(APIView):
     create_use_case: Callable[[], CreateCategoryUseCase]
     update_use_case: Callable[[], UpdateCategoryUseCase]
     delete_use_case: Callable[[], DeleteCategoryUseCase]
+    create_batch_use_case: Callable[[], CreateCategoriesBatchUseCase]
+    get_by_ids_use_case: Callable[[], GetCategoriesByIdsUseCase]
+    export_use_case: Callable[[], ExportCategoriesUseCase]
+    suggest_use_case: Callable[[], SuggestCategoriesUseCase]
+
+    export_renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    import_media_types = ('application/x-ndjson', 'application/jsonl')
+    import_chunk_size = 500
+    import_max_line_size = 64 * 1024
 
     # list_use_case: ListCategoriesUseCase = None
     # get_use_case: GetCategoryUseCase = None
@@ -50,27 +79,260 @@ class CategoryResource(APIView):
     # delete_use_case: DeleteCategoryUseCase = None
 
     def get(self, request: Request):
-        input = ListCategoriesUseCase.Input(**request.query_params.dict())
-        output = self.list_use_case().execute(input)
+        if 'ids' in request.query_params:
+            return self.get_by_ids(request)
+        params = {key: value for key, value in request.query_params.items()
+                  if not FILTER_PARAM.fullmatch(key)}
+        if 'fields' in params:
+            params['fields'] = self.__parse_list(
+                request.query_params.getlist('fields'))
+        conditions = self.__parse_filter(request.query_params)
+        if conditions:
+            try:
+                params['filter'] = category_filter(conditions, search=params.get('filter'))
+            except ValidationException as exception:
+                raise ValidationError(exception.error) from exception
+        input = ListCategoriesUseCase.Input(**params)
+        list_use_case = self.list_use_case()
+        version = list_use_case.version(input)
+        not_modified = self.__not_modified(request, version)
+        if not_modified is not None:
+            return not_modified
+        output = list_use_case.execute(input)
         print(output)
-        return Response(asdict(output))
+        return self.__with_validators(Response(output), version)
+
+    def get_by_ids(self, request: Request):
+        input = GetCategoriesByIdsUseCase.Input(
+            ids=self.__parse_list(request.query_params.getlist('ids')))
+        output = self.get_by_ids_use_case().execute(input)
+        return Response(output)
+
+    def suggest(self, request: Request):
+        limit = request.query_params.get('limit')
+        try:
+            input = SuggestCategoriesUseCase.Input(
+                prefix=request.query_params.get('prefix', ''),
+                **({'limit': int(limit)} if limit else {}))
+        except ValueError as exception:
+            raise ValidationError({'limit': ['A valid integer is required.']}) from exception
+        output = self.suggest_use_case().execute(input)
+        return Response(output)
 
-    def get_object(self, pk):
+    def export(self, request: Request):
+        output = self.export_use_case().execute(ExportCategoriesUseCase.Input())
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.render_stream(
+                output.chunks, [f.name for f in fields(CategoryOutput)]),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+            if renderer.charset else renderer.media_type
+        )
+        response['Content-Disposition'] = \
+            f'attachment; filename="categories.{renderer.format}"'
+        # ask reverse proxies not to buffer the body
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def get_renderers(self):
+        if getattr(self, 'action', None) == 'export':
+            return [renderer() for renderer in self.export_renderer_classes]
+        return APIView.get_renderers(self)
+
+    def get_object(self, request: Request, pk):
         input = GetCategoryUseCase.Input(id=pk)
-        output = self.get_use_case().execute(input)
-        return Response(asdict(output))
+        get_use_case = self.get_use_case()
+        version = get_use_case.version(input)
+        not_modified = self.__not_modified(request, version)
+        if not_modified is not None:
+            return not_modified
+        output = get_use_case.execute(input)
+        return self.__with_validators(Response(output), version)
 
     def post(self, request: Request):
         input = CreateCategoryUseCase.Input(**request.data)
         output = self.create_use_case().execute(input)
-        return Response(asdict(output), status=status.HTTP_201_CREATED)
+        return Response(output, status=status.HTTP_201_CREATED)
+
+    def post_batch(self, request: Request):
+        if not isinstance(request.data, list):
+            raise ParseError('Expected a list of categories.')
+        items: List[CreateCategoryUseCase.Input] = []
+        indexes: List[int] = []
+        malformed: List[BatchItemError] = []
+        for index, item in enumerate(request.data):
+            try:
+                items.append(self.__to_create_input(item))
+            except ParseError as exception:
+                malformed.append(BatchItemError(
+                    index=index, errors={'item': [str(exception.detail)]}))
+                continue
+            indexes.append(index)
+        output = self.create_batch_use_case().execute(
+            CreateCategoriesBatchUseCase.Input(items=items))
+        if malformed:
+            # the use case numbers errors within the items it was given
+            errors = malformed + [
+                BatchItemError(index=indexes[error.index], errors=error.errors)
+                for error in output.errors
+            ]
+            output = CreateCategoriesBatchUseCase.Output(
+                items=output.items, errors=sorted(errors, key=lambda error: error.index))
+        return Response(output, status=self.__batch_status(output))
+
+    def post_import(self, request: Request):
+        media_type = request.content_type.split(';')[0].strip()
+        if media_type and media_type not in self.import_media_types:
+            raise UnsupportedMediaType(request.content_type)
+        # read the body straight from the stream; request.data would
+        # buffer and parse it whole
+        lines = self.__iter_lines(request.stream, self.import_max_line_size)
+        return StreamingHttpResponse(
+            self.__import(lines, self.create_batch_use_case()),
+            content_type=NDJSONRenderer.media_type
+        )
 
     def put(self, request: Request, pk):
         input = UpdateCategoryUseCase.Input(**{'id': pk, **request.data})
         output = self.update_use_case().execute(input)
-        return Response(asdict(output))
+        return Response(output)
 
-    def delete(self, pk):
+    def delete(self, request: Request, pk):
         input = DeleteCategoryUseCase.Input(id=pk)
         self.delete_use_case().execute(input)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def __not_modified(request: Request, version: Optional[ResourceVersion]) -> Optional[HttpResponseBase]:
+        if version is None:
+            return None
+        response = get_conditional_response(
+            request,
+            etag=quote_etag(version.etag),
+            last_modified=int(version.last_modified.timestamp())
+        )
+        if response is None:
+            return None
+        return CategoryResource.__with_validators(response, version)
+
+    @staticmethod
+    def __with_validators(response: HttpResponseBase, version: Optional[ResourceVersion]) -> HttpResponseBase:
+        if version is not None:
+            response['ETag'] = quote_etag(version.etag)
+            response['Last-Modified'] = http_date(
+                version.last_modified.timestamp())
+        return response
+
+    def __import(
+        self,
+        lines: Iterator[Tuple[int, Optional[bytes]]],
+        create_batch_use_case: CreateCategoriesBatchUseCase
+    ) -> Iterator[bytes]:
+        renderer = NDJSONRenderer()
+        created = failed = 0
+        items: List[CreateCategoryUseCase.Input] = []
+        line_numbers: List[int] = []
+
+        def flush() -> bytes:
+            nonlocal created, failed, items, line_numbers
+            output = create_batch_use_case.execute(
+                CreateCategoriesBatchUseCase.Input(items=items))
+            created += len(output.items)
+            failed += len(output.errors)
+            report = renderer.render([
+                {'line': line_numbers[error.index], 'errors': error.errors}
+                for error in output.errors
+            ])
+            items, line_numbers = [], []
+            return report
+
+        for line_number, line in lines:
+            if line is None:
+                failed += 1
+                yield renderer.render({'line': line_number, 'errors': {
+                    'line': [f'Line exceeds {self.import_max_line_size} bytes.']}})
+                continue
+            if not line.strip():
+                continue
+            try:
+                items.append(self.__parse_import_line(line))
+            except ParseError as exception:
+                failed += 1
+                yield renderer.render({'line': line_number, 'errors': {
+                    'line': [str(exception.detail)]}})
+                continue
+            line_numbers.append(line_number)
+            if len(items) >= self.import_chunk_size:
+                yield flush()
+        if items:
+            yield flush()
+        yield renderer.render({'created': created, 'failed': failed})
+
+    @staticmethod
+    def __parse_import_line(line: bytes) -> CreateCategoryUseCase.Input:
+        try:
+            item: Dict[str, Any] = orjson.loads(line)
+        except orjson.JSONDecodeError as exception:
+            raise ParseError('Invalid JSON.') from exception
+        return CategoryResource.__to_create_input(item)
+
+    @staticmethod
+    def __to_create_input(item: Any) -> CreateCategoryUseCase.Input:
+        if not isinstance(item, dict):
+            raise ParseError('Expected an object with the category fields.')
+        try:
+            return CreateCategoryUseCase.Input(**item)
+        except TypeError as exception:
+            raise ParseError(
+                'Expected an object with the category fields.') from exception
+
+    @staticmethod
+    def __iter_lines(stream: Optional[BinaryIO], max_line_size: int) -> Iterator[Tuple[int, Optional[bytes]]]:
+        """Yields (line number, line); None for lines over max_line_size,
+        whose remainder is read and dropped without being kept."""
+        if stream is None:
+            return
+        line_number = 0
+        while True:
+            line = stream.readline(max_line_size + 1)
+            if not line:
+                return
+            line_number += 1
+            if len(line) > max_line_size and not line.endswith(b'\n'):
+                while line and not line.endswith(b'\n'):
+                    line = stream.readline(max_line_size)
+                yield line_number, None
+                continue
+            yield line_number, line
+
+    @staticmethod
+    def __parse_filter(query_params: Mapping[str, str]) -> Dict[str, Dict[str, str]]:
+        conditions: Dict[str, Dict[str, str]] = {}
+        malformed: Dict[str, List[str]] = {}
+        for key, value in query_params.items():
+            match = FILTER_PARAM.fullmatch(key)
+            if match:
+                name, operator = match.groups()
+                conditions.setdefault(name, {})[operator or 'eq'] = value
+            elif key.startswith('filter['):
+                malformed[key] = ['Use filter[field] or filter[field][operator].']
+        if malformed:
+            raise ValidationError(malformed)
+        return conditions
+
+    @staticmethod
+    def __parse_list(values: List[str]) -> List[str]:
+        return [
+            item.strip()
+            for value in values
+            for item in value.split(',')
+            if item.strip()
+        ]
+
+    @staticmethod
+    def __batch_status(output: CreateCategoriesBatchUseCase.Output) -> int:
+        if not output.errors:
+            return status.HTTP_201_CREATED
+        if not output.items:
+            return status.HTTP_400_BAD_REQUEST
+        return status.HTTP_207_MULTI_STATUS
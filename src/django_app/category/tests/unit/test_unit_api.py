@@ -1,16 +1,25 @@
 
-from datetime import datetime
+from dataclasses import asdict
+from datetime import datetime, timezone
 import unittest
 from unittest import mock
+from core.__seedwork.application.dto import BatchItemError, ResourceVersion
+from core.__seedwork.domain.specifications import AndSpecification, Contains, Equals, Range
 from core.category.application import (
     CategoryOutput,
     ListCategoriesUseCase,
     GetCategoryUseCase,
+    GetCategoriesByIdsUseCase,
     CreateCategoryUseCase,
+    CreateCategoriesBatchUseCase,
     UpdateCategoryUseCase,
-    DeleteCategoryUseCase
+    DeleteCategoryUseCase,
+    ExportCategoriesUseCase,
+    SuggestCategoriesUseCase
 )
 from category.api import CategoryResource
+from django_app.renderers import CSVRenderer, NDJSONRenderer
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
 from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 #from django_app import container
@@ -43,6 +52,7 @@ class TestCategoryResourceUnit(unittest.TestCase):
             per_page=2,
             last_page=1
         )
+        list_use_case.version.return_value = self.__version()
         mock_execute_method: mock.MagicMock = list_use_case.execute
         resource = CategoryResource(
             **{
@@ -62,7 +72,10 @@ class TestCategoryResourceUnit(unittest.TestCase):
             filter='test'
         ))
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, {
+        self.assertEqual(response['ETag'], '"fake-etag"')
+        self.assertEqual(response['Last-Modified'],
+                         'Sun, 22 May 2022 10:30:15 GMT')
+        self.assertEqual(asdict(response.data), {
             'items': [
                 {'id': '5490020a-e866-4229-9adc-aa44b83234c4',
                  'name': 'Movie',
@@ -78,6 +91,170 @@ class TestCategoryResourceUnit(unittest.TestCase):
             'per_page': 2
         })
 
+    def test_get_method_using_fields(self):
+        list_use_case = mock.Mock(ListCategoriesUseCase)
+        list_use_case.version.return_value = self.__version()
+        list_use_case.execute.return_value = ListCategoriesUseCase.Output(
+            items=[{'id': '5490020a-e866-4229-9adc-aa44b83234c4', 'name': 'Movie'}],
+            total=1,
+            current_page=1,
+            per_page=15,
+            last_page=1
+        )
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'list_use_case': lambda: list_use_case,
+            }
+        )
+        request = Request(APIRequestFactory().get(
+            '/?fields=id,name&fields=description'))
+        response = resource.get(request)
+        list_use_case.execute.assert_called_with(ListCategoriesUseCase.Input(
+            fields=['id', 'name', 'description']
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, list_use_case.execute.return_value)
+
+    def test_get_method_using_structured_filter(self):
+        list_use_case = mock.Mock(ListCategoriesUseCase)
+        list_use_case.version.return_value = self.__version()
+        list_use_case.execute.return_value = ListCategoriesUseCase.Output(
+            items=[], total=0, current_page=1, per_page=15, last_page=0)
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'list_use_case': lambda: list_use_case,
+            }
+        )
+        request = Request(APIRequestFactory().get(
+            '/?filter=mov&filter[is_active]=true'
+            '&filter[created_at][gte]=2021-01-01&filter[created_at][lte]=2021-12-31'))
+        response = resource.get(request)
+        list_use_case.execute.assert_called_with(ListCategoriesUseCase.Input(
+            filter=AndSpecification((
+                Contains('name', 'mov'),
+                Equals('is_active', True),
+                Range('created_at', gte=datetime(2021, 1, 1), lte=datetime(2021, 12, 31)),
+            ))
+        ))
+        self.assertEqual(response.status_code, 200)
+
+        request = Request(APIRequestFactory().get(
+            '/?filter[is_active]=maybe&filter[color]=red'))
+        with self.assertRaises(ValidationError) as assert_error:
+            resource.get(request)
+        self.assertEqual(set(assert_error.exception.detail),
+                         {'filter[is_active]', 'filter[color]'})
+
+        request = Request(APIRequestFactory().get(
+            '/?filter[]=x&filter[name][]=x&filter[name][eq][x]=1&filter[name]=ok'))
+        with self.assertRaises(ValidationError) as assert_error:
+            resource.get(request)
+        self.assertEqual(set(assert_error.exception.detail),
+                         {'filter[]', 'filter[name][]', 'filter[name][eq][x]'})
+
+    def test_get_method_when_not_modified(self):
+        list_use_case = mock.Mock(ListCategoriesUseCase)
+        list_use_case.version.return_value = self.__version()
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'list_use_case': lambda: list_use_case,
+            }
+        )
+        arrange = [
+            {'HTTP_IF_NONE_MATCH': '"fake-etag"'},
+            {'HTTP_IF_NONE_MATCH': 'W/"other", "fake-etag"'},
+            {'HTTP_IF_MODIFIED_SINCE': 'Sun, 22 May 2022 10:30:15 GMT'},
+            {'HTTP_IF_MODIFIED_SINCE': 'Mon, 23 May 2022 00:00:00 GMT'},
+        ]
+        for headers in arrange:
+            request = Request(APIRequestFactory().get('/?page=1', **headers))
+            response = resource.get(request)
+            self.assertEqual(response.status_code, 304, headers)
+            self.assertEqual(response['ETag'], '"fake-etag"')
+            list_use_case.version.assert_called_with(
+                ListCategoriesUseCase.Input(page='1'))
+        list_use_case.execute.assert_not_called()
+
+        arrange = [
+            {'HTTP_IF_NONE_MATCH': '"other"'},
+            {'HTTP_IF_NONE_MATCH': '"other"',
+             'HTTP_IF_MODIFIED_SINCE': 'Mon, 23 May 2022 00:00:00 GMT'},
+            {'HTTP_IF_MODIFIED_SINCE': 'Sat, 21 May 2022 00:00:00 GMT'},
+        ]
+        for headers in arrange:
+            request = Request(APIRequestFactory().get('/', **headers))
+            response = resource.get(request)
+            self.assertEqual(response.status_code, 200, headers)
+        self.assertEqual(list_use_case.execute.call_count, 3)
+
+    def test_suggest_method(self):
+        suggest_use_case = mock.Mock(SuggestCategoriesUseCase)
+        suggest_use_case.execute.return_value = SuggestCategoriesUseCase.Output(items=[])
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'suggest_use_case': lambda: suggest_use_case,
+            }
+        )
+        response = resource.suggest(Request(APIRequestFactory().get('/?prefix=mo&limit=5')))
+        suggest_use_case.execute.assert_called_with(
+            SuggestCategoriesUseCase.Input(prefix='mo', limit=5))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(asdict(response.data), {'items': []})
+
+        resource.suggest(Request(APIRequestFactory().get('/')))
+        suggest_use_case.execute.assert_called_with(SuggestCategoriesUseCase.Input(prefix=''))
+
+        with self.assertRaises(ValidationError) as assert_error:
+            resource.suggest(Request(APIRequestFactory().get('/?prefix=mo&limit=ten')))
+        self.assertEqual(set(assert_error.exception.detail), {'limit'})
+
+    def test_get_method_using_ids(self):
+        get_by_ids_use_case = mock.Mock(GetCategoriesByIdsUseCase)
+
+        created_at = datetime.now()
+        get_by_ids_use_case.execute.return_value = GetCategoriesByIdsUseCase.Output(
+            items=[
+                CategoryOutput(
+                    id='5490020a-e866-4229-9adc-aa44b83234c4',
+                    name='Movie',
+                    description=None,
+                    is_active=True,
+                    created_at=created_at
+                )
+            ],
+            not_found=['fake id']
+        )
+        mock_execute_method: mock.MagicMock = get_by_ids_use_case.execute
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'get_by_ids_use_case': lambda: get_by_ids_use_case,
+            }
+        )
+        request = APIRequestFactory().get(
+            '/?ids=5490020a-e866-4229-9adc-aa44b83234c4,fake id&ids=other id')
+        request = Request(request)
+        response = resource.get(request)
+        mock_execute_method.assert_called_with(GetCategoriesByIdsUseCase.Input(
+            ids=['5490020a-e866-4229-9adc-aa44b83234c4', 'fake id', 'other id']
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(asdict(response.data), {
+            'items': [
+                {'id': '5490020a-e866-4229-9adc-aa44b83234c4',
+                 'name': 'Movie',
+                 'description': None,
+                 'is_active': True,
+                 'created_at': created_at
+                 }
+            ],
+            'not_found': ['fake id']
+        })
+
     def test_get_object_method(self):
         get_use_case = mock.Mock(GetCategoryUseCase)
 
@@ -88,6 +265,7 @@ class TestCategoryResourceUnit(unittest.TestCase):
             is_active=True,
             created_at=datetime.now()
         )
+        get_use_case.version.return_value = self.__version()
         mock_execute_method: mock.MagicMock = get_use_case.execute
         resource = CategoryResource(
             **{
@@ -95,12 +273,15 @@ class TestCategoryResourceUnit(unittest.TestCase):
                 'get_use_case': lambda: get_use_case,
             }
         )
-        response = resource.get_object('5490020a-e866-4229-9adc-aa44b83234c4')
+        request = Request(APIRequestFactory().get('/'))
+        response = resource.get_object(
+            request, '5490020a-e866-4229-9adc-aa44b83234c4')
         mock_execute_method.assert_called_with(GetCategoryUseCase.Input(
             id='5490020a-e866-4229-9adc-aa44b83234c4'
         ))
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, {
+        self.assertEqual(response['ETag'], '"fake-etag"')
+        self.assertEqual(asdict(response.data), {
             'id': '5490020a-e866-4229-9adc-aa44b83234c4',
             'name': 'Movie',
             'description':
@@ -109,6 +290,38 @@ class TestCategoryResourceUnit(unittest.TestCase):
             'created_at': get_use_case.execute.return_value.created_at
         })
 
+    def test_get_object_method_when_not_modified(self):
+        get_use_case = mock.Mock(GetCategoryUseCase)
+        get_use_case.version.return_value = self.__version()
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'get_use_case': lambda: get_use_case,
+            }
+        )
+        request = Request(APIRequestFactory().get(
+            '/', HTTP_IF_NONE_MATCH='"fake-etag"'))
+        response = resource.get_object(
+            request, '5490020a-e866-4229-9adc-aa44b83234c4')
+        self.assertEqual(response.status_code, 304)
+        get_use_case.execute.assert_not_called()
+
+    def test_get_object_method_without_version(self):
+        get_use_case = mock.Mock(GetCategoryUseCase)
+        get_use_case.version.return_value = None
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'get_use_case': lambda: get_use_case,
+            }
+        )
+        request = Request(APIRequestFactory().get(
+            '/', HTTP_IF_NONE_MATCH='*'))
+        response = resource.get_object(request, 'fake id')
+        get_use_case.execute.assert_called_once()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
     def test_post_method(self):
         create_use_case = mock.Mock(CreateCategoryUseCase)
 
@@ -135,7 +348,7 @@ class TestCategoryResourceUnit(unittest.TestCase):
             name='Movie'
         ))
         self.assertEqual(response.status_code, 201)
-        self.assertEqual(response.data, {
+        self.assertEqual(asdict(response.data), {
             'id': '5490020a-e866-4229-9adc-aa44b83234c4',
             'name': 'Movie',
             'description': None,
@@ -143,6 +356,216 @@ class TestCategoryResourceUnit(unittest.TestCase):
             'created_at': create_use_case.execute.return_value.created_at
         })
 
+    def test_post_batch_method(self):
+        create_batch_use_case = mock.Mock(CreateCategoriesBatchUseCase)
+
+        created_at = datetime.now()
+        category_output = CategoryOutput(
+            id='5490020a-e866-4229-9adc-aa44b83234c4',
+            name='Movie',
+            description=None,
+            is_active=True,
+            created_at=created_at
+        )
+        arrange = [
+            {
+                'output': CreateCategoriesBatchUseCase.Output(
+                    items=[category_output], errors=[]),
+                'status_code': 201
+            },
+            {
+                'output': CreateCategoriesBatchUseCase.Output(
+                    items=[category_output],
+                    errors=[BatchItemError(
+                        index=1, errors={'name': ['This field may not be blank.']})]
+                ),
+                'status_code': 207
+            },
+            {
+                'output': CreateCategoriesBatchUseCase.Output(
+                    items=[],
+                    errors=[BatchItemError(
+                        index=0, errors={'name': ['This field may not be blank.']})]
+                ),
+                'status_code': 400
+            },
+        ]
+        mock_execute_method: mock.MagicMock = create_batch_use_case.execute
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'create_batch_use_case': lambda: create_batch_use_case,
+            }
+        )
+        send_data = [{'name': 'Movie'}, {'name': ''}]
+        for i in arrange:
+            create_batch_use_case.execute.return_value = i['output']
+            request = APIRequestFactory().post('/batch', send_data, format='json')
+            request = Request(request)
+            request._full_data = send_data
+            response = resource.post_batch(request)
+            mock_execute_method.assert_called_with(CreateCategoriesBatchUseCase.Input(
+                items=[
+                    CreateCategoryUseCase.Input(name='Movie'),
+                    CreateCategoryUseCase.Input(name=''),
+                ]
+            ))
+            self.assertEqual(response.status_code, i['status_code'])
+            self.assertEqual(response.data, i['output'])
+
+    def test_post_batch_method_with_malformed_items(self):
+        create_batch_use_case = mock.Mock(CreateCategoriesBatchUseCase)
+        category_output = CategoryOutput(
+            id='5490020a-e866-4229-9adc-aa44b83234c4',
+            name='Movie',
+            description=None,
+            is_active=True,
+            created_at=datetime.now()
+        )
+        create_batch_use_case.execute.return_value = CreateCategoriesBatchUseCase.Output(
+            items=[category_output],
+            errors=[BatchItemError(
+                index=1, errors={'name': ['This field may not be blank.']})]
+        )
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'create_batch_use_case': lambda: create_batch_use_case,
+            }
+        )
+        send_data = [['Movie'], {'name': 'Movie'}, {'fake': 'field'}, {'name': ''}]
+        request = Request(APIRequestFactory().post('/batch', send_data, format='json'))
+        request._full_data = send_data
+        response = resource.post_batch(request)
+        create_batch_use_case.execute.assert_called_with(CreateCategoriesBatchUseCase.Input(
+            items=[
+                CreateCategoryUseCase.Input(name='Movie'),
+                CreateCategoryUseCase.Input(name=''),
+            ]
+        ))
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data, CreateCategoriesBatchUseCase.Output(
+            items=[category_output],
+            errors=[
+                BatchItemError(index=0, errors={
+                    'item': ['Expected an object with the category fields.']}),
+                BatchItemError(index=2, errors={
+                    'item': ['Expected an object with the category fields.']}),
+                BatchItemError(index=3, errors={
+                    'name': ['This field may not be blank.']}),
+            ]
+        ))
+
+    def test_post_import_method(self):
+        create_batch_use_case = mock.Mock(CreateCategoriesBatchUseCase)
+        category_output = CategoryOutput(
+            id='5490020a-e866-4229-9adc-aa44b83234c4',
+            name='Movie',
+            description=None,
+            is_active=True,
+            created_at=datetime.now()
+        )
+        create_batch_use_case.execute.side_effect = [
+            CreateCategoriesBatchUseCase.Output(
+                items=[category_output],
+                errors=[BatchItemError(
+                    index=1, errors={'name': ['This field may not be blank.']})]
+            ),
+            CreateCategoriesBatchUseCase.Output(
+                items=[category_output], errors=[]),
+        ]
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'create_batch_use_case': lambda: create_batch_use_case,
+            }
+        )
+        resource.import_chunk_size = 2
+        resource.import_max_line_size = 48
+        body = b'\n'.join([
+            b'{"name": "Movie"}',
+            b'',
+            b'{"name": ""}',
+            b'not json',
+            b'{"fake": "field"}',
+            b'{"name": "' + b'x' * 40 + b'"}',
+            b'{"name": "Documentary", "is_active": false}',
+        ])
+        request = Request(APIRequestFactory().post(
+            '/import', body, content_type='application/x-ndjson'))
+        response = resource.post_import(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(b''.join(response.streaming_content).splitlines(), [
+            b'{"line":3,"errors":{"name":["This field may not be blank."]}}',
+            b'{"line":4,"errors":{"line":["Invalid JSON."]}}',
+            b'{"line":5,"errors":{"line":["Expected an object with the category fields."]}}',
+            b'{"line":6,"errors":{"line":["Line exceeds 48 bytes."]}}',
+            b'{"created":2,"failed":4}',
+        ])
+        self.assertEqual(create_batch_use_case.execute.call_args_list, [
+            mock.call(CreateCategoriesBatchUseCase.Input(items=[
+                CreateCategoryUseCase.Input(name='Movie'),
+                CreateCategoryUseCase.Input(name=''),
+            ])),
+            mock.call(CreateCategoriesBatchUseCase.Input(items=[
+                CreateCategoryUseCase.Input(name='Documentary', is_active=False),
+            ])),
+        ])
+
+    def test_post_import_method_with_unsupported_media_type(self):
+        resource = CategoryResource(**self.__init_all_none())
+        request = Request(APIRequestFactory().post(
+            '/import', b'[]', content_type='application/json'))
+        with self.assertRaises(UnsupportedMediaType):
+            resource.post_import(request)
+
+    def test_export_method(self):
+        export_use_case = mock.Mock(ExportCategoriesUseCase)
+        created_at = datetime(2022, 5, 22, 10, 30, 15)
+        category_output = CategoryOutput(
+            id='5490020a-e866-4229-9adc-aa44b83234c4',
+            name='Movie',
+            description=None,
+            is_active=True,
+            created_at=created_at
+        )
+        resource = CategoryResource(
+            **{
+                **self.__init_all_none(),
+                'export_use_case': lambda: export_use_case,
+            }
+        )
+        arrange = [
+            {
+                'renderer': NDJSONRenderer(),
+                'content_type': 'application/x-ndjson',
+                'content': b'{"id":"5490020a-e866-4229-9adc-aa44b83234c4","name":"Movie",'
+                b'"description":null,"is_active":true,"created_at":"2022-05-22T10:30:15"}\n' * 2
+            },
+            {
+                'renderer': CSVRenderer(),
+                'content_type': 'text/csv; charset=utf-8',
+                'content': b'id,name,description,is_active,created_at\r\n' +
+                b'5490020a-e866-4229-9adc-aa44b83234c4,Movie,,True,2022-05-22T10:30:15\r\n' * 2
+            },
+        ]
+        for i in arrange:
+            export_use_case.execute.return_value = ExportCategoriesUseCase.Output(
+                chunks=iter([[category_output], [category_output]]))
+            request = Request(APIRequestFactory().get('/export'))
+            request.accepted_renderer = i['renderer']
+            response = resource.export(request)
+            export_use_case.execute.assert_called_with(
+                ExportCategoriesUseCase.Input())
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            self.assertEqual(response['Content-Type'], i['content_type'])
+            self.assertEqual(response['Content-Disposition'],
+                             f'attachment; filename="categories.{i["renderer"].format}"')
+            self.assertEqual(b''.join(response.streaming_content), i['content'])
+
     def test_put_method(self):
         update_use_case = mock.Mock(UpdateCategoryUseCase)
 
@@ -171,7 +594,7 @@ class TestCategoryResourceUnit(unittest.TestCase):
             name='Movie'
         ))
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, {
+        self.assertEqual(asdict(response.data), {
             'id': '5490020a-e866-4229-9adc-aa44b83234c4',
             'name': 'Movie',
             'description': None,
@@ -191,12 +614,20 @@ class TestCategoryResourceUnit(unittest.TestCase):
         )
         request = APIRequestFactory().delete('/')
         request = Request(request)
-        response = resource.delete('5490020a-e866-4229-9adc-aa44b83234c4')
+        response = resource.delete(
+            request, '5490020a-e866-4229-9adc-aa44b83234c4')
         mock_execute_method.assert_called_with(DeleteCategoryUseCase.Input(
             id='5490020a-e866-4229-9adc-aa44b83234c4',
         ))
         self.assertEqual(response.status_code, 204)
 
+    def __version(self):
+        return ResourceVersion(
+            etag='fake-etag',
+            last_modified=datetime(2022, 5, 22, 10, 30, 15,
+                                   123456, tzinfo=timezone.utc)
+        )
+
     def __init_all_none(self):
         return {
             'list_use_case': None,
@@ -204,4 +635,8 @@ class TestCategoryResourceUnit(unittest.TestCase):
             'create_use_case': None,
             'update_use_case': None,
             'delete_use_case': None,
+            'create_batch_use_case': None,
+            'get_by_ids_use_case': None,
+            'export_use_case': None,
+            'suggest_use_case': None,
         }
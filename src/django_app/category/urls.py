@@ -2,6 +2,18 @@ from django.urls import path
 from .api import CategoryResource
 from django_app import container
 
+use_cases = {
+    'list_use_case': container.use_case_category_list_categories,
+    'get_use_case': container.use_case_category_get_category,
+    'create_use_case': container.use_case_category_create_category,
+    'update_use_case': container.use_case_category_update_category,
+    'delete_use_case': container.use_case_category_delete_category,
+    'create_batch_use_case': container.use_case_category_create_categories_batch,
+    'get_by_ids_use_case': container.use_case_category_get_categories_by_ids,
+    'export_use_case': container.use_case_category_export_categories,
+    'suggest_use_case': container.use_case_category_suggest_categories,
+}
+
 urlpatterns = [
     # path('categories/',
     #      CategoryResource.as_view(
@@ -14,10 +26,27 @@ urlpatterns = [
     #      ),
     # path('categories/',CategoryResource.as_view()),
     path('categories/', CategoryResource.as_view(
-        list_use_case=container.use_case_category_list_categories,
-        get_use_case=container.use_case_category_get_category,
-        create_use_case=container.use_case_category_create_category,
-        update_use_case=container.use_case_category_update_category,
-        delete_use_case=container.use_case_category_delete_category,
+        {'get': 'get', 'post': 'post'},
+        **use_cases
+    )),
+    path('categories/batch', CategoryResource.as_view(
+        {'post': 'post_batch'},
+        **use_cases
+    )),
+    path('categories/import', CategoryResource.as_view(
+        {'post': 'post_import'},
+        **use_cases
+    )),
+    path('categories/export', CategoryResource.as_view(
+        {'get': 'export'},
+        **use_cases
+    )),
+    path('categories/suggest', CategoryResource.as_view(
+        {'get': 'suggest'},
+        **use_cases
+    )),
+    path('categories/<str:pk>', CategoryResource.as_view(
+        {'get': 'get_object', 'put': 'put', 'delete': 'delete'},
+        **use_cases
     )),
 ]
@@ -3,4 +3,13 @@
 from .container import Container
 
 
-container = Container()
\ No newline at end of file
+container = Container()
+container.config.repository.backend.from_env(
+    'CATEGORY_REPOSITORY_BACKEND', default='in_memory')
+container.config.repository.shared_memory_path.from_env(
+    'CATEGORY_REPOSITORY_PATH', default=None)
+container.config.repository.shards.from_env(
+    'CATEGORY_REPOSITORY_SHARDS', default='0', as_=int)
+container.config.repository.cache.from_env(
+    'CATEGORY_REPOSITORY_CACHE', default='false',
+    as_=lambda value: value.lower() in ('1', 'true', 'yes'))
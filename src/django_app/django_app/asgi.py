@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
+# lets WSGI-only middleware refuse to load (see AdmissionControlMiddleware)
+os.environ['DJANGO_APP_INTERFACE'] = 'asgi'
 
 application = get_asgi_application()
+
+# pylint: disable=wrong-import-position
+from django_app.warmup import start_warm_up  # noqa: E402
+
+start_warm_up()
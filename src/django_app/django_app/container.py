@@ -1,40 +1,204 @@
 from dependency_injector import containers, providers
-from core.category.infra import CategoryInMemoryRepository
+from core.__seedwork.application import InterceptorChain, UseCaseMetrics
+from core.__seedwork.infra import (
+    MetricsRegistry,
+    UnixSocketInvalidationBus,
+    cache_repository,
+    instrument_repository,
+    metrics_interceptors
+)
+from core.category.infra import (
+    CategoryInMemoryRepository,
+    CategoryShardedRepository,
+    CategorySharedMemoryRepository
+)
 from core.category.application import (
     ListCategoriesUseCase,
     CreateCategoryUseCase,
+    CreateCategoriesBatchUseCase,
     UpdateCategoryUseCase,
     GetCategoryUseCase,
-    DeleteCategoryUseCase
+    GetCategoriesByIdsUseCase,
+    SuggestCategoriesUseCase,
+    DeleteCategoryUseCase,
+    ExportCategoriesUseCase
 )
 
 
 class Container(containers.DeclarativeContainer):
 
+    config = providers.Configuration(default={
+        'use_case_interceptors': {
+            'call_count': False,
+            'timing': False,
+            'slow_call_threshold_ms': None,
+            'single_flight': True,
+        },
+        'metrics': {
+            'enabled': True,
+        },
+        'repository': {
+            # in_memory: one dataset per process
+            # shared_memory: one dataset for every worker of the host
+            # sharded: one dataset per process, searched by `shards`
+            # worker processes (0 for one per CPU)
+            'backend': 'in_memory',
+            'shared_memory_path': None,
+            'shards': 0,
+            # per-process cache of lookups by id; other workers are told
+            # about writes through a Unix socket invalidation bus
+            'cache': False,
+            'cache_max_entries': 10000,
+            # bounds how long an entry outlives an invalidation that was lost
+            'cache_max_age': 30.0,
+            'invalidation_directory': None,
+            # workers sharing a namespace invalidate each other; by default
+            # those running from the same environment and directory
+            'invalidation_namespace': None,
+        }
+    })
+
+    metrics_registry = providers.Singleton(MetricsRegistry)
+
+    use_case_metrics = providers.Singleton(UseCaseMetrics)
+
+    use_case_interceptor_chain = providers.Singleton(
+        InterceptorChain.from_config,
+        config=config.use_case_interceptors,
+        metrics=use_case_metrics,
+        extra=providers.Callable(
+            metrics_interceptors,
+            registry=metrics_registry,
+            enabled=config.metrics.enabled
+        )
+    )
+
     repository_category_in_memory = providers.Singleton(
-        CategoryInMemoryRepository)
+        instrument_repository,
+        providers.Singleton(CategoryInMemoryRepository),
+        registry=metrics_registry,
+        enabled=config.metrics.enabled
+    )
+
+    repository_category_shared_memory = providers.Singleton(
+        instrument_repository,
+        providers.Singleton(
+            CategorySharedMemoryRepository,
+            path=config.repository.shared_memory_path
+        ),
+        registry=metrics_registry,
+        enabled=config.metrics.enabled
+    )
+
+    repository_category_sharded = providers.Singleton(
+        instrument_repository,
+        providers.Singleton(
+            CategoryShardedRepository,
+            shards=config.repository.shards
+        ),
+        registry=metrics_registry,
+        enabled=config.metrics.enabled
+    )
+
+    repository_category = providers.Singleton(
+        cache_repository,
+        providers.Selector(
+            config.repository.backend,
+            in_memory=repository_category_in_memory,
+            shared_memory=repository_category_shared_memory,
+            sharded=repository_category_sharded
+        ),
+        # only opened when the cache is enabled
+        bus=providers.Singleton(
+            UnixSocketInvalidationBus,
+            directory=config.repository.invalidation_directory,
+            name='category-invalidation',
+            namespace=config.repository.invalidation_namespace
+        ).provider,
+        registry=metrics_registry,
+        name='category_repository',
+        enabled=config.repository.cache,
+        max_entries=config.repository.cache_max_entries,
+        max_age=config.repository.cache_max_age
+    )
 
     use_case_category_list_categories = providers.Singleton(
-        ListCategoriesUseCase,
-        category_repo=repository_category_in_memory
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            ListCategoriesUseCase,
+            category_repo=repository_category
+        )
     )
 
     use_case_category_get_category = providers.Singleton(
-        GetCategoryUseCase,
-        category_repo=repository_category_in_memory
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            GetCategoryUseCase,
+            category_repo=repository_category
+        )
     )
 
     use_case_category_create_category = providers.Singleton(
-        CreateCategoryUseCase,
-        category_repo=repository_category_in_memory
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            CreateCategoryUseCase,
+            category_repo=repository_category
+        )
+    )
+
+    use_case_category_create_categories_batch = providers.Singleton(
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            CreateCategoriesBatchUseCase,
+            category_repo=repository_category
+        )
+    )
+
+    use_case_category_get_categories_by_ids = providers.Singleton(
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            GetCategoriesByIdsUseCase,
+            category_repo=repository_category
+        )
+    )
+
+    use_case_category_suggest_categories = providers.Singleton(
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            SuggestCategoriesUseCase,
+            category_repo=repository_category
+        )
     )
 
     use_case_category_update_category = providers.Singleton(
-        UpdateCategoryUseCase,
-        category_repo=repository_category_in_memory
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            UpdateCategoryUseCase,
+            category_repo=repository_category
+        )
     )
 
     use_case_category_delete_category = providers.Singleton(
-        DeleteCategoryUseCase,
-        category_repo=repository_category_in_memory
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            DeleteCategoryUseCase,
+            category_repo=repository_category
+        )
+    )
+
+    use_case_category_export_categories = providers.Singleton(
+        InterceptorChain.wrap,
+        use_case_interceptor_chain,
+        providers.Factory(
+            ExportCategoriesUseCase,
+            category_repo=repository_category
+        )
     )
@@ -0,0 +1,246 @@
+from dataclasses import dataclass, field
+import logging
+import math
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Pattern, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse, JsonResponse
+
+from django_app import container
+
+logger = logging.getLogger('django_app.admission')
+
+# Set by asgi.py before the handler loads its middleware.
+INTERFACE_ENVIRONMENT_VARIABLE = 'DJANGO_APP_INTERFACE'
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionClass:
+    name: str
+    path: Pattern
+    limit: int
+    queue: int
+    timeout: float
+    methods: Tuple[str, ...] = ()
+    query_params: Tuple[str, ...] = ()
+
+    @staticmethod
+    def from_settings(options: Dict[str, Any]) -> 'AdmissionClass':
+        options = {key.lower(): value for key, value in options.items()}
+        return AdmissionClass(
+            name=options['name'],
+            path=re.compile(options['path']),
+            limit=options['limit'],
+            queue=options.get('queue', 0),
+            timeout=options.get('timeout', 1.0),
+            methods=tuple(method.upper()
+                          for method in options.get('methods', ())),
+            query_params=tuple(options.get('query_params', ()))
+        )
+
+    def matches(self, request: HttpRequest) -> bool:
+        if self.methods and request.method not in self.methods:
+            return False
+        if self.query_params and not any(
+                self.__present(request, name) for name in self.query_params):
+            return False
+        return self.path.match(request.path_info) is not None
+
+    @staticmethod
+    def __present(request: HttpRequest, name: str) -> bool:
+        # filter also stands for filter[name], filter[name][contains]...
+        prefix = f'{name}['
+        return any(value for key, value in request.GET.items()
+                   if key == name or key.startswith(prefix))
+
+
+class Rejected(Exception):
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True)
+class ConcurrencyLimiter:
+    """Admits up to `limit` concurrent requests and parks up to `queue` more.
+
+    Waiting requests give up at their deadline. A request is turned away
+    right away when the queue is full, or when the wait estimated from the
+    average service time would already exceed its deadline."""
+    limit: int
+    queue: int
+    active: int = 0
+    waiting: int = 0
+    avg_service_time: float = 0.0
+    _condition: threading.Condition = field(default_factory=threading.Condition)
+
+    SMOOTHING = 0.2
+
+    def acquire(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self.active < self.limit and not self.waiting:
+                self.active += 1
+                return
+            if self.waiting >= self.queue:
+                raise Rejected('queue_full', self.__retry_after())
+            if self.estimated_wait() > timeout:
+                raise Rejected('deadline', self.__retry_after())
+            self.waiting += 1
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Rejected('timeout', self.__retry_after())
+                    self._condition.wait(remaining)
+                self.active += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self, service_time: float) -> None:
+        with self._condition:
+            self.active -= 1
+            self.avg_service_time += self.SMOOTHING * \
+                (service_time - self.avg_service_time)
+            self._condition.notify()
+
+    def estimated_wait(self) -> float:
+        return (self.waiting + 1) * self.avg_service_time / self.limit
+
+    def __retry_after(self) -> int:
+        return max(1, math.ceil(self.estimated_wait()))
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionConfig:
+    enabled: bool = False
+    classes: Tuple[AdmissionClass, ...] = ()
+
+    @staticmethod
+    def from_settings() -> 'AdmissionConfig':
+        options = {
+            key.lower(): value
+            for key, value in getattr(settings, 'ADMISSION_CONTROL', {}).items()
+        }
+        return AdmissionConfig(
+            enabled=options.get('enabled', False),
+            classes=tuple(
+                AdmissionClass.from_settings(admission_class)
+                for admission_class in options.get('classes', ())
+            )
+        )
+
+
+class _ReleaseOnClose:
+
+    def __init__(self, iterator: Iterator[bytes], release: Callable[[], None]):
+        self.iterator = iterator
+        self.release = release
+        self.released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self.iterator)
+
+    def close(self) -> None:
+        if not self.released:
+            self.released = True
+            self.release()
+
+
+class AdmissionControlMiddleware:
+    """Caps concurrent requests per admission class and sheds the excess
+    with a fast 503 + Retry-After instead of letting every request slow
+    down. Requests matching no class are not limited.
+
+    WSGI only: queued requests block their worker thread until a slot
+    frees up. Under ASGI every sync middleware and view shares a single
+    thread, so the request holding the slot could never release it; the
+    middleware refuses to load there."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        self.config = AdmissionConfig.from_settings()
+        if not self.config.enabled:
+            raise MiddlewareNotUsed()
+        if os.environ.get(INTERFACE_ENVIRONMENT_VARIABLE) == 'asgi':
+            logger.warning(
+                'Admission control only supports WSGI and is disabled under ASGI')
+            raise MiddlewareNotUsed('Admission control only supports WSGI')
+        self.limiters: Dict[str, ConcurrencyLimiter] = {
+            admission_class.name: ConcurrencyLimiter(
+                admission_class.limit, admission_class.queue)
+            for admission_class in self.config.classes
+        }
+        registry = container.metrics_registry()
+        self.rejected = registry.counter(
+            'admission_rejected',
+            'Requests shed by admission control.',
+            ('admission_class', 'reason')
+        )
+        in_flight = registry.gauge(
+            'admission_in_flight',
+            'Requests running per admission class.',
+            ('admission_class',)
+        )
+        queued = registry.gauge(
+            'admission_queued',
+            'Requests waiting for a slot per admission class.',
+            ('admission_class',)
+        )
+        for name, limiter in self.limiters.items():
+            in_flight.set_function(lambda limiter=limiter: limiter.active, name)
+            queued.set_function(lambda limiter=limiter: limiter.waiting, name)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        admission_class = self.classify(request)
+        if admission_class is None:
+            return self.get_response(request)
+
+        limiter = self.limiters[admission_class.name]
+        try:
+            limiter.acquire(admission_class.timeout)
+        except Rejected as rejected:
+            self.rejected.labels(admission_class.name, rejected.reason).inc()
+            return self.overloaded(rejected)
+
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            limiter.release(time.perf_counter() - start)
+            raise
+
+        if response.streaming:
+            # the body is produced while it is sent, so keep the slot until
+            # the server closes the response
+            response.streaming_content = _ReleaseOnClose(
+                response.streaming_content,
+                lambda: limiter.release(time.perf_counter() - start)
+            )
+        else:
+            limiter.release(time.perf_counter() - start)
+        return response
+
+    def classify(self, request: HttpRequest) -> Optional[AdmissionClass]:
+        return next(
+            (admission_class for admission_class in self.config.classes
+             if admission_class.matches(request)),
+            None
+        )
+
+    @staticmethod
+    def overloaded(rejected: Rejected) -> HttpResponse:
+        response = JsonResponse(
+            {'detail': 'Server is overloaded, retry later.'}, status=503)
+        response['Retry-After'] = str(rejected.retry_after)
+        return response
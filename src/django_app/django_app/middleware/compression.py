@@ -0,0 +1,212 @@
+from abc import ABC
+import abc
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import zlib
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class Encoder(ABC):
+
+    @abc.abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compresses data and returns whatever output is ready."""
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def flush(self) -> bytes:
+        """Emits all pending output, so the client can decode it now."""
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def finish(self) -> bytes:
+        raise NotImplementedError()
+
+
+class GzipEncoder(Encoder):
+
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder(Encoder):
+
+    def __init__(self, quality: int):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdEncoder(Encoder):
+
+    def __init__(self, level: int):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+ENCODERS: Dict[str, Tuple[bool, Callable[['CompressionConfig'], Encoder]]] = {
+    'zstd': (zstandard is not None, lambda config: ZstdEncoder(config.zstd_level)),
+    'br': (brotli is not None, lambda config: BrotliEncoder(config.brotli_quality)),
+    'gzip': (True, lambda config: GzipEncoder(config.gzip_level)),
+}
+
+
+def available_encodings() -> List[str]:
+    return [name for name, (available, _) in ENCODERS.items() if available]
+
+
+def compress(encoder: Encoder, data: bytes) -> bytes:
+    return encoder.compress(data) + encoder.finish()
+
+
+def compress_stream(encoder: Encoder, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # flush after every chunk so streamed responses keep flowing instead
+    # of waiting for the compressor's window to fill up
+    for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+@dataclass(frozen=True, slots=True)
+class CompressionConfig:
+    enabled: bool = True
+    min_size: int = 1024
+    encodings: Tuple[str, ...] = ('zstd', 'br', 'gzip')
+    content_types: Tuple[str, ...] = (
+        'application/json',
+        'application/x-ndjson',
+        'text/',
+    )
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    zstd_level: int = 3
+
+    @staticmethod
+    def from_settings() -> 'CompressionConfig':
+        options = getattr(settings, 'COMPRESSION', {})
+        return CompressionConfig(**{
+            key.lower(): tuple(value) if isinstance(value, list) else value
+            for key, value in options.items()
+        })
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compresses compressible responses with the best encoding both sides
+    support; the server preference order comes from COMPRESSION['ENCODINGS']
+    and only encodings whose library is installed are offered."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        self.config = CompressionConfig.from_settings()
+        unknown = set(self.config.encodings) - set(ENCODERS)
+        if unknown:
+            raise ValueError(f'Unknown encodings {sorted(unknown)!r}')
+        self.encodings = [
+            name for name in self.config.encodings if ENCODERS[name][0]
+        ]
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if not self.config.enabled or not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.negotiate(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        encoder = ENCODERS[encoding][1](self.config)
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                encoder, response.streaming_content)
+            del response['Content-Length']
+        else:
+            content = compress(encoder, response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # the compressed body is a different representation, so the ETag
+        # becomes weak; If-None-Match still matches it (weak comparison)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response: HttpResponse) -> bool:
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if not content_type.startswith(self.config.content_types):
+            return False
+        return response.streaming or len(response.content) >= self.config.min_size
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get('*', 0.0)
+        best, best_quality = None, 0.0
+        for name in self.encodings:
+            quality = accepted.get(name, wildcard)
+            if quality > best_quality:
+                best, best_quality = name, quality
+        return best
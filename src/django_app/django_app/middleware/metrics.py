@@ -0,0 +1,35 @@
+import time
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+
+from django_app import container
+
+
+class MetricsMiddleware:
+    """Observes request latency per resolved route pattern."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        self.duration = container.metrics_registry().histogram(
+            'http_request_duration_seconds',
+            'HTTP request latency in seconds.',
+            ('method', 'route', 'status')
+        )
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.duration.labels(
+            request.method,
+            self.route(request),
+            response.status_code
+        ).observe(time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def route(request: HttpRequest) -> str:
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return 'unmatched'
+        return f'/{resolver_match.route}'
@@ -0,0 +1,178 @@
+from abc import ABC
+import abc
+import cProfile
+from collections import Counter
+from dataclasses import dataclass, field
+import hmac
+import os
+from pathlib import Path
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+
+
+class Profiler(ABC):
+    extension: str = ''
+
+    @abc.abstractmethod
+    def run(self, func: Callable[..., Any], *args) -> Any:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def dump(self, path: Path) -> None:
+        raise NotImplementedError()
+
+
+class CProfileProfiler(Profiler):
+    extension = 'prof'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def run(self, func: Callable[..., Any], *args) -> Any:
+        return self.profile.runcall(func, *args)
+
+    def dump(self, path: Path) -> None:
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler(Profiler):
+    """Samples the profiled thread's stack from a background thread and
+    writes collapsed stacks (flamegraph.pl / speedscope "folded" format)."""
+    extension = 'folded'
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+
+    def run(self, func: Callable[..., Any], *args) -> Any:
+        target_id = threading.get_ident()
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self.__sample, args=(target_id, stop), daemon=True)
+        sampler.start()
+        try:
+            return func(*args)
+        finally:
+            stop.set()
+            sampler.join()
+
+    def dump(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+
+    def __sample(self, target_id: int, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            # pylint: disable=protected-access
+            frame = sys._current_frames().get(target_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+
+PROFILERS: Dict[str, Callable[['ProfilingConfig'], Profiler]] = {
+    'cprofile': lambda config: CProfileProfiler(),
+    'sampling': lambda config: SamplingProfiler(config.sampling_interval),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilingConfig:
+    enabled: bool = False
+    header: str = 'X-Profile'
+    token: Optional[str] = None
+    sample_rate: float = 0.0
+    profiler: str = 'cprofile'
+    output_dir: Path = Path('profiles')
+    max_files: int = 50
+    sampling_interval: float = 0.001
+
+    @staticmethod
+    def from_settings() -> 'ProfilingConfig':
+        options = getattr(settings, 'PROFILING', {})
+        return ProfilingConfig(**{
+            key.lower(): value for key, value in options.items()
+        })
+
+
+# what ProfileStore.save names its files, and the only files it removes
+_PROFILE_NAME = re.compile(r'\d{8}T\d{6}-[A-Z]+-\w+-[0-9a-f]{8}\.(' + '|'.join(
+    re.escape(profiler.extension) for profiler in (CProfileProfiler, SamplingProfiler)) + ')')
+
+
+@dataclass(slots=True)
+class ProfileStore:
+    output_dir: Path
+    max_files: int
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def save(self, profiler: Profiler, request: HttpRequest) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+        name = f'{time.strftime("%Y%m%dT%H%M%S")}-{request.method}-{slug}-' \
+            f'{uuid.uuid4().hex[:8]}.{profiler.extension}'
+        path = self.output_dir / name
+        profiler.dump(path)
+        self.__apply_retention()
+        return path
+
+    def __apply_retention(self) -> None:
+        with self._lock:
+            files = sorted(
+                (entry for entry in os.scandir(self.output_dir)
+                 if _PROFILE_NAME.fullmatch(entry.name) and entry.is_file()),
+                key=lambda entry: entry.stat().st_mtime_ns
+            )
+            for entry in files[:max(len(files) - self.max_files, 0)]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """Runs a request under a profiler when it carries the authorized
+    profiling header or falls within the configured sample rate."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        self.config = ProfilingConfig.from_settings()
+        if not self.config.enabled:
+            raise MiddlewareNotUsed()
+        if self.config.profiler not in PROFILERS:
+            raise ValueError(f'Unknown profiler {self.config.profiler!r}')
+        self.store = ProfileStore(
+            Path(self.config.output_dir), self.config.max_files)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = PROFILERS[self.config.profiler](self.config)
+        response = profiler.run(self.get_response, request)
+        path = self.store.save(profiler, request)
+        response['X-Profile-Id'] = path.name
+        return response
+
+    def should_profile(self, request: HttpRequest) -> bool:
+        token = request.headers.get(self.config.header)
+        if token is not None and self.config.token:
+            # compare_digest only takes ASCII str, the header may hold
+            # anything
+            return hmac.compare_digest(token.encode(), self.config.token.encode())
+        return self.config.sample_rate > 0 and random.random() < self.config.sample_rate
@@ -0,0 +1,133 @@
+import csv
+import datetime
+import decimal
+import io
+from typing import Any, Iterable, Iterator, List, Sequence
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def default(obj: Any) -> Any:
+    """Fallback for the few types orjson does not handle natively.
+
+    Dataclasses (CategoryOutput, PaginationOutput, ...), datetime and UUID
+    are serialized by orjson itself, so use case outputs can be handed to
+    Response without going through asdict."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f'Type is not JSON serializable: {type(obj).__name__}')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer on orjson. Datetimes keep REST framework's wire
+    format: isoformat with microseconds, and Z for UTC."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        option = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=default, option=option)
+
+        # Keep the output a strict javascript subset, as JSONRenderer does.
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(
+                PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class StreamRenderer(BaseRenderer):
+    """Renderer that can also encode an iterable of item chunks, one bytes
+    block per chunk, for StreamingHttpResponse bodies."""
+
+    def render_stream(self, chunks: Iterable[List[Any]], fieldnames: Sequence[str]) -> Iterator[bytes]:
+        raise NotImplementedError()
+
+
+class NDJSONRenderer(StreamRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(self.__dumps(item) for item in items)
+
+    def render_stream(self, chunks: Iterable[List[Any]], fieldnames: Sequence[str]) -> Iterator[bytes]:
+        for chunk in chunks:
+            yield b''.join(self.__dumps(item) for item in chunk)
+
+    @staticmethod
+    def __dumps(item: Any) -> bytes:
+        return orjson.dumps(
+            item,
+            default=default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+
+
+class CSVRenderer(StreamRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        fieldnames = list(items[0].keys()) if items and isinstance(
+            items[0], dict) else []
+        return b''.join(self.render_stream([items], fieldnames))
+
+    def render_stream(self, chunks: Iterable[List[Any]], fieldnames: Sequence[str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fieldnames)
+        yield self.__drain(buffer)
+        for chunk in chunks:
+            writer.writerows(
+                [self.__cell(self.__value(item, name)) for name in fieldnames]
+                for item in chunk
+            )
+            yield self.__drain(buffer)
+
+    @staticmethod
+    def __value(item: Any, name: str) -> Any:
+        return item.get(name) if isinstance(item, dict) else getattr(item, name)
+
+    @staticmethod
+    def __cell(value: Any) -> Any:
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if value is None:
+            return ''
+        return value
+
+    @staticmethod
+    def __drain(buffer: io.StringIO) -> bytes:
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return data
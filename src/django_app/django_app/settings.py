@@ -41,6 +41,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'django_app.middleware.metrics.MetricsMiddleware',
+    'django_app.middleware.admission.AdmissionControlMiddleware',
+    'django_app.middleware.compression.CompressionMiddleware',
+    'django_app.middleware.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -123,4 +127,105 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-APPEND_SLASH=False
\ No newline at end of file
+APPEND_SLASH=False
+
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'django_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'django_app.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
+# On-demand request profiling (django_app.middleware.profiling)
+# A request is profiled when it sends HEADER with TOKEN, or randomly at
+# SAMPLE_RATE. PROFILER is 'cprofile' (pstats .prof files) or 'sampling'
+# (collapsed stacks for flamegraphs). Only the newest MAX_FILES are kept.
+
+PROFILING = {
+    'ENABLED': False,
+    'HEADER': 'X-Profile',
+    'TOKEN': None,
+    'SAMPLE_RATE': 0.0,
+    'PROFILER': 'cprofile',
+    'OUTPUT_DIR': BASE_DIR / 'profiles',
+    'MAX_FILES': 50,
+    'SAMPLING_INTERVAL': 0.001,
+}
+
+# Response compression (django_app.middleware.compression)
+# ENCODINGS are in server preference order; zstd and br are only offered
+# when zstandard / brotli are installed. Bodies under MIN_SIZE bytes are
+# sent as is; streamed responses are always compressed.
+COMPRESSION = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,
+    'ENCODINGS': ['zstd', 'br', 'gzip'],
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4,
+    'ZSTD_LEVEL': 3,
+}
+
+# Admission control (django_app.middleware.admission)
+# Each class caps concurrent requests (LIMIT), lets up to QUEUE more wait
+# at most TIMEOUT seconds and answers the rest with 503 + Retry-After.
+# The first class whose PATH regex, METHODS and QUERY_PARAMS (any of them
+# present, alone or bracketed as in filter[name]) match is used; unmatched
+# requests are not limited.
+ADMISSION_CONTROL = {
+    'ENABLED': True,
+    'CLASSES': [
+        {
+            'NAME': 'category_bulk',
+            'PATH': r'^/categories/(export|import|batch)$',
+            'LIMIT': 2,
+            'QUEUE': 4,
+            'TIMEOUT': 5.0,
+        },
+        {
+            'NAME': 'category_search',
+            'PATH': r'^/categories/$',
+            'METHODS': ['GET'],
+            'QUERY_PARAMS': ['filter', 'sort'],
+            'LIMIT': 2,
+            'QUEUE': 4,
+            'TIMEOUT': 1.0,
+        },
+        {
+            'NAME': 'category_list',
+            'PATH': r'^/categories/$',
+            'LIMIT': 4,
+            'QUEUE': 8,
+            'TIMEOUT': 1.0,
+        },
+        {
+            # autocomplete, a request per keystroke: shed rather than queue
+            'NAME': 'category_suggest',
+            'PATH': r'^/categories/suggest$',
+            'LIMIT': 4,
+            'QUEUE': 8,
+            'TIMEOUT': 0.25,
+        },
+        {
+            'NAME': 'category_detail',
+            'PATH': r'^/categories/(?!(suggest|export|import|batch)$)[^/]+$',
+            'LIMIT': 8,
+            'QUEUE': 16,
+            'TIMEOUT': 0.25,
+        },
+    ],
+}
+
+# Warm-up (django_app.warmup), started by the WSGI/ASGI entry points.
+# GET /ready answers 503 until it has finished; with BACKGROUND the server
+# accepts connections meanwhile, otherwise loading the app blocks on it.
+WARMUP = {
+    'ENABLED': True,
+    'BACKGROUND': True,
+}
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+
+from django_app.middleware.admission import (
+    AdmissionControlMiddleware,
+    ConcurrencyLimiter,
+    Rejected
+)
+
+ADMISSION_CONTROL = {
+    'ENABLED': True,
+    'CLASSES': [
+        {'NAME': 'search', 'PATH': r'^/categories/$', 'METHODS': ['get'],
+         'QUERY_PARAMS': ['filter', 'sort'], 'LIMIT': 1, 'QUEUE': 0, 'TIMEOUT': 0.1},
+        {'NAME': 'list', 'PATH': r'^/categories/$', 'LIMIT': 4},
+        {'NAME': 'detail', 'PATH': r'^/categories/[^/]+$', 'LIMIT': 8},
+    ]
+}
+
+
+class TestConcurrencyLimiterUnit(unittest.TestCase):
+
+    def test_admit_up_to_limit(self):
+        limiter = ConcurrencyLimiter(limit=2, queue=0)
+        limiter.acquire(0.1)
+        limiter.acquire(0.1)
+        self.assertEqual(limiter.active, 2)
+        with self.assertRaises(Rejected) as assert_error:
+            limiter.acquire(0.1)
+        self.assertEqual(assert_error.exception.reason, 'queue_full')
+        self.assertEqual(assert_error.exception.retry_after, 1)
+
+        limiter.release(0.01)
+        limiter.acquire(0.1)
+        self.assertEqual(limiter.active, 2)
+
+    def test_reject_when_wait_reaches_timeout(self):
+        limiter = ConcurrencyLimiter(limit=1, queue=1)
+        limiter.acquire(0.1)
+        start = time.monotonic()
+        with self.assertRaises(Rejected) as assert_error:
+            limiter.acquire(0.05)
+        self.assertEqual(assert_error.exception.reason, 'timeout')
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(limiter.waiting, 0)
+
+    def test_reject_when_estimated_wait_exceeds_deadline(self):
+        limiter = ConcurrencyLimiter(limit=1, queue=10)
+        limiter.acquire(1)
+        limiter.avg_service_time = 2.5
+        start = time.monotonic()
+        with self.assertRaises(Rejected) as assert_error:
+            limiter.acquire(1)
+        self.assertEqual(assert_error.exception.reason, 'deadline')
+        self.assertEqual(assert_error.exception.retry_after, 3)
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    def test_waiter_gets_released_slot(self):
+        limiter = ConcurrencyLimiter(limit=1, queue=1)
+        limiter.acquire(1)
+        acquired = threading.Event()
+
+        def wait():
+            limiter.acquire(1)
+            acquired.set()
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        while limiter.waiting == 0:
+            time.sleep(0.001)
+        self.assertFalse(acquired.is_set())
+        limiter.release(0.1)
+        thread.join()
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(limiter.active, 1)
+        self.assertAlmostEqual(limiter.avg_service_time, 0.02)
+
+
+class TestAdmissionControlMiddlewareUnit(unittest.TestCase):
+
+    def make_middleware(self, view, **options) -> AdmissionControlMiddleware:
+        with override_settings(ADMISSION_CONTROL={**ADMISSION_CONTROL, **options}):
+            return AdmissionControlMiddleware(view)
+
+    def test_is_not_used_when_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            self.make_middleware(lambda request: HttpResponse(), ENABLED=False)
+
+    def test_refuse_to_load_under_asgi(self):
+        with mock.patch.dict(os.environ, {'DJANGO_APP_INTERFACE': 'asgi'}), \
+                self.assertLogs('django_app.admission', 'WARNING'), \
+                self.assertRaises(MiddlewareNotUsed):
+            self.make_middleware(lambda request: HttpResponse())
+
+    def test_classify(self):
+        middleware = self.make_middleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+        arrange = [
+            (factory.get('/categories/?filter=a'), 'search'),
+            (factory.get('/categories/?sort=name&page=2'), 'search'),
+            (factory.get('/categories/?filter[name][contains]=a'), 'search'),
+            (factory.get('/categories/?filter[text]=a&page=2'), 'search'),
+            (factory.get('/categories/?filter='), 'list'),
+            (factory.get('/categories/?filter[name]='), 'list'),
+            (factory.get('/categories/?filters=a'), 'list'),
+            (factory.get('/categories/?page=2'), 'list'),
+            (factory.post('/categories/?filter=a'), 'list'),
+            (factory.get('/categories/5490020a-e866-4229-9adc-aa44b83234c4'), 'detail'),
+            (factory.get('/metrics'), None),
+        ]
+        for request, expected in arrange:
+            admission_class = middleware.classify(request)
+            self.assertEqual(
+                admission_class and admission_class.name, expected, request.get_full_path())
+
+    def test_classify_with_the_settings_of_the_app(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+        arrange = [
+            (factory.get('/categories/suggest?prefix=mo'), 'category_suggest'),
+            (factory.get('/categories/export'), 'category_bulk'),
+            (factory.post('/categories/batch'), 'category_bulk'),
+            (factory.get('/categories/?filter[name][contains]=mo'), 'category_search'),
+            (factory.get('/categories/'), 'category_list'),
+            (factory.get('/categories/5490020a-e866-4229-9adc-aa44b83234c4'), 'category_detail'),
+            (factory.get('/categories/suggestions'), 'category_detail'),
+        ]
+        for request, expected in arrange:
+            self.assertEqual(middleware.classify(request).name, expected, request.get_full_path())
+
+    def test_shed_requests_over_the_limit(self):
+        entered = threading.Event()
+        proceed = threading.Event()
+
+        def view(request):
+            if 'filter' in request.GET:
+                entered.set()
+                proceed.wait(1)
+            return HttpResponse('ok')
+
+        middleware = self.make_middleware(view)
+        request = RequestFactory().get('/categories/?filter=a')
+        thread = threading.Thread(target=middleware, args=(request,))
+        thread.start()
+        entered.wait(1)
+
+        response = middleware(request)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(
+            middleware.rejected.labels('search', 'queue_full').value, 1)
+
+        self.assertEqual(middleware(RequestFactory().get(
+            '/categories/?page=1')).status_code, 200)
+        self.assertEqual(middleware(RequestFactory().get(
+            '/metrics')).status_code, 200)
+
+        proceed.set()
+        thread.join()
+        self.assertEqual(middleware.limiters['search'].active, 0)
+        self.assertEqual(middleware(request).status_code, 200)
+
+    def test_release_slot_when_view_raises(self):
+        def view(request):
+            raise ValueError('boom')
+
+        middleware = self.make_middleware(view)
+        with self.assertRaises(ValueError):
+            middleware(RequestFactory().get('/categories/?filter=a'))
+        self.assertEqual(middleware.limiters['search'].active, 0)
+
+    def test_hold_slot_until_streaming_response_is_closed(self):
+        middleware = self.make_middleware(
+            lambda request: StreamingHttpResponse(iter([b'a', b'b'])))
+        response = middleware(RequestFactory().get('/categories/?filter=a'))
+        self.assertEqual(middleware.limiters['search'].active, 1)
+        self.assertEqual(b''.join(response.streaming_content), b'ab')
+        response.close()
+        response.close()
+        self.assertEqual(middleware.limiters['search'].active, 0)
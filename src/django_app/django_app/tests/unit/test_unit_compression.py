@@ -0,0 +1,151 @@
+import gzip
+import unittest
+from unittest import mock
+import zlib
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+
+from django_app.middleware import compression
+from django_app.middleware.compression import (
+    CompressionMiddleware,
+    GzipEncoder,
+    compress_stream,
+    parse_accept_encoding
+)
+
+BODY = b'{"name":"Movie","description":"some description"}' * 100
+
+
+def json_view(request):
+    return HttpResponse(BODY, content_type='application/json')
+
+
+class TestCompressionMiddlewareUnit(unittest.TestCase):
+
+    def make_middleware(self, view=json_view, **options) -> CompressionMiddleware:
+        with override_settings(COMPRESSION={'ENCODINGS': ['gzip'], **options}):
+            return CompressionMiddleware(view)
+
+    def test_unknown_encoding(self):
+        with self.assertRaises(ValueError):
+            self.make_middleware(ENCODINGS=['fake'])
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding(''), {})
+        self.assertEqual(parse_accept_encoding('gzip, br;q=0.5, *;q=0, zstd;q=x'), {
+            'gzip': 1.0, 'br': 0.5, '*': 0.0, 'zstd': 0.0
+        })
+
+    def test_negotiate(self):
+        with override_settings(COMPRESSION={'ENCODINGS': ['zstd', 'br', 'gzip']}):
+            middleware = CompressionMiddleware(json_view)
+        middleware.encodings = ['zstd', 'br', 'gzip']
+        arrange = [
+            ('', None),
+            ('identity', None),
+            ('gzip', 'gzip'),
+            ('gzip, br', 'br'),
+            ('gzip, br, zstd', 'zstd'),
+            ('gzip, br;q=0.5', 'gzip'),
+            ('*', 'zstd'),
+            ('*, zstd;q=0', 'br'),
+            ('gzip;q=0', None),
+        ]
+        for accept_encoding, expected in arrange:
+            self.assertEqual(middleware.negotiate(accept_encoding), expected,
+                             accept_encoding)
+
+    def test_only_offer_available_encodings(self):
+        with mock.patch.dict(compression.ENCODERS, {
+            'br': (False, compression.ENCODERS['br'][1])
+        }):
+            middleware = self.make_middleware(ENCODINGS=['br', 'gzip'])
+        self.assertEqual(middleware.encodings, ['gzip'])
+        self.assertEqual(middleware.negotiate('br, gzip'), 'gzip')
+
+    def test_compress_response(self):
+        middleware = self.make_middleware()
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+
+        def view(request):
+            response = json_view(request)
+            response['ETag'] = '"etag"'
+            return response
+
+        middleware.get_response = view
+        response = middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"etag"')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(BODY))
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_skip_responses_that_should_not_be_compressed(self):
+        arrange = [
+            {'response': HttpResponse(b'{}', content_type='application/json'),
+             'accept_encoding': 'gzip'},
+            {'response': HttpResponse(BODY, content_type='image/png'),
+             'accept_encoding': 'gzip'},
+            {'response': HttpResponse(BODY, status=304, content_type='application/json'),
+             'accept_encoding': 'gzip'},
+            {'response': HttpResponse(BODY, content_type='application/json',
+                                      headers={'Content-Encoding': 'br'}),
+             'accept_encoding': 'gzip'},
+            {'response': HttpResponse(BODY, content_type='application/json'),
+             'accept_encoding': ''},
+        ]
+        for i in arrange:
+            middleware = self.make_middleware(view=lambda request, i=i: i['response'])
+            response = middleware(RequestFactory().get(
+                '/', HTTP_ACCEPT_ENCODING=i['accept_encoding']))
+            self.assertEqual(response.content, BODY if len(
+                i['response'].content) > 2 else b'{}')
+            self.assertNotEqual(response.get('Content-Encoding'), 'gzip')
+
+        middleware = self.make_middleware(ENABLED=False)
+        response = middleware(RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response.content, BODY)
+
+    def test_compress_streaming_response(self):
+        def view(request):
+            return StreamingHttpResponse(
+                iter([b'{"a":1}\n', b'{"a":2}\n']), content_type='application/x-ndjson')
+
+        middleware = self.make_middleware(view=view)
+        response = middleware(RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(gzip.decompress(b''.join(chunks)),
+                         b'{"a":1}\n{"a":2}\n')
+
+    def test_streamed_chunks_are_decodable_as_they_arrive(self):
+        stream = compress_stream(GzipEncoder(6), iter([b'first chunk\n', b'second\n']))
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.assertEqual(decompressor.decompress(next(stream)), b'first chunk\n')
+        self.assertEqual(decompressor.decompress(next(stream)), b'second\n')
+
+
+@unittest.skipUnless(compression.brotli and compression.zstandard,
+                     'brotli and zstandard are optional')
+class TestOptionalEncodersUnit(unittest.TestCase):
+
+    def test_round_trip(self):
+        with override_settings(COMPRESSION={'ENCODINGS': ['zstd', 'br']}):
+            middleware = CompressionMiddleware(json_view)
+
+        response = middleware(RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='br'))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), BODY)
+
+        response = middleware(RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='zstd'))
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        self.assertEqual(
+            compression.zstandard.ZstdDecompressor().decompressobj().decompress(response.content), BODY)
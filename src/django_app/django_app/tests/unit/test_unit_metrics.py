@@ -0,0 +1,40 @@
+import unittest
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from django_app import container
+from django_app.middleware.metrics import MetricsMiddleware
+from django_app.views import metrics
+
+
+class TestMetricsMiddlewareUnit(unittest.TestCase):
+
+    def test_observe_request_duration_per_route(self):
+        def view(request):
+            request.resolver_match = mock.Mock(route='categories/')
+            return HttpResponse(status=200)
+
+        middleware = MetricsMiddleware(view)
+        middleware(RequestFactory().get('/categories/?page=2'))
+        middleware(RequestFactory().get('/categories/?page=3'))
+
+        child = middleware.duration.labels('GET', '/categories/', 200)
+        self.assertEqual(child.snapshot()[2], 2)
+
+    def test_route_when_request_is_not_resolved(self):
+        self.assertEqual(MetricsMiddleware.route(
+            RequestFactory().get('/nope')), 'unmatched')
+
+
+class TestMetricsViewUnit(unittest.TestCase):
+
+    def test_expose_registry(self):
+        container.metrics_registry().counter(
+            'test_metrics_view', 'Test counter.').inc()
+        response = metrics(RequestFactory().get('/metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn('test_metrics_view_total 1.0', response.content.decode())
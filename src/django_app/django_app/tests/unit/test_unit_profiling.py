@@ -0,0 +1,145 @@
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from django_app.middleware.profiling import (
+    CProfileProfiler,
+    ProfileStore,
+    ProfilingMiddleware,
+    SamplingProfiler
+)
+
+
+def busy_view(request):
+    deadline = time.perf_counter() + 0.02
+    while time.perf_counter() < deadline:
+        pass
+    return HttpResponse('ok')
+
+
+class TestProfilingMiddlewareUnit(unittest.TestCase):
+
+    output_dir: Path
+
+    def setUp(self) -> None:
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def make_middleware(self, **options) -> ProfilingMiddleware:
+        profiling = {
+            'ENABLED': True,
+            'TOKEN': 'secret',
+            'OUTPUT_DIR': self.output_dir,
+            **options
+        }
+        with override_settings(PROFILING=profiling):
+            return ProfilingMiddleware(busy_view)
+
+    def test_is_not_used_when_disabled(self):
+        with override_settings(PROFILING={'ENABLED': False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(busy_view)
+
+    def test_unknown_profiler(self):
+        with self.assertRaises(ValueError):
+            self.make_middleware(PROFILER='fake')
+
+    def test_should_profile(self):
+        middleware = self.make_middleware()
+        factory = RequestFactory()
+        self.assertFalse(middleware.should_profile(factory.get('/')))
+        self.assertFalse(middleware.should_profile(
+            factory.get('/', HTTP_X_PROFILE='wrong')))
+        self.assertTrue(middleware.should_profile(
+            factory.get('/', HTTP_X_PROFILE='secret')))
+        self.assertFalse(middleware.should_profile(
+            factory.get('/', HTTP_X_PROFILE='sécret')))
+
+        middleware = self.make_middleware(TOKEN=None)
+        self.assertFalse(middleware.should_profile(
+            factory.get('/', HTTP_X_PROFILE='')))
+
+        middleware = self.make_middleware(SAMPLE_RATE=1.0)
+        self.assertTrue(middleware.should_profile(factory.get('/')))
+
+    def test_does_not_profile_unauthorized_request(self):
+        middleware = self.make_middleware()
+        response = middleware(RequestFactory().get('/categories/'))
+        self.assertEqual(response.content, b'ok')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_profile_using_cprofile(self):
+        middleware = self.make_middleware()
+        response = middleware(RequestFactory().get(
+            '/categories/', HTTP_X_PROFILE='secret'))
+        self.assertEqual(response.content, b'ok')
+        self.assertRegex(response['X-Profile-Id'],
+                         r'^\d{8}T\d{6}-GET-categories-[0-9a-f]{8}\.prof$')
+        stats = pstats.Stats(str(self.output_dir / response['X-Profile-Id']))
+        self.assertTrue(any(
+            func[2] == 'busy_view' for func in stats.stats  # pylint: disable=no-member
+        ))
+
+    def test_profile_using_sampling_profiler(self):
+        middleware = self.make_middleware(
+            PROFILER='sampling', SAMPLING_INTERVAL=0.001)
+        response = middleware(RequestFactory().get(
+            '/categories/', HTTP_X_PROFILE='secret'))
+        self.assertTrue(response['X-Profile-Id'].endswith('.folded'))
+        with open(self.output_dir / response['X-Profile-Id'], encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertIn('busy_view', stack)
+        self.assertGreater(int(count), 0)
+
+
+class TestProfileStoreUnit(unittest.TestCase):
+
+    def test_keep_only_newest_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ProfileStore(Path(tmp_dir), max_files=2)
+            request = RequestFactory().get('/categories/')
+            paths = []
+            for _ in range(4):
+                profiler = CProfileProfiler()
+                profiler.run(busy_view, request)
+                paths.append(store.save(profiler, request))
+            self.assertCountEqual(os.listdir(tmp_dir),
+                                  [paths[2].name, paths[3].name])
+
+    def test_leave_other_files_alone(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            foreign = [Path(tmp_dir) / name for name in (
+                'app.log', 'notes.prof', '20240101T000000-GET-root-0123abcd.txt')]
+            for path in foreign:
+                path.write_text('keep me')
+                os.utime(path, (0, 0))
+            store = ProfileStore(Path(tmp_dir), max_files=1)
+            request = RequestFactory().get('/categories/')
+            paths = []
+            for _ in range(2):
+                profiler = CProfileProfiler()
+                profiler.run(busy_view, request)
+                paths.append(store.save(profiler, request))
+            self.assertCountEqual(os.listdir(tmp_dir),
+                                  [path.name for path in foreign] + [paths[1].name])
+
+
+class TestSamplingProfilerUnit(unittest.TestCase):
+
+    def test_run_returns_function_result(self):
+        profiler = SamplingProfiler(interval=0.001)
+        self.assertEqual(profiler.run(lambda value: value * 2, 21), 42)
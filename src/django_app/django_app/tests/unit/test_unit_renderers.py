@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import io
+import unittest
+
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.category.application import CategoryOutput, ListCategoriesUseCase
+from django_app.parsers import ORJSONParser
+from django_app.renderers import CSVRenderer, NDJSONRenderer, ORJSONRenderer
+
+
+class TestORJSONRendererUnit(unittest.TestCase):
+
+    renderer: ORJSONRenderer
+
+    def setUp(self) -> None:
+        self.renderer = ORJSONRenderer()
+
+    def test_render_none(self):
+        self.assertEqual(self.renderer.render(None), b'')
+
+    def test_render_dataclasses(self):
+        output = ListCategoriesUseCase.Output(
+            items=[
+                CategoryOutput(
+                    id='5490020a-e866-4229-9adc-aa44b83234c4',
+                    name='Movie',
+                    description=None,
+                    is_active=True,
+                    created_at=datetime(2022, 5, 22, 10, 30, 15, 123456)
+                )
+            ],
+            total=1,
+            current_page=1,
+            last_page=1,
+            per_page=15
+        )
+        self.assertEqual(
+            self.renderer.render(output),
+            b'{"items":[{"id":"5490020a-e866-4229-9adc-aa44b83234c4","name":"Movie",'
+            b'"description":null,"is_active":true,"created_at":"2022-05-22T10:30:15.123456"}],'
+            b'"total":1,"current_page":1,"last_page":1,"per_page":15}'
+        )
+
+    def test_render_utc_datetime_using_z_suffix(self):
+        self.assertEqual(
+            self.renderer.render(
+                {'created_at': datetime(2022, 5, 22, tzinfo=timezone.utc)}),
+            b'{"created_at":"2022-05-22T00:00:00Z"}'
+        )
+
+    def test_render_datetimes_like_rest_framework(self):
+        # the wire format clients saw before orjson: isoformat, so
+        # microseconds are kept, with Z for UTC
+        datetimes = [
+            datetime(2022, 5, 22, 10, 30, 15, 123456),
+            datetime(2022, 5, 22, 10, 30, 15),
+            datetime(2022, 5, 22, 10, 30, 15, 1000, tzinfo=timezone.utc),
+            datetime(2022, 5, 22, 10, 30, 15, 123456,
+                     tzinfo=timezone(timedelta(hours=-3))),
+        ]
+        for value in datetimes:
+            with self.subTest(value=value):
+                self.assertEqual(
+                    self.renderer.render({'created_at': value}),
+                    JSONRenderer().render({'created_at': value})
+                )
+
+    def test_render_fallback_types(self):
+        self.assertEqual(
+            self.renderer.render({
+                'lazy': gettext_lazy('This field is required.'),
+                'decimal': Decimal('1.50'),
+                'set': {1},
+            }),
+            b'{"lazy":"This field is required.","decimal":"1.50","set":[1]}'
+        )
+        with self.assertRaises(TypeError):
+            self.renderer.render({'object': object()})
+
+    def test_render_using_indent(self):
+        self.assertEqual(
+            self.renderer.render({'a': 1}, 'application/json; indent=4'),
+            b'{\n  "a": 1\n}'
+        )
+        self.assertEqual(
+            self.renderer.render({'a': 1}, None, {'indent': 4}),
+            b'{\n  "a": 1\n}'
+        )
+
+    def test_escape_js_line_separators(self):
+        self.assertEqual(
+            self.renderer.render({'name': 'a\u2028b\u2029c'}),
+            b'{"name":"a\\u2028b\\u2029c"}'
+        )
+
+
+class TestNDJSONRendererUnit(unittest.TestCase):
+
+    def test_render(self):
+        renderer = NDJSONRenderer()
+        self.assertEqual(renderer.render(None), b'')
+        self.assertEqual(renderer.render({'detail': 'Not found.'}),
+                         b'{"detail":"Not found."}\n')
+        self.assertEqual(renderer.render([{'a': 1}, {'a': 2}]),
+                         b'{"a":1}\n{"a":2}\n')
+
+    def test_render_stream(self):
+        stream = NDJSONRenderer().render_stream(
+            iter([[{'a': 1}, {'a': 2}], [{'a': 3}]]), ['a'])
+        self.assertEqual(next(stream), b'{"a":1}\n{"a":2}\n')
+        self.assertEqual(next(stream), b'{"a":3}\n')
+        self.assertEqual(list(stream), [])
+
+
+class TestCSVRendererUnit(unittest.TestCase):
+
+    def test_render(self):
+        renderer = CSVRenderer()
+        self.assertEqual(renderer.render(None), b'')
+        self.assertEqual(renderer.render({'detail': 'Not found.'}),
+                         b'detail\r\nNot found.\r\n')
+
+    def test_render_stream(self):
+        output = CategoryOutput(
+            id='5490020a-e866-4229-9adc-aa44b83234c4',
+            name='Movie, "best"',
+            description=None,
+            is_active=False,
+            created_at=datetime(2022, 5, 22, 10, 30, 15)
+        )
+        stream = CSVRenderer().render_stream(
+            iter([[output]]), ['id', 'name', 'description', 'is_active', 'created_at'])
+        self.assertEqual(next(stream),
+                         b'id,name,description,is_active,created_at\r\n')
+        self.assertEqual(next(stream),
+                         b'5490020a-e866-4229-9adc-aa44b83234c4,"Movie, ""best""",,'
+                         b'False,2022-05-22T10:30:15\r\n')
+        self.assertEqual(list(stream), [])
+
+
+class TestORJSONParserUnit(unittest.TestCase):
+
+    def test_parse(self):
+        parser = ORJSONParser()
+        self.assertEqual(
+            parser.parse(io.BytesIO(b'[{"name": "Movie"}]')),
+            [{'name': 'Movie'}]
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"name": '))
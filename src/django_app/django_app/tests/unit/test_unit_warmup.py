@@ -0,0 +1,117 @@
+import json
+import unittest
+from unittest import mock
+
+from core.__seedwork.application.interceptors import InterceptedUseCase
+from core.category.application import ListCategoriesUseCase
+from dependency_injector import providers
+from django.test import RequestFactory, override_settings
+
+from django_app import views, warmup
+from django_app.warmup import WarmUp, WarmUpConfig, start_warm_up
+
+
+class TestWarmUpUnit(unittest.TestCase):
+
+    def test_run_steps_in_order(self):
+        calls = []
+        warm_up = WarmUp(steps=(
+            ('first', lambda: calls.append('first')),
+            ('second', lambda: calls.append('second')),
+        ))
+        self.assertEqual(warm_up.status, 'pending')
+        self.assertFalse(warm_up.is_ready())
+
+        warm_up.start(background=False)
+        self.assertEqual(calls, ['first', 'second'])
+        self.assertTrue(warm_up.is_ready())
+        self.assertCountEqual(warm_up.durations.keys(),
+                              ['first', 'second', 'total'])
+        self.assertIsNone(warm_up.error)
+
+        warm_up.start(background=False)
+        self.assertEqual(calls, ['first', 'second'])
+
+    def test_report_failed_step(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        calls = []
+        warm_up = WarmUp(steps=(
+            ('failing', fail),
+            ('never', lambda: calls.append('never')),
+        ))
+        with self.assertLogs('django_app.warmup', 'ERROR'):
+            warm_up.start(background=False)
+        self.assertEqual(warm_up.status, 'failed')
+        self.assertEqual(warm_up.error, 'failing: boom')
+        self.assertEqual(calls, [])
+        self.assertFalse(warm_up.is_ready())
+
+    def test_run_in_background(self):
+        warm_up = WarmUp(steps=(('noop', lambda: None),))
+        warm_up.start()
+        self.assertTrue(warm_up.wait(5))
+
+    def test_default_steps(self):
+        warm_up = WarmUp()
+        warm_up.start(background=False)
+        self.assertEqual(warm_up.error, None)
+        self.assertTrue(warm_up.is_ready())
+        self.assertCountEqual(warm_up.durations.keys(), [
+            'container', 'validators', 'urls', 'use_cases', 'total'])
+
+    def test_run_use_cases_past_their_interceptors(self):
+        self.assertIsInstance(warmup.container.use_case_category_list_categories(),
+                              InterceptedUseCase)
+        with mock.patch.object(InterceptedUseCase, 'execute') as intercepted, \
+                mock.patch.object(ListCategoriesUseCase, 'execute',
+                                  autospec=True, return_value={}) as execute:
+            warmup.run_use_cases()
+        intercepted.assert_not_called()
+        execute.assert_called_once()
+
+    def test_build_only_the_selected_repository(self):
+        shared_memory = mock.Mock()
+        with warmup.container.repository_category_shared_memory.override(
+                providers.Callable(shared_memory)):
+            warmup.build_container()
+        shared_memory.assert_not_called()
+
+    def test_start_warm_up(self):
+        with mock.patch.object(warmup, 'warm_up', WarmUp(steps=())) as warm_up, \
+                override_settings(WARMUP={'ENABLED': True, 'BACKGROUND': False}):
+            start_warm_up()
+            self.assertTrue(warm_up.is_ready())
+            self.assertEqual(warm_up.durations.keys(), {'total'})
+
+        with mock.patch.object(warmup, 'warm_up', WarmUp()) as warm_up, \
+                override_settings(WARMUP={'ENABLED': False}):
+            start_warm_up()
+            self.assertTrue(warm_up.is_ready())
+            self.assertEqual(warm_up.durations, {})
+
+    def test_config_from_settings(self):
+        with override_settings(WARMUP={'ENABLED': False, 'BACKGROUND': False}):
+            self.assertEqual(WarmUpConfig.from_settings(),
+                             WarmUpConfig(enabled=False, background=False))
+
+
+class TestReadyViewUnit(unittest.TestCase):
+
+    def test_ready(self):
+        request = RequestFactory().get('/ready')
+        warm_up = WarmUp(steps=())
+        with mock.patch.object(views, 'warm_up', warm_up):
+            response = views.ready(request)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(json.loads(response.content)['status'], 'pending')
+
+            warm_up.start(background=False)
+            response = views.ready(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content), {
+                'status': 'ready',
+                'durations': {'total': warm_up.durations['total']},
+                'error': None,
+            })
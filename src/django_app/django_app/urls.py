@@ -15,9 +15,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from django_app import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', views.metrics),
+    path('ready', views.ready),
     path('', include('category.urls')),
     path('api-auth/', include('rest_framework.urls'))
 ]
@@ -0,0 +1,15 @@
+from django.http import HttpRequest, HttpResponse, JsonResponse
+
+from django_app import container
+from django_app.warmup import warm_up
+
+
+def metrics(request: HttpRequest) -> HttpResponse:  # pylint: disable=unused-argument
+    return HttpResponse(
+        container.metrics_registry().expose(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def ready(request: HttpRequest) -> HttpResponse:  # pylint: disable=unused-argument
+    return JsonResponse(warm_up.to_dict(), status=200 if warm_up.is_ready() else 503)
@@ -0,0 +1,147 @@
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dependency_injector import providers
+from django.conf import settings
+from django.urls import get_resolver
+
+from django_app import container
+
+logger = logging.getLogger('django_app.warmup')
+
+Step = Tuple[str, Callable[[], Any]]
+
+
+def build_container() -> None:
+    # backends behind a Selector are built only when they are selected
+    unselected = {
+        option for selector in container.traverse(types=[providers.Selector])
+        for option in selector.providers.values()
+    }
+    for provider in container.providers.values():
+        if isinstance(provider, providers.Singleton) and provider not in unselected:
+            provider()
+
+
+def prime_validators() -> None:
+    # pylint: disable=import-outside-toplevel
+    from core.category.domain import Category
+    # validating an entity loads DRF and builds the serializer fields
+    Category(name='warm-up', description='warm-up')
+
+
+def run_use_cases() -> None:
+    # pylint: disable=import-outside-toplevel
+    from core.__seedwork.application.interceptors import InterceptedUseCase
+    from core.category.application import ListCategoriesUseCase
+    from django_app.renderers import ORJSONRenderer
+    use_case = container.use_case_category_list_categories()
+    # past the interceptors, so use case metrics and single flight only
+    # see requests
+    if isinstance(use_case, InterceptedUseCase):
+        use_case = use_case.use_case
+    output = use_case.execute(ListCategoriesUseCase.Input())  # pylint: disable=no-value-for-parameter
+    ORJSONRenderer().render(output)
+
+
+def load_urls() -> None:
+    get_resolver().resolve('/categories/')
+
+
+DEFAULT_STEPS: Tuple[Step, ...] = (
+    ('container', build_container),
+    ('validators', prime_validators),
+    ('urls', load_urls),
+    ('use_cases', run_use_cases),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class WarmUpConfig:
+    enabled: bool = True
+    background: bool = True
+
+    @staticmethod
+    def from_settings() -> 'WarmUpConfig':
+        options = getattr(settings, 'WARMUP', {})
+        return WarmUpConfig(**{key.lower(): value for key, value in options.items()})
+
+
+@dataclass(slots=True)
+class WarmUp:
+    """Builds the lazily created parts of the app (container singletons,
+    validators, URLconf) and runs a read-only use case once, so the first
+    real request does not pay for it. `status` goes pending -> running ->
+    ready | failed."""
+    steps: Tuple[Step, ...] = DEFAULT_STEPS
+    status: str = 'pending'
+    durations: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False)
+    _thread: Optional[threading.Thread] = field(
+        default=None, repr=False, compare=False)
+
+    def start(self, background: bool = True) -> None:
+        with self._lock:
+            if self.status != 'pending':
+                return
+            self.status = 'running'
+        if background:
+            self._thread = threading.Thread(
+                target=self.run, name='warm-up', daemon=True)
+            self._thread.start()
+        else:
+            self.run()
+
+    def run(self) -> None:
+        self.status = 'running'
+        start = time.perf_counter()
+        for name, step in self.steps:
+            step_start = time.perf_counter()
+            try:
+                step()
+            except Exception as error:  # pylint: disable=broad-except
+                logger.exception('Warm-up step %s failed', name)
+                self.error = f'{name}: {error}'
+                self.status = 'failed'
+                return
+            self.durations[name] = time.perf_counter() - step_start
+        self.durations['total'] = time.perf_counter() - start
+        self.status = 'ready'
+        logger.info('Warm-up finished in %.2fms',
+                    self.durations['total'] * 1000)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_ready()
+
+    def is_ready(self) -> bool:
+        return self.status == 'ready'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'durations': dict(self.durations),
+            'error': self.error,
+        }
+
+
+warm_up = WarmUp()
+
+
+def start_warm_up() -> None:
+    """Called by the WSGI/ASGI entry points; with WARMUP disabled the app
+    is reported ready right away."""
+    container.metrics_registry().gauge(
+        'app_ready', 'Whether warm-up has finished.'
+    ).set_function(lambda: float(warm_up.is_ready()))
+    config = WarmUpConfig.from_settings()
+    if not config.enabled:
+        warm_up.status = 'ready'
+        return
+    warm_up.start(background=config.background)
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_app.settings')
 
 application = get_wsgi_application()
+
+# pylint: disable=wrong-import-position
+from django_app.warmup import start_warm_up  # noqa: E402
+
+start_warm_up()